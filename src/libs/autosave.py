@@ -0,0 +1,106 @@
+import json
+import os
+import queue
+import threading
+
+# Operações que a thread de escrita sabe fazer
+SAVE = 0
+CLEAR = 1
+
+# Objeto usado para avisar a thread de escrita que ela deve terminar
+STOP_SIGNAL = object()
+
+def load_autosave(path: str) -> dict | None:
+  """
+    Carrega o último snapshot salvo automaticamente. Retorna `None`\n
+    caso não haja um salvamento ou caso ele não possa ser lido.
+  """
+  try:
+    with open(path, "r", encoding="utf-8") as file:
+      return json.load(file)
+  except (FileNotFoundError, ValueError):
+    return None
+
+class Autosave:
+  """
+    Salva snapshots da partida em disco a partir de uma thread\n
+    separada, para que o salvamento nunca trave o loop de frames.\n
+    O snapshot é escrito em um arquivo temporário e depois trocado\n
+    com o arquivo final por um rename atômico, então um crash no\n
+    meio da escrita nunca deixa um salvamento corrompido.
+  """
+  def __init__(self, path: str):
+    self.path = path
+    self.temporary_path = path + ".tmp"
+    self.queue: queue.Queue = queue.Queue()
+
+    self.thread = threading.Thread(target=self.__write_loop, name="autosave-writer", daemon=True)
+    self.thread.start()
+
+  def save(self, snapshot: dict):
+    """
+      Pede para o snapshot ser salvo. O snapshot não pode ser\n
+      modificado depois de ser enviado.
+    """
+    self.queue.put((SAVE, snapshot))
+
+  def clear(self):
+    """
+      Pede para o salvamento ser apagado (ex.: quando a partida acaba).
+    """
+    self.queue.put((CLEAR, None))
+
+  def close(self):
+    """
+      Espera as operações pendentes e termina a thread de escrita.
+    """
+    self.queue.put(STOP_SIGNAL)
+    self.thread.join()
+
+  def __write(self, snapshot: dict):
+    data = json.dumps(snapshot, separators=(",", ":"))
+
+    with open(self.temporary_path, "w", encoding="utf-8") as file:
+      file.write(data)
+      file.flush()
+      # Garante que o arquivo temporário está no disco antes da troca
+      os.fsync(file.fileno())
+
+    os.replace(self.temporary_path, self.path)
+
+  def __clear(self):
+    for path in (self.path, self.temporary_path):
+      try:
+        os.remove(path)
+      except FileNotFoundError:
+        pass
+
+  def __write_loop(self):
+    stopped = False
+
+    while not stopped:
+      # Espera pela próxima operação e junta as que já estiverem na fila
+      operations = [self.queue.get()]
+      while True:
+        try:
+          operations.append(self.queue.get_nowait())
+        except queue.Empty:
+          break
+
+      stopped = any(operation is STOP_SIGNAL for operation in operations)
+      operations = [operation for operation in operations if operation is not STOP_SIGNAL]
+
+      if not operations:
+        continue
+
+      # Cada operação substitui o resultado das anteriores, então
+      # só a última operação da fila precisa ser feita
+      operation_type, snapshot = operations[-1]
+
+      try:
+        if operation_type == SAVE:
+          self.__write(snapshot)
+        else:
+          self.__clear()
+      except OSError as error:
+        print(f"Não foi possível atualizar o salvamento automático: {error}")
@@ -0,0 +1,111 @@
+import pygame
+
+# Limites do zoom. O zoom 1 mostra a superfície inteira. Quem cria a câmera
+# pode aumentar o zoom máximo (ex.: um mundo muito maior que o viewport)
+MIN_ZOOM = 1.0
+MAX_ZOOM = 8.0
+
+# Quanto o zoom muda a cada passo da rodinha do mouse
+ZOOM_STEP = 1.25
+
+class Camera:
+  """
+    Controla qual parte de uma superfície grande (o "mundo") aparece\n
+    em um viewport com a mesma proporção que ela. Com o zoom 1 o mundo\n
+    inteiro é mostrado, esticado ou encolhido para o viewport. Aumentando\n
+    o zoom, só a área visível (:py:meth:`get_visible_area`) é mostrada.
+  """
+  def __init__(self, world_size: tuple[int, int], viewport_size: tuple[int, int] | None = None, max_zoom: float = MAX_ZOOM):
+    self.world_width, self.world_height = world_size
+    # Sem o tamanho do viewport, ele tem o mesmo tamanho do mundo
+    self.viewport_width, self.viewport_height = viewport_size or world_size
+    self.max_zoom = max(max_zoom, MIN_ZOOM)
+
+    self.zoom = MIN_ZOOM
+    self.center_x = self.world_width / 2
+    self.center_y = self.world_height / 2
+
+    self.visible_area = self.__calc_visible_area()
+
+  def __calc_visible_area(self) -> pygame.Rect:
+    width = max(1, round(self.world_width / self.zoom))
+    height = max(1, round(self.world_height / self.zoom))
+
+    left = min(max(round(self.center_x - width / 2), 0), self.world_width - width)
+    top = min(max(round(self.center_y - height / 2), 0), self.world_height - height)
+
+    return pygame.Rect(left, top, width, height)
+
+  def __update(self):
+    # Não deixa a câmera mostrar nada fora do mundo
+    half_width = self.world_width / self.zoom / 2
+    half_height = self.world_height / self.zoom / 2
+    self.center_x = min(max(self.center_x, half_width), self.world_width - half_width)
+    self.center_y = min(max(self.center_y, half_height), self.world_height - half_height)
+
+    self.visible_area = self.__calc_visible_area()
+
+  def get_visible_area(self) -> pygame.Rect:
+    """
+      Retorna a área do mundo que está visível, em pixels do mundo.
+    """
+    return self.visible_area
+
+  def is_zoomed(self) -> bool:
+    return self.zoom > MIN_ZOOM
+
+  def zoom_by(self, factor: float, anchor: tuple[float, float] | None = None):
+    """
+      Multiplica o zoom pelo fator. O ponto do mundo `anchor` continua\n
+      no mesmo lugar do viewport (ex.: o ponto embaixo do mouse).
+    """
+    zoom = min(max(self.zoom * factor, MIN_ZOOM), self.max_zoom)
+    if zoom == self.zoom:
+      return
+
+    if anchor is None:
+      anchor = (self.center_x, self.center_y)
+
+    anchor_x, anchor_y = anchor
+
+    # Posição relativa do ponto dentro da área visível, de 0 até 1
+    relative_x = (anchor_x - (self.center_x - self.world_width / self.zoom / 2)) / (self.world_width / self.zoom)
+    relative_y = (anchor_y - (self.center_y - self.world_height / self.zoom / 2)) / (self.world_height / self.zoom)
+
+    self.zoom = zoom
+    self.center_x = anchor_x - (relative_x - 0.5) * self.world_width / zoom
+    self.center_y = anchor_y - (relative_y - 0.5) * self.world_height / zoom
+    self.__update()
+
+  def pan_by(self, offset: tuple[float, float]):
+    """
+      Move a câmera. O deslocamento é em pixels do viewport.
+    """
+    offset_x, offset_y = offset
+    self.center_x += offset_x * self.world_width / (self.zoom * self.viewport_width)
+    self.center_y += offset_y * self.world_height / (self.zoom * self.viewport_height)
+    self.__update()
+
+  def center_on(self, position: tuple[float, float]):
+    """
+      Centraliza a câmera no ponto do mundo, sem mudar o zoom.
+    """
+    self.center_x, self.center_y = position
+    self.__update()
+
+  def reset(self):
+    self.zoom = MIN_ZOOM
+    self.__update()
+
+  def viewport_to_world(self, position: tuple[int, int], viewport: pygame.Rect) -> tuple[float, float]:
+    """
+      Converte uma posição da tela, dentro do viewport, para\n
+      a posição correspondente no mundo.
+    """
+    position_x, position_y = position
+    area = self.visible_area
+
+    return (
+      area.left + (position_x - viewport.left) * area.width / viewport.width,
+      area.top + (position_y - viewport.top) * area.height / viewport.height
+    )
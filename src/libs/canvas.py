@@ -0,0 +1,141 @@
+import math
+import pygame
+
+# Eventos que carregam uma posição do mouse (e, no caso do movimento,
+# o deslocamento) que precisa ser convertida para a tela lógica
+MOUSE_POSITION_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+def parse_resolution(value: str) -> tuple[int, int]:
+  """
+    Converte uma resolução no formato "LARGURAxALTURA" (ex.: "1280x720").
+  """
+  try:
+    width, height = (int(part) for part in value.lower().split("x"))
+  except ValueError:
+    raise SystemExit(f"Resolução inválida: {value} (use o formato LARGURAxALTURA, ex.: 1920x1080).")
+
+  if width <= 0 or height <= 0:
+    raise SystemExit(f"Resolução inválida: {value}.")
+
+  return (width, height)
+
+class Canvas:
+  """
+    Tela lógica de tamanho fixo em que todas as cenas são desenhadas.\n
+    Ela é redimensionada uma única vez, na hora de mostrar o frame,\n
+    para caber na janela (mantendo a proporção, com barras pretas\n
+    nas sobras). As posições do mouse são convertidas de volta para\n
+    as coordenadas da tela lógica.
+  """
+  def __init__(self, window: pygame.Surface, size: tuple[int, int]):
+    self.surface = pygame.Surface(size).convert()
+    self.resize(window)
+
+  def resize(self, window: pygame.Surface):
+    """
+      Encaixa a tela lógica em uma janela nova (ex.: depois de a janela\n
+      ser redimensionada). A tela lógica continua do mesmo tamanho.
+    """
+    self.window = window
+
+    window_w, window_h = window.get_size()
+    width, height = self.surface.get_size()
+
+    self.scale = min(window_w / width, window_h / height)
+    self.target_rect = pygame.Rect(0, 0, round(width * self.scale), round(height * self.scale))
+    self.target_rect.center = window.get_rect().center
+
+    # O `pygame.transform.scale` escreve direto na janela, sem criar uma superfície por frame
+    self.target = window.subsurface(self.target_rect)
+
+    # Menor bloco da tela lógica (em cada eixo) que vira um número inteiro
+    # de pixels da janela. Uma área alinhada a esses blocos é redimensionada
+    # exatamente como ficaria se a tela lógica fosse redimensionada inteira
+    width_divisor = math.gcd(width, self.target_rect.width)
+    height_divisor = math.gcd(height, self.target_rect.height)
+    self.source_block = (width // width_divisor, height // height_divisor)
+    self.target_block = (self.target_rect.width // width_divisor, self.target_rect.height // height_divisor)
+
+    window.fill("black")
+    pygame.display.flip()
+
+    # A janela nova ainda não mostra nada da tela lógica
+    self.needs_full_present = True
+
+  def to_canvas(self, position: tuple[int, int]) -> tuple[int, int]:
+    """
+      Converte uma posição da janela para a tela lógica.
+    """
+    x = (position[0] - self.target_rect.x) / self.scale
+    y = (position[1] - self.target_rect.y) / self.scale
+
+    width, height = self.surface.get_size()
+    return (min(max(int(x), 0), width - 1), min(max(int(y), 0), height - 1))
+
+  def get_mouse_pos(self) -> tuple[int, int]:
+    return self.to_canvas(pygame.mouse.get_pos())
+
+  def translate_events(self, events: list[pygame.event.Event]) -> list[pygame.event.Event]:
+    """
+      Retorna os eventos com as posições do mouse convertidas para a tela lógica.
+    """
+    translated_events = []
+    for event in events:
+      if event.type not in MOUSE_POSITION_EVENTS:
+        translated_events.append(event)
+        continue
+
+      attributes = dict(event.dict)
+      attributes["pos"] = self.to_canvas(event.pos)
+      if "rel" in attributes:
+        attributes["rel"] = (round(event.rel[0] / self.scale), round(event.rel[1] / self.scale))
+
+      translated_events.append(pygame.event.Event(event.type, attributes))
+
+    return translated_events
+
+  def __align_rect(self, rect: pygame.Rect) -> tuple[pygame.Rect, pygame.Rect]:
+    """
+      Expande uma área da tela lógica até os blocos que viram pixels\n
+      inteiros da janela e retorna ela junto com a área da janela\n
+      (relativa a `self.target`) que ela ocupa.
+    """
+    block_w, block_h = self.source_block
+    target_block_w, target_block_h = self.target_block
+    rect = rect.clip(self.surface.get_rect())
+
+    left, top = rect.left // block_w, rect.top // block_h
+    right, bottom = -(-rect.right // block_w), -(-rect.bottom // block_h)
+
+    source_rect = pygame.Rect(left * block_w, top * block_h, (right - left) * block_w, (bottom - top) * block_h)
+    target_rect = pygame.Rect(
+      left * target_block_w, top * target_block_h,
+      (right - left) * target_block_w, (bottom - top) * target_block_h
+    )
+    return (source_rect, target_rect)
+
+  def present(self, dirty_rects: list[pygame.Rect]):
+    """
+      Redimensiona para a janela só as áreas da tela lógica que mudaram\n
+      (ou a tela inteira, depois de a janela mudar) e mostra essas áreas.
+    """
+    if self.needs_full_present:
+      self.needs_full_present = False
+      pygame.transform.scale(self.surface, self.target_rect.size, self.target)
+      pygame.display.update(self.target_rect)
+      return
+
+    window_rects = []
+    for rect in dirty_rects:
+      source_rect, target_rect = self.__align_rect(rect)
+      if not source_rect.width or not source_rect.height:
+        continue
+
+      # Cada área é redimensionada direto na parte da janela que ela ocupa
+      pygame.transform.scale(
+        self.surface.subsurface(source_rect), target_rect.size, self.target.subsurface(target_rect)
+      )
+      window_rects.append(target_rect.move(self.target_rect.topleft))
+
+    if window_rects:
+      pygame.display.update(window_rects)
@@ -0,0 +1,84 @@
+from typing import Callable
+from libs.utils import get_time
+
+class Clock:
+  """
+    Relógio usado pelas animações, timers e esperas do jogo.\n
+    Ele segue o relógio pai (ou a fonte de tempo de `libs.utils`,\n
+    no relógio principal), mas pode ser pausado e acelerado ou\n
+    desacelerado com `time_scale`. Pausar ou mudar a escala de um\n
+    relógio também vale para todos os relógios filhos dele.
+  """
+  def __init__(self, parent: "Clock | None" = None, source: Callable[[], float] | None = None):
+    self.parent = parent
+    # Fonte própria do relógio principal (ex.: um tempo controlado manualmente
+    # em um benchmark). Sem ela, é usada a fonte de `libs.utils`
+    self.source = source
+
+    self._paused = False
+    self._time_scale = 1.0
+
+    # Tempo do relógio e da referência (pai ou fonte) na última pausa ou mudança de escala
+    self._base_time = 0.0
+    self._base_reference = self.__get_reference_time()
+
+  def __get_reference_time(self) -> float:
+    if self.parent:
+      return self.parent.get_time()
+
+    return self.source() if self.source else get_time()
+
+  def __rebase(self):
+    self._base_time = self.get_time()
+    self._base_reference = self.__get_reference_time()
+
+  def get_time(self) -> float:
+    """
+      Retorna o tempo atual do relógio, em segundos.
+    """
+    if self._paused:
+      return self._base_time
+
+    return self._base_time + (self.__get_reference_time() - self._base_reference) * self._time_scale
+
+  def pause(self):
+    if self._paused:
+      return
+
+    self.__rebase()
+    self._paused = True
+
+  def resume(self):
+    if not self._paused:
+      return
+
+    self._base_reference = self.__get_reference_time()
+    self._paused = False
+
+  def sync(self):
+    """
+      Mantém o tempo atual do relógio depois que a fonte de tempo\n
+      muda (ex.: no início da reprodução de uma gravação).
+    """
+    if not self._paused:
+      self._base_reference = self.__get_reference_time()
+
+  @property
+  def paused(self) -> bool:
+    return self._paused
+
+  @property
+  def time_scale(self) -> float:
+    return self._time_scale
+
+  @time_scale.setter
+  def time_scale(self, time_scale: float):
+    if time_scale <= 0:
+      raise SystemExit(f"A escala de tempo precisa ser maior que 0: {time_scale}.")
+
+    self.__rebase()
+    self._time_scale = time_scale
+
+# Relógio principal do jogo. Os relógios das cenas são filhos dele, então
+# pausar ou mudar a escala dele vale para o jogo inteiro
+MAIN_CLOCK = Clock()
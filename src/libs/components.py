@@ -1,11 +1,15 @@
 import pygame
-from libs.utils import clip_sprites, get_font, load_image, load_sound, MOUSE_LEFT_BUTTON, sum_tuples, multiply_tuple_by_scalar
+from libs.utils import get_font, load_sound, load_sprites, MOUSE_LEFT_BUTTON, sum_tuples, multiply_tuple_by_scalar, get_mouse_pos
+from libs.clock import Clock, MAIN_CLOCK
 from typing import Callable, Union
 import sys
 from enum import Enum
-from timeit import default_timer as timer
 import math
 
+# Estado de desenho dos componentes que mudam a cada frame (ex.: animações).
+# Eles são desenhados de novo em todos os frames.
+ALWAYS_DIRTY = object()
+
 class Alignment(Enum):
   LEFT = 0,
   CENTER = 1,
@@ -87,14 +91,9 @@ class SpriteSource():
 
       # Lista com strings que se refere a um diretório
       elif list_type == str:
-        temp_image = load_image(*source)
-
-        if self.has_sprite_size():
-          self.sprites = clip_sprites(temp_image, sprite_size, scale_by_size)
-          self.source_type = SpriteSourceType.PATH_SPRITE_LIST
-        else:
-          self.sprites.append(temp_image if not self.has_scale_by_size() else pygame.transform.scale_by(temp_image, self.scale_by_size))
-          self.source_type = SpriteSourceType.PATH_SPRITE
+        # Os sprites de um mesmo arquivo, tamanho e escala só são carregados uma vez
+        self.sprites = load_sprites(source, sprite_size, scale_by_size)
+        self.source_type = SpriteSourceType.PATH_SPRITE_LIST if self.has_sprite_size() else SpriteSourceType.PATH_SPRITE
 
     if self.has_disabled_sprite():
       if len(self.sprites) < 2:
@@ -194,6 +193,90 @@ class Component():
     self.pressed = False
     self.hovered = False
 
+    # Indica se o componente pode ser desenhado mais de uma vez no mesmo frame,
+    # cada vez com um recorte diferente, sem mudar nada nele (o desenho dele
+    # não tem animações ou lógica de jogo)
+    self._stateless_draw = False
+
+    # Área e estado da última vez que o componente foi desenhado
+    self._drawn_area: pygame.Rect | None = None
+    self._drawn_state = None
+
+  def step(self, dt: float):
+    """
+      Avança a lógica do componente (animações, movimento, etc.) em\n
+      um passo de tempo fixo de `dt` segundos. Pode ser chamado várias\n
+      vezes, ou nenhuma, em um frame, dependendo do tempo que passou.
+    """
+    pass
+
+  def interpolate(self, alpha: float):
+    """
+      Recebe quanto do próximo passo de lógica já passou (de 0 a 1),\n
+      para desenhar o componente entre o passo anterior e o atual.\n
+      É chamado uma vez por frame, antes de `update`.
+    """
+    pass
+
+  def update(self):
+    """
+      Atualiza o estado do componente (textos, etc.) que depende\n
+      de outros objetos. É chamado uma vez por frame, antes de saber\n
+      o que vai ser desenhado.
+    """
+    pass
+
+  def close(self):
+    """
+      Libera os recursos do componente (ex.: threads e funções registradas\n
+      no jogo) quando ele deixa de ser usado, como quando o layout da cena\n
+      é refeito.
+    """
+    pass
+
+  def get_area(self) -> pygame.Rect | None:
+    """
+      Retorna a área da tela em que o componente desenha. `None`\n
+      indica que ela não é conhecida, e a tela inteira é desenhada\n
+      de novo a cada frame.
+    """
+    return None
+
+  def get_draw_state(self):
+    """
+      Retorna tudo o que muda a aparência do componente. Quando o\n
+      estado muda, a área dele é desenhada de novo.
+    """
+    return ALWAYS_DIRTY
+
+  def get_dirty_rects(self) -> list[pygame.Rect] | None:
+    """
+      Retorna as áreas da tela que mudaram desde a última vez que o\n
+      componente foi desenhado: a área antiga e a nova, caso o estado\n
+      ou a área tenham mudado. `None` indica que a tela inteira mudou.\n
+      É chamado uma vez por frame, antes de desenhar.
+    """
+    state = self.get_draw_state()
+    area = self.get_area()
+    if area is None:
+      return None
+
+    drawn_area, drawn_state = self._drawn_area, self._drawn_state
+    self._drawn_area, self._drawn_state = area.copy(), state
+
+    if state is ALWAYS_DIRTY or state != drawn_state or area != drawn_area:
+      return [rect for rect in (drawn_area, area) if rect is not None]
+
+    return []
+
+  def get_time_until_change(self) -> float | None:
+    """
+      Retorna o tempo, em segundos, até o componente mudar sozinho,\n
+      sem nenhum evento de entrada. `0` indica que ele muda a cada\n
+      frame (animações) e `None` que ele só muda com eventos.
+    """
+    return 0 if self.get_draw_state() is ALWAYS_DIRTY else None
+
   def is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]) -> bool:
     """
       Verifica se o par ordenado que sere refere à posição do\n
@@ -238,6 +321,14 @@ class Component():
   def interactable(self) -> bool:
     return self._interactable
 
+  @property
+  def stateless_draw(self) -> bool:
+    return self._stateless_draw
+
+  @property
+  def drawn_area(self) -> pygame.Rect | None:
+    return self._drawn_area
+
   @property
   def animated(self) -> bool:
     return self._animated
@@ -252,6 +343,12 @@ class ComponentManager:
   def __init__(self):
     self._components: list[Component] = []
 
+    # Na primeira vez a tela inteira é desenhada
+    self.needs_full_redraw = True
+
+    # Quanto do próximo passo de lógica já passou, usado para desenhar entre os passos
+    self.interpolation = 1.0
+
   @property
   def components(self) -> list[Component]:
     return self._components
@@ -272,10 +369,116 @@ class ComponentManager:
     else:
       sys.exit(f"A função de remoção não suporta o tipo especificado: {variable_type}.")
 
+  def clear(self):
+    """
+      Fecha e remove todos os componentes (ex.: antes de refazer o layout da cena).
+    """
+    for component in self._components:
+      component.close()
+
+    self._components.clear()
+    self.needs_full_redraw = True
+
   def draw_all(self, screen: pygame.Surface):
     for component in self._components:
       component.draw(screen)
 
+  def step(self, dt: float):
+    for component in self._components:
+      component.step(dt)
+
+  def invalidate(self):
+    """
+      Faz a tela inteira ser desenhada de novo no próximo frame\n
+      (ex.: quando a cena volta a ser mostrada).
+    """
+    self.needs_full_redraw = True
+
+  def __merge_dirty_rects(self, dirty_rects: list[pygame.Rect], screen_rect: pygame.Rect) -> list[pygame.Rect]:
+    """
+      Junta as áreas que se sobrepõem. As áreas que encostam em um mesmo\n
+      componente que não pode ser desenhado mais de uma vez também são\n
+      juntadas, para que ele seja desenhado uma única vez no frame.
+    """
+    rects = [rect.clip(screen_rect) for rect in dirty_rects]
+    rects = [rect for rect in rects if rect.width > 0 and rect.height > 0]
+
+    areas = [component.drawn_area for component in self._components if not component.stateless_draw and component.drawn_area]
+
+    merged = True
+    while merged:
+      merged = False
+
+      for index, rect in enumerate(rects):
+        colliding = rect.collidelistall(rects)
+        if len(colliding) > 1:
+          rects = [other for other_index, other in enumerate(rects) if other_index not in colliding] + [rect.unionall([rects[other_index] for other_index in colliding])]
+          merged = True
+          break
+
+      if merged:
+        continue
+
+      for area in areas:
+        colliding = area.collidelistall(rects)
+        if len(colliding) > 1:
+          rects = [other for other_index, other in enumerate(rects) if other_index not in colliding] + [rects[colliding[0]].unionall([rects[other_index] for other_index in colliding])]
+          merged = True
+          break
+
+    return rects
+
+  def draw_dirty(self, screen: pygame.Surface, background: pygame.Surface) -> list[pygame.Rect]:
+    """
+      Desenha só as áreas da tela que mudaram: o fundo é restaurado\n
+      nelas e os componentes que encostam nelas são desenhados de novo,\n
+      recortados por elas. Retorna as áreas para serem mostradas com\n
+      `pygame.display.update`.
+    """
+    screen_rect = screen.get_rect()
+
+    dirty_rects = []
+    full_redraw = self.needs_full_redraw
+    for component in self._components:
+      component.interpolate(self.interpolation)
+      component.update()
+      component_dirty_rects = component.get_dirty_rects()
+
+      if component_dirty_rects is None:
+        full_redraw = True
+      else:
+        dirty_rects.extend(component_dirty_rects)
+
+    if full_redraw:
+      self.needs_full_redraw = False
+      screen.blit(background, (0, 0))
+      self.draw_all(screen)
+      return [screen_rect]
+
+    dirty_rects = self.__merge_dirty_rects(dirty_rects, screen_rect)
+
+    for rect in dirty_rects:
+      screen.set_clip(rect)
+      screen.blit(background, rect.topleft, rect)
+
+      for component in self._components:
+        if component.drawn_area.colliderect(rect):
+          component.draw(screen)
+
+    screen.set_clip(None)
+    return dirty_rects
+
+  def get_time_until_change(self) -> float | None:
+    """
+      Retorna o tempo, em segundos, até algum componente mudar sozinho.\n
+      `None` indica que a cena só muda com eventos de entrada.
+    """
+    if self.needs_full_redraw:
+      return 0
+
+    times = [time for time in (component.get_time_until_change() for component in self._components) if time is not None]
+    return min(times) if times else None
+
   def __filter_all_mouse_interacted_components(self, mouse_pos: tuple[int, int]) -> list[tuple[int, Component]]:
     return [(index, component) for index, component in enumerate(self._components) if component.is_mouse_within_bounding_box(mouse_pos) and not component.disabled]
 
@@ -305,7 +508,7 @@ class ComponentManager:
         # TODO: adicionar o sistema de componente desativado para todos os componentes(não só botões) e pular iteração caso eles estejam desativado
         # Cuida da hierarquia dos clicks e previne um botão que esteja
         # debaixo de outro, que esteja em foco, seja clicado.
-        mouse_interacted_components = self.__filter_all_mouse_interacted_components(pygame.mouse.get_pos())
+        mouse_interacted_components = self.__filter_all_mouse_interacted_components(get_mouse_pos())
 
         # Isso permite que componentes interativos que não estejam em área de click
         # tenha seus estados atualizados também.
@@ -339,6 +542,7 @@ class Text(Component):
     background_scale_by_size: tuple[int, int] = None,
   ):
     super().__init__(position, alignment)
+    self._stateless_draw = True
     self._text = text
     self.text_size = text_size
     self.text_color = text_color
@@ -374,10 +578,8 @@ class Text(Component):
       # Coloca o fundo do objeto no tamanho especificado e
       # deixa o meio do retângulo dele no mesmo lugar da
       # posição informada pelo constructor da classe
-      self.background = load_image(*self.background_file_name)
-
-      if self.__has_background_scale_by_size():
-        self.background = pygame.transform.scale_by(self.background, self.background_scale_by_size)
+      background_scale_by_size = self.background_scale_by_size if self.__has_background_scale_by_size() else None
+      self.background = load_sprites(self.background_file_name, scale_by_size=background_scale_by_size)[0]
 
       self.background_rect = self.background.get_rect()
       align_rect(self.background_rect, self.alignment, self.position)
@@ -414,6 +616,15 @@ class Text(Component):
     self._text_offset = new_text_offset
     self.__setup()
 
+  def get_area(self) -> pygame.Rect:
+    if self.__has_background():
+      return self.background_rect.union(self.text_object_rect)
+
+    return self.text_object_rect
+
+  def get_draw_state(self):
+    return self._text
+
   def draw(self, screen: pygame.surface.Surface):
     if self.__has_background():
       screen.blit(self.background, self.background_rect.topleft)
@@ -436,6 +647,7 @@ class SpriteButton(Component):
     super().__init__(position, alignment, on_click, on_hover)
     self._interactable = True
     self._animated = True
+    self._stateless_draw = True
     # Lógica específica do botão
     self.clicked_up = False
 
@@ -457,6 +669,12 @@ class SpriteButton(Component):
   def is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
     return self.sprite_rect.collidepoint(mouse_pos)
 
+  def get_area(self) -> pygame.Rect:
+    return self.sprite_rect
+
+  def get_draw_state(self):
+    return (self.sprite_index, self.disabled)
+
   def draw(self, screen: pygame.surface.Surface):
     # Renderiza o botão na tela, tendo o seu meio
     # posto como a posição passada no argumento
@@ -512,7 +730,7 @@ class SpriteButton(Component):
 
   def animate(self, animation_reset: bool = False):
     # Se o mouse está em cima do botão
-    self.hovered = self.is_mouse_within_bounding_box(pygame.mouse.get_pos())
+    self.hovered = self.is_mouse_within_bounding_box(get_mouse_pos())
 
     if not self._animated or not self.sprite_source.has_multiple_sprites():
       return
@@ -603,6 +821,7 @@ class Counter(Component):
   ):
     super().__init__(position, on_click=on_click)
     self._interactable = True
+    self._stateless_draw = True
 
     self.min_value = min_value
     self.max_value = max_value
@@ -677,6 +896,12 @@ class Counter(Component):
   def is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
     return self.decrease_button.is_mouse_within_bounding_box(mouse_pos) or self.increase_button.is_mouse_within_bounding_box(mouse_pos)
 
+  def get_area(self) -> pygame.Rect:
+    return self.text.get_area().unionall([self.decrease_button.get_area(), self.increase_button.get_area()])
+
+  def get_draw_state(self):
+    return (self.text.get_draw_state(), self.decrease_button.get_draw_state(), self.increase_button.get_draw_state())
+
   def draw(self, screen: pygame.surface.Surface):
     self.text.draw(screen)
     self.decrease_button.draw(screen)
@@ -715,6 +940,7 @@ class Dropdown(Component):
     super().__init__(position, on_click=on_click)
     self._expandable = True
     self._interactable = True
+    self._stateless_draw = True
 
     self.sprite_source = sprite_source
     self.items = items
@@ -782,11 +1008,21 @@ class Dropdown(Component):
     else:
       return self.__is_mouse_within_bounds_of_display(mouse_pos)
 
+  def get_area(self) -> pygame.Rect:
+    if self._expanded:
+      return self.display_object_rect.unionall([option_object_rect for _, _, _, option_object_rect, _, _ in self.options_objects])
+
+    return self.display_object_rect
+
+  def get_draw_state(self):
+    hovered_index = self.__is_mouse_within_bounds_of_options(get_mouse_pos())[1] if self._expanded else -1
+    return (self._expanded, self.selected_index, hovered_index)
+
   def draw(self, screen: pygame.surface.Surface):
     screen.blit(self.display_object, self.display_object_rect.topleft)
     screen.blit(self.display_object_text, self.display_object_text_rect.topleft)
 
-    is_hovered, hovered_index = self.__is_mouse_within_bounds_of_options(pygame.mouse.get_pos())
+    is_hovered, hovered_index = self.__is_mouse_within_bounds_of_options(get_mouse_pos())
     if self._expanded:
       for index, option_object, option_object_selected, option_object_rect, option_object_text, option_object_text_rect in self.options_objects:
         screen.blit(option_object_selected if is_hovered and hovered_index == index else option_object, option_object_rect.topleft)
@@ -853,6 +1089,7 @@ class Image(Component):
   ):
     super().__init__(position, alignment, on_click)
     self._interactable = True
+    self._stateless_draw = True
 
     self.sprite_source = sprite_source
 
@@ -880,6 +1117,12 @@ class Image(Component):
   def set_use_flip(self, use_flip):
     self.use_flip = use_flip
 
+  def get_area(self) -> pygame.Rect:
+    return self.image_object_rect
+
+  def get_draw_state(self):
+    return (self.use_flip, self.flip_rule)
+
   def draw(self, screen):
     selected_sprite = self.sprite_source.first_sprite()
     drawn_sprite = pygame.transform.flip(selected_sprite, self.flip_rule[0], self.flip_rule[1]) if self.use_flip else selected_sprite
@@ -898,7 +1141,8 @@ class AnimatedImage(Image):
   """
     Cria uma animação, a partir da classe :py:class:`Image`, com sprites fornecidos.\n
     A animação será executada até que seja desativada.\n
-    A animação será reiniciada automaticamente após completar uma volta.
+    A animação será reiniciada automaticamente após completar uma volta.\n
+    A velocidade é dada em sprites por segundo, independente do fps.
   """
   def __init__(
     self,
@@ -906,12 +1150,36 @@ class AnimatedImage(Image):
     sprite_source: SpriteSource,
     alignment: Alignment = Alignment.CENTER,
     flip_rule: tuple[bool, bool] = None,
-    on_click: Callable[[], None] = None
+    on_click: Callable[[], None] = None,
+    frames_per_second: float = 60
   ):
     super().__init__(position, sprite_source, alignment, flip_rule, on_click)
     self.sprite_index = 0
     self.disabled = False
 
+    self.frames_per_second = frames_per_second
+    # Tempo que já passou no sprite atual
+    self.frame_time = 0.0
+
+  def step(self, dt: float):
+    if self.disabled:
+      return
+
+    self.frame_time += dt
+    frame_duration = 1 / self.frames_per_second
+    while self.frame_time >= frame_duration:
+      self.frame_time -= frame_duration
+      self.sprite_index = (self.sprite_index + 1) % self.sprite_source.sprite_count
+
+  def get_draw_state(self):
+    if self.disabled:
+      return (self.use_flip, self.flip_rule, self.disabled)
+
+    return (self.use_flip, self.flip_rule, self.sprite_index)
+
+  def get_time_until_change(self) -> float | None:
+    return None if self.disabled else 0
+
   def draw(self, screen):
     if self.disabled:
       if self.sprite_source.has_disabled_sprite():
@@ -922,15 +1190,11 @@ class AnimatedImage(Image):
     selected_sprite = self.sprite_source.sprites[self.sprite_index]
     drawn_sprite = pygame.transform.flip(selected_sprite, self.flip_rule[0], self.flip_rule[1]) if self.use_flip else selected_sprite
     screen.blit(drawn_sprite, self.image_object_rect.topleft)
-    if self.sprite_index < self.sprite_source.sprite_count - 1:
-      self.sprite_index += 1
-    else:
-      self.sprite_index = 0
 
 class Timer(Component):
   """
     Cria um timer que irá realizar uma contagem de 1 em 1 segundo\n
-    a partir do 0.
+    a partir do 0, no relógio fornecido (o da cena, normalmente).
   """
   def __init__(
     self,
@@ -939,14 +1203,17 @@ class Timer(Component):
     text_color: pygame.Color,
     text_offset: tuple[int, int] = None,
     alignment: Alignment = Alignment.CENTER,
+    clock: Clock = None,
   ):
     super().__init__(position, alignment)
     self.text_size = text_size
     self.text_color = text_color
     self.text_offset = text_offset
 
+    self._stateless_draw = True
     self.text = Text(position, "", text_size, text_color, text_offset, alignment)
-    self.initial_time = timer()
+    self.clock = clock if clock else MAIN_CLOCK
+    self.initial_time = self.clock.get_time()
 
   def __format_seconds(self, time_in_seconds: float):
     sec = time_in_seconds % 60
@@ -975,8 +1242,33 @@ class Timer(Component):
 
     return formatted_str
 
+  def get_elapsed_time(self) -> float:
+    """
+      Retorna o tempo, em segundos, desde o início do timer.
+    """
+    return self.clock.get_time() - self.initial_time
+
+  def set_elapsed_time(self, elapsed_time: float):
+    """
+      Faz o timer continuar a contagem a partir do tempo fornecido, em segundos.
+    """
+    self.initial_time = self.clock.get_time() - elapsed_time
+
+  def get_area(self) -> pygame.Rect:
+    return self.text.get_area()
+
+  def update(self):
+    # O texto só é gerado de novo quando o segundo mostrado muda
+    formatted_time = self.__format_seconds(self.get_elapsed_time())
+    if formatted_time != self.text.text:
+      self.text.text = formatted_time
+
+  def get_draw_state(self):
+    return self.text.text
+
+  def get_time_until_change(self) -> float:
+    # O texto muda na virada de cada segundo
+    return 1 - self.get_elapsed_time() % 1
+
   def draw(self, screen: pygame.Surface):
-    current_time = timer()
-    elapsed_time_in_seconds = current_time - self.initial_time
-    self.text.text = self.__format_seconds(elapsed_time_in_seconds)
     self.text.draw(screen)
@@ -0,0 +1,228 @@
+import glob
+import math
+import time
+import pygame
+
+# Modos do limitador de frames:
+# - uncapped: sem limite (benchmarks);
+# - vsync: quem limita é a sincronia vertical da tela (`pygame.SCALED` com vsync);
+# - fixed: limita para uma taxa fixa (ex.: 60, 120 ou 144 para acompanhar a tela);
+# - adaptive: como o fixed, mas baixa a taxa quando não há entrada por um tempo ou na bateria.
+FRAME_LIMIT_MODES = ("uncapped", "vsync", "fixed", "adaptive")
+
+DEFAULT_FRAME_LIMIT_MODE = "fixed"
+DEFAULT_FPS = 60
+
+# No modo adaptive, taxa usada depois de ADAPTIVE_IDLE_TIME segundos sem
+# eventos de entrada, ou enquanto o computador está na bateria
+ADAPTIVE_IDLE_FPS = 30
+ADAPTIVE_IDLE_TIME = 2.0
+
+# Intervalo, em segundos, entre as leituras do estado da bateria
+BATTERY_CHECK_INTERVAL = 5.0
+
+# Antes do prazo do frame, o limitador dorme até faltar esse tempo e espera o resto
+# ativamente, pois o `time.sleep` pode acordar alguns milissegundos atrasado. No
+# modo adaptive, que economiza energia, ele só dorme e aceita esse atraso.
+SPIN_MARGIN = 0.002
+
+# Eventos que contam como entrada do usuário (teclado, mouse e toque) para o
+# modo adaptive. Os outros (ex.: da janela, do áudio ou os eventos do jogo)
+# não fazem ele voltar para a taxa cheia.
+INPUT_EVENTS = frozenset({
+  pygame.KEYDOWN,
+  pygame.KEYUP,
+  pygame.TEXTINPUT,
+  pygame.MOUSEMOTION,
+  pygame.MOUSEBUTTONDOWN,
+  pygame.MOUSEBUTTONUP,
+  pygame.MOUSEWHEEL,
+  pygame.FINGERDOWN,
+  pygame.FINGERUP,
+  pygame.FINGERMOTION,
+  pygame.MULTIGESTURE
+})
+
+# Um frame que termina depois do prazo mais essa tolerância conta como prazo perdido
+MISSED_DEADLINE_TOLERANCE = 0.001
+
+def is_on_battery() -> bool:
+  """
+    Retorna True se o computador está rodando na bateria. Só é\n
+    possível descobrir isso no Linux (pelo `/sys/class/power_supply`),\n
+    nos outros sistemas retorna sempre False.
+  """
+  mains_online = []
+  for path in glob.glob("/sys/class/power_supply/*"):
+    try:
+      with open(f"{path}/type", "r", encoding="utf-8") as file:
+        supply_type = file.read().strip()
+
+      if supply_type != "Mains":
+        continue
+
+      with open(f"{path}/online", "r", encoding="utf-8") as file:
+        mains_online.append(file.read().strip() == "1")
+    except OSError:
+      continue
+
+  # Sem uma fonte de energia da tomada (ex.: um desktop sem essa informação), considera ligado nela
+  return len(mains_online) > 0 and not any(mains_online)
+
+class FramePacingStats:
+  """
+    Coleta o intervalo entre os frames mostrados e gera um resumo\n
+    com a variação (jitter) em relação ao intervalo alvo e a\n
+    quantidade de prazos perdidos.
+  """
+  def __init__(self):
+    self.intervals: list[float] = []
+    self.target_intervals: list[float] = []
+    self.missed_deadlines = 0
+
+  def add(self, interval: float, target_interval: float | None, missed_deadline: bool):
+    self.intervals.append(interval)
+    if target_interval is not None:
+      self.target_intervals.append(target_interval)
+
+    if missed_deadline:
+      self.missed_deadlines += 1
+
+  def summary(self) -> dict:
+    """
+      Retorna as métricas em milissegundos (exceto as quantidades e o fps).
+    """
+    if not self.intervals:
+      return {"frames": 0}
+
+    frames = len(self.intervals)
+    total_time = sum(self.intervals)
+    average = total_time / frames
+    jitter = math.sqrt(sum((interval - average) ** 2 for interval in self.intervals) / frames)
+
+    summary = {
+      "frames": frames,
+      "average_interval_ms": average * 1000,
+      "max_interval_ms": max(self.intervals) * 1000,
+      "jitter_ms": jitter * 1000,
+      "missed_deadlines": self.missed_deadlines,
+      "missed_deadlines_percent": self.missed_deadlines / frames * 100,
+      "fps": frames / total_time if total_time > 0 else 0.0
+    }
+
+    if len(self.target_intervals) == frames:
+      # Desvio médio de cada intervalo em relação ao alvo daquele frame
+      deviation = sum(abs(interval - target) for interval, target in zip(self.intervals, self.target_intervals)) / frames
+      summary["target_deviation_ms"] = deviation * 1000
+
+    return summary
+
+class FrameLimiter:
+  """
+    Controla o ritmo dos frames do loop principal. Ao contrário do\n
+    `pygame.time.Clock.tick`, os prazos são contados a partir do\n
+    prazo anterior (e não do fim do frame), então o atraso de um\n
+    frame não se acumula nos seguintes.
+  """
+  def __init__(self, mode: str = DEFAULT_FRAME_LIMIT_MODE, fps: int = DEFAULT_FPS):
+    if mode not in FRAME_LIMIT_MODES:
+      raise SystemExit(f"Modo de limite de frames inválido: {mode} (use um de: {', '.join(FRAME_LIMIT_MODES)}).")
+
+    if fps <= 0:
+      raise SystemExit(f"A taxa de frames precisa ser maior que 0: {fps}.")
+
+    self.mode = mode
+    self.fps = fps
+    self.stats = FramePacingStats()
+
+    self.last_frame_time: float | None = None
+    self.deadline: float | None = None
+
+    self.last_input_time = time.perf_counter()
+    self.on_battery = False
+    self.last_battery_check: float | None = None
+
+  def get_target_fps(self) -> int | None:
+    """
+      Retorna a taxa de frames alvo atual (None quando não há limite).
+    """
+    if self.mode == "uncapped":
+      return None
+
+    if self.mode == "adaptive":
+      now = time.perf_counter()
+      if self.last_battery_check is None or now - self.last_battery_check >= BATTERY_CHECK_INTERVAL:
+        self.on_battery = is_on_battery()
+        self.last_battery_check = now
+
+      if self.on_battery or now - self.last_input_time >= ADAPTIVE_IDLE_TIME:
+        return min(self.fps, ADAPTIVE_IDLE_FPS)
+
+    return self.fps
+
+  def notify_input(self, events: list[pygame.event.Event]):
+    """
+      Recebe os eventos do frame. Se algum for uma entrada do usuário\n
+      (`INPUT_EVENTS`), o modo adaptive volta para a taxa cheia.
+    """
+    if any(event.type in INPUT_EVENTS for event in events):
+      self.last_input_time = time.perf_counter()
+
+  def restart(self):
+    """
+      Recomeça a contagem dos prazos depois que o loop ficou parado\n
+      (ex.: esperando eventos), sem contar essa espera nas estatísticas.
+    """
+    self.last_frame_time = None
+    self.deadline = None
+
+  def __wait_until(self, deadline: float):
+    remaining = deadline - time.perf_counter()
+
+    if self.mode == "adaptive":
+      if remaining > 0:
+        time.sleep(remaining)
+      return
+
+    if remaining > SPIN_MARGIN:
+      time.sleep(remaining - SPIN_MARGIN)
+
+    # O `time.sleep(0)` cede o processador para as outras threads enquanto espera
+    while time.perf_counter() < deadline:
+      time.sleep(0)
+
+  def tick(self):
+    """
+      Espera o prazo do frame atual (de acordo com o modo) e\n
+      registra o intervalo desde o frame anterior.
+    """
+    target_fps = self.get_target_fps()
+    # No vsync, a espera já aconteceu ao mostrar o frame, então só mede
+    target_interval = 1 / target_fps if target_fps else None
+    missed_deadline = False
+
+    if target_interval is not None and self.mode != "vsync":
+      now = time.perf_counter()
+      deadline = (self.deadline if self.deadline is not None else now) + target_interval
+
+      if now > deadline + MISSED_DEADLINE_TOLERANCE:
+        # O frame passou do prazo: os próximos prazos são contados a
+        # partir de agora, ao invés de correr para recuperar o atraso
+        missed_deadline = True
+        deadline = now
+      else:
+        self.__wait_until(deadline)
+
+      self.deadline = deadline
+
+    now = time.perf_counter()
+    if self.last_frame_time is not None:
+      interval = now - self.last_frame_time
+
+      if self.mode == "vsync" and target_interval is not None:
+        # Sem acesso ao prazo da tela, um frame perdido é um que ocupou mais de um refresh e meio
+        missed_deadline = interval > target_interval * 1.5
+
+      self.stats.add(interval, target_interval, missed_deadline)
+
+    self.last_frame_time = now
@@ -1,16 +1,101 @@
-from libs.components import Alignment, Component, SpriteSource, Text, align_rect, SpriteButton, AnimatedImage
-from logic import Game, Player, Difficulty, Direction, EntityType
+from libs.components import ALWAYS_DIRTY, Alignment, Component, SpriteSource, Text, align_rect, SpriteButton, AnimatedImage
+from logic import Game, GameEvent, Entity, EntityType, Player, entity_sprites, Difficulty, MAX_TREASURES_WEIGHT, EMPTY_CELL, BOMB_CELL, TREASURE_CELL
 import pygame
 import sys
 from scene import SceneManager
-from libs.utils import AnimCursor, Anim, MOUSE_LEFT_BUTTON, load_sound
-import random
-from timeit import default_timer as timer
+from libs.camera import Camera, MAX_ZOOM, ZOOM_STEP
+from libs.utils import AnimCursor, Anim, MOUSE_LEFT_BUTTON, MOUSE_RIGHT_BUTTON, load_sound, lerp_sprites, blit_sequence, get_mouse_pos
+from libs.clock import Clock, MAIN_CLOCK
+from libs.scheduler import TaskScheduler
 import math
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+# Quantidade de casas em cada lado de um pedaço do mapa
+MAP_CHUNK_SIZE = 16
+# Nível mais reduzido dos pedaços. No nível k, o pedaço tem 1/2^k do tamanho do
+# mundo, e é usado quando a câmera encolhe o mapa 2^k vezes ou mais
+MAP_CHUNK_MAX_LEVEL = 4
+# Memória máxima usada pelas superfícies dos pedaços do mapa, em bytes
+MAP_CHUNK_MEMORY_BUDGET = 64 * 1024 * 1024
+# Quantidade de threads que montam os pedaços do mapa
+MAP_CHUNK_BUILDER_THREADS = min(4, os.cpu_count() or 1)
+# Cor mostrada no lugar de um pedaço enquanto ele ainda está sendo montado
+MAP_CHUNK_PLACEHOLDER_COLOR = (60, 90, 200, 120)
+# Quantidade de blits feitos em cada pedaço de tarefa ao montar adiantado os
+# pedaços do mapa que estão fora da câmera
+MAP_PREFETCH_BLITS_PER_SLICE = 64
+# Tamanho máximo de uma casa na tela, no zoom máximo, em relação ao tamanho
+# original do sprite do piso (em mapas grandes, o zoom máximo passa de MAX_ZOOM)
+MAP_MAX_TILE_SCALE = 4
+
+# Tempo, em segundos, que os diálogos de sorteio (primeiro jogador e dado)
+# mostram o resultado antes de fechar sozinhos
+DEFAULT_DIALOG_DURATION = 3
+
+# O mesmo tempo no modo turbo, em que um clique no diálogo também fecha ele
+TURBO_DIALOG_DURATION = 1
+
+# Velocidade do submarino no modo difícil, em colunas do mapa por segundo.
+# Medida pela largura das casas na tela, então ele passa por cada coluna no
+# mesmo tempo em qualquer tamanho de mapa, resolução ou zoom.
+SUBMARINE_COLUMNS_PER_SECOND = 1.7
+
+class MapChunkCache:
+  """
+    Guarda as superfícies dos pedaços do mapa, da usada há mais tempo\n
+    para a usada mais recentemente. Quando a memória passa do limite,\n
+    as usadas há mais tempo são descartadas.
+  """
+  def __init__(self, memory_budget: int):
+    self.memory_budget = memory_budget
+    self.memory_used = 0
+    self.surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+  def __get_surface_memory(self, surface: pygame.Surface) -> int:
+    return surface.get_pitch() * surface.get_height()
+
+  def get(self, key: tuple) -> pygame.Surface | None:
+    """
+      Retorna a superfície e marca ela como usada agora
+    """
+    surface = self.surfaces.get(key)
+    if surface is not None:
+      self.surfaces.move_to_end(key)
+
+    return surface
+
+  def peek(self, key: tuple) -> pygame.Surface | None:
+    """
+      Retorna a superfície sem mudar a ordem de uso
+    """
+    return self.surfaces.get(key)
+
+  def put(self, key: tuple, surface: pygame.Surface):
+    self.discard(key)
+    self.surfaces[key] = surface
+    self.memory_used += self.__get_surface_memory(surface)
+
+    # A superfície que acabou de entrar nunca é descartada
+    while self.memory_used > self.memory_budget and len(self.surfaces) > 1:
+      _, discarded_surface = self.surfaces.popitem(last=False)
+      self.memory_used -= self.__get_surface_memory(discarded_surface)
+
+  def discard(self, key: tuple):
+    surface = self.surfaces.pop(key, None)
+    if surface is not None:
+      self.memory_used -= self.__get_surface_memory(surface)
 
 class Map(Component):
   """
-    Cria o mapa do jogo
+    Cria o mapa do jogo. As casas são montadas sempre no tamanho\n
+    dos sprites do piso (o "mundo"), e a câmera estica ou encolhe a\n
+    parte visível dele para o tamanho do mapa na tela (`view_length`).\n
+    Assim as casas continuam legíveis com zoom em qualquer tamanho de mapa.
   """
 
   def __init__(
@@ -21,10 +106,18 @@ class Map(Component):
     players_source: SpriteSource,
     game: Game,
     gap: int = 0,
-    alignment: Alignment = Alignment.CENTER
+    alignment: Alignment = Alignment.CENTER,
+    scheduler: TaskScheduler = None,
+    view_length: int = None
   ):
     super().__init__(position, alignment)
     self._interactable = True
+    self._stateless_draw = True
+
+    # Com um agendador, os pedaços fora da câmera são montados adiantado, aos
+    # poucos, no tempo que sobra dos frames
+    self.scheduler = scheduler
+    self.prefetching = False
 
     self.tile_source = tile_source
     if not tile_source.get_real_sprite_width() == tile_source.get_real_sprite_height():
@@ -40,17 +133,18 @@ class Map(Component):
 
     self.game = game
     self.gap = gap
+    # Tamanho do lado do mapa na tela. Sem ele, o mapa inteiro aparece no tamanho do mundo
+    self.view_length = view_length
 
     # Carrega os sons do botão
     self.bomb_dying_sound = load_sound("components", "bomb_dying.ogg")
 
     self.__setup()
 
-  def __generate_map_surface(self) -> pygame.Surface:
+  def __get_map_surface_size(self) -> tuple[int, int]:
     """
-      Gera a superfície padrão do mapa
+      Retorna o tamanho do mundo, com as casas no tamanho do sprite do piso
     """
-
     map_size = self.game.map_size
 
     # É usado somente a largura pois ela tem o mesmo tamanho da altura
@@ -59,106 +153,736 @@ class Map(Component):
     # Equação: Ts = n(s+g) - g
     # Ela vai dar o tamanho do mapa, em uma direção, baseado no número de pisos e no espaço de sobra("gap")
     # Ts("total size") = tamanho do mapa, n("number of tiles") = número de pisos , s("size") = tamanho do sprite, g("gap") = espaço de sobra
-    map_surface_size = (map_size * (sprite_size + self.gap) - self.gap, map_size * (sprite_size + self.gap) - self.gap)
+    map_surface_length = map_size * (sprite_size + self.gap) - self.gap
+    return (map_surface_length, map_surface_length)
 
-    # Ao adicionar a flag SCRALPHA, o pygame nos permite a fazer blit levando em conta
-    # a opacidade do sprite
-    map_surface = pygame.Surface(map_surface_size, pygame.SRCALPHA)
+  def get_map_size(self) -> tuple[int, int]:
+    """
+      Retorna o tamanho que o mapa ocupa na tela
+    """
+    return self.map_object_rect.size
 
-    depth = 0
-    for x in range(0, map_size):
-      for y in range(0, map_size):
-        x_gap = self.gap * x
-        y_gap = self.gap * y
-        tile_position = (x * sprite_size + x_gap, y * sprite_size + y_gap)
-        tile_surface = self.tile_source.sprites[depth].copy()
+  def get_world_size(self) -> tuple[int, int]:
+    """
+      Retorna o tamanho do mundo, em que a câmera trabalha
+    """
+    return self.map_surface_size
 
-        tile_surface_rect = tile_surface.get_rect()
-        tile_surface_rect.center = (tile_surface.get_width() // 2, tile_surface.get_height() // 2)
-        map_surface.blit(tile_surface, tile_position)
+  def __setup(self):
+    self.map_surface_size = self.__get_map_surface_size()
+    map_width, _ = self.map_surface_size
+    view_length = self.view_length or map_width
+    self.map_object_rect = pygame.Rect(0, 0, view_length, view_length)
+    align_rect(self.map_object_rect, self.alignment, self.position)
 
-      depth += 2 if map_size == 15 else 1
+    # O mapa é dividido em pedaços de MAP_CHUNK_SIZE x MAP_CHUNK_SIZE casas. Cada pedaço
+    # tem a sua própria superfície, que só é criada quando ele aparece na tela e é
+    # descartada quando passa do limite de memória. Assim a memória usada não depende
+    # do tamanho do mapa. Com a câmera encolhendo o mapa, são usadas versões reduzidas
+    # dos pedaços (os níveis), então o mapa inteiro cabe no limite com o zoom 1.
+    self.chunks = MapChunkCache(MAP_CHUNK_MEMORY_BUDGET)
+
+    # Os pedaços são montados por um pool de threads (o pygame solta o GIL durante
+    # os blits), e devolvidos prontos pela fila. Enquanto isso, o viewport mostra
+    # um placeholder no lugar deles. Cada pedaço pendente guarda as casas que
+    # mudaram depois que ele foi pedido, para serem montadas de novo quando ele chegar.
+    self.chunk_builder = ThreadPoolExecutor(MAP_CHUNK_BUILDER_THREADS, thread_name_prefix="map-chunk-builder")
+    self.built_chunks: queue.Queue = queue.Queue()
+    self.pending_chunks: dict[tuple[tuple[int, int], int], set[tuple[int, int]]] = {}
+
+    # O SDL guarda, em cada superfície de origem, dados do último destino de blit,
+    # e as superfícies com RLE são modificadas quando travadas. Então cada montagem
+    # usa um conjunto de cópias dos sprites só dela, feitas na thread principal.
+    self.sprite_sets: queue.Queue = queue.Queue()
+    self.thread_sprites = threading.local()
+
+    # Cada casa é montada a partir de camadas, de baixo para cima:
+    # - piso, que nunca muda;
+    # - passos possíveis, com o piso selecionado;
+    # - entidades (bombas e tesouros);
+    # - jogadores.
+    # Cada camada guarda o que está desenhado e só marca como mudadas as casas
+    # em que ela mesma mudou.
+    map_size = self.game.map_size
+    self.drawn_possible_steps: set[tuple[int, int]] = set()
+    self.drawn_entities: list[list[Entity | None]] = [[None] * map_size for _ in range(map_size)]
+    self.drawn_players: dict[tuple[int, int], Player] = {}
+
+    # Pisos de cada coluna do mapa, gerados uma única vez para o tamanho do mapa
+    self.depth_tiles = self.__generate_depth_tiles(self.tile_source)
+    self.selected_depth_tiles = self.__generate_depth_tiles(self.selected_tile_source)
+
+    # Sprites das entidades e dos jogadores já redimensionados para o piso.
+    # Depois de montado, ele só é lido, inclusive pelas threads do pool.
+    self.scaled_identifiers: dict[pygame.Surface, pygame.Surface] = self.__build_scaled_identifiers()
+
+    for _ in range(MAP_CHUNK_BUILDER_THREADS):
+      self.sprite_sets.put(self.__copy_sprites())
+
+    # O mapa só é atualizado quando o estado do jogo muda
+    self.map_needs_update = True
+    self.game.subscribe(GameEvent.STATE_CHANGED, self.invalidate_map)
+    self.game.subscribe(GameEvent.PLAYER_EXPLODED, self.play_bomb_sound)
+
+    # Câmera com zoom e deslocamento. O viewport é a área do mapa na tela, e o
+    # zoom 1 mostra o mapa inteiro nele. O zoom máximo deixa as casas chegarem
+    # a MAP_MAX_TILE_SCALE vezes o tamanho do sprite, mesmo em mapas grandes.
+    self.camera = Camera(
+      self.map_surface_size,
+      self.map_object_rect.size,
+      max(MAX_ZOOM, MAP_MAX_TILE_SCALE * map_width / view_length)
+    )
+    self.is_panning = False
 
-    return map_surface
+    # Parte visível do mapa já esticada para o viewport. Os pedaços são copiados
+    # para ela só quando a câmera se move ou quando alguma casa deles muda.
+    self.view_object = pygame.Surface(self.map_object_rect.size, pygame.SRCALPHA)
+    self.view_area: pygame.Rect | None = None
+    self.view_level = 0
+    self.changed_chunks: set[tuple[int, int]] = set()
 
-  def get_map_size(self) -> tuple[int, int]:
-    return self.map_object.get_size()
+    # Funções avisadas com as casas que mudaram (ex.: o minimapa)
+    self.cell_listeners: list[Callable[[set[tuple[int, int]]], None]] = []
 
-  def __setup(self):
-    self.default_map_object = self.__generate_map_surface()
-    self.map_object = self.default_map_object.copy()
-    self.map_object_rect = self.map_object.get_rect()
-    align_rect(self.map_object_rect, self.alignment, self.position)
     self.request_map_update()
-    # Para o submarino
-    self.game.map_object_rect_width = self.map_object_rect.width
-    self.game.map_object_rect_left = self.map_object_rect.left
+    self.__update_submarine_area()
 
-  def request_map_update(self) -> pygame.Surface:
+  def __update_submarine_area(self):
     """
-      Atualiza, se precisar, a superfície do mapa com bombas, passos, etc.
+      O submarino descobre a coluna do mapa pela posição dele na\n
+      tela, então ele precisa da área que o mapa inteiro ocuparia\n
+      na tela considerando a câmera.
     """
+    area = self.camera.get_visible_area()
+    scale = self.map_object_rect.width / area.width
+    map_width, _ = self.map_surface_size
 
-    map_size = self.game.map_size
+    self.game.map_object_rect_width = round(map_width * scale)
+    self.game.map_object_rect_left = round(self.map_object_rect.left - area.left * scale)
+
+  def invalidate_map(self):
+    """
+      Avisa que o estado do jogo mudou e o mapa precisa ser conferido\n
+      na próxima vez que for desenhado.
+    """
+    self.map_needs_update = True
+
+  def play_bomb_sound(self):
+    """
+      Toca o som da bomba quando o jogador do turno explode.
+    """
+    self.bomb_dying_sound.play()
+
+  def __build_scaled_identifiers(self) -> dict[pygame.Surface, pygame.Surface]:
+    """
+      Redimensiona, uma única vez, todos os sprites das entidades e\n
+      dos jogadores para 80% do tamanho do piso, que nunca muda.
+    """
+    sprite_size = self.tile_source.get_real_sprite_width()
+
+    scaled_identifiers = {}
+    for identifier_source in entity_sprites.values():
+      for identifier in identifier_source.sprites:
+        scaled_identifiers[identifier] = pygame.transform.scale_by(identifier, (sprite_size * 0.80 / identifier.get_width(), sprite_size * 0.80 / identifier.get_height()))
+
+    return scaled_identifiers
+
+  def __get_tile_rect(self, x: int, y: int) -> pygame.Rect:
     sprite_size = self.tile_source.get_real_sprite_width()
+    return pygame.Rect(x * (sprite_size + self.gap), y * (sprite_size + self.gap), sprite_size, sprite_size)
 
-    map_object_copy = self.default_map_object.copy()
+  def __generate_depth_tiles(self, tile_source: SpriteSource) -> list[pygame.Surface]:
+    """
+      Gera o piso de cada coluna do mapa, com os pixels da profundidade\n
+      interpolados entre as faixas da spritesheet. Assim o degradê\n
+      fica completo em qualquer tamanho de mapa, com o sombreado do\n
+      piso. As colunas que caem exatamente em uma faixa usam o sprite\n
+      original dela.
+    """
+    map_size = self.game.map_size
+    band_count = tile_source.sprite_count
 
-    depth = 0
+    depth_tiles = []
     for x in range(0, map_size):
-      for y in range(0, map_size):
-        entity_at = self.game.entity_at((x, y))
-        possible_player_at = self.game.get_player_at((x, y))
+      band_position = x * band_count / map_size
+      band = int(band_position)
+
+      if band_position == band:
+        depth_tiles.append(tile_source.sprites[band])
+        continue
+
+      next_band = min(band + 1, band_count - 1)
+      depth_tiles.append(lerp_sprites(tile_source.sprites[band], tile_source.sprites[next_band], band_position - band))
+
+    return depth_tiles
+
+  def __get_chunk_key(self, x: int, y: int) -> tuple[int, int]:
+    return (x // MAP_CHUNK_SIZE, y // MAP_CHUNK_SIZE)
+
+  def __get_chunk_rect(self, chunk_key: tuple[int, int]) -> pygame.Rect:
+    """
+      Retorna a área do pedaço dentro do mapa. O espaço depois da última\n
+      casa de um pedaço faz parte dele, menos no fim do mapa.
+    """
+    chunk_x, chunk_y = chunk_key
+    chunk_length = MAP_CHUNK_SIZE * (self.tile_source.get_real_sprite_width() + self.gap)
+
+    chunk_rect = pygame.Rect(chunk_x * chunk_length, chunk_y * chunk_length, chunk_length, chunk_length)
+    return chunk_rect.clip(pygame.Rect((0, 0), self.map_surface_size))
+
+  def __get_chunk_keys_in(self, area: pygame.Rect) -> list[tuple[int, int]]:
+    chunk_length = MAP_CHUNK_SIZE * (self.tile_source.get_real_sprite_width() + self.gap)
+
+    return [
+      (chunk_x, chunk_y)
+      for chunk_x in range(area.left // chunk_length, (area.right - 1) // chunk_length + 1)
+      for chunk_y in range(area.top // chunk_length, (area.bottom - 1) // chunk_length + 1)
+    ]
+
+  def __get_level_size(self, chunk_rect: pygame.Rect, level: int) -> tuple[int, int]:
+    """
+      Retorna o tamanho da superfície do pedaço no nível
+    """
+    factor = 2 ** level
+    return (math.ceil(chunk_rect.width / factor), math.ceil(chunk_rect.height / factor))
+
+  def __get_level_rect(self, rect: pygame.Rect, level: int) -> pygame.Rect:
+    """
+      Converte uma área do pedaço, em pixels do mundo, para a área\n
+      correspondente na superfície do pedaço no nível.
+    """
+    factor = 2 ** level
+    left = rect.left // factor
+    top = rect.top // factor
+    return pygame.Rect(left, top, math.ceil(rect.right / factor) - left, math.ceil(rect.bottom / factor) - top)
+
+  def __get_view_level(self, visible_area: pygame.Rect) -> int:
+    """
+      Retorna o nível dos pedaços usado para a área visível: o mais\n
+      reduzido que ainda tem pelo menos um pixel para cada pixel da tela.
+    """
+    world_per_view_pixel = visible_area.width / self.map_object_rect.width
+    level = 0
+    while level < MAP_CHUNK_MAX_LEVEL and world_per_view_pixel >= 2 ** (level + 1):
+      level += 1
+
+    return level
+
+  def __get_chunk(self, chunk_key: tuple[int, int], level: int) -> pygame.Surface | None:
+    """
+      Retorna a superfície do pedaço no nível. Caso ela ainda não exista\n
+      ou tenha sido descartada, pede para ela ser montada em outra\n
+      thread e retorna `None`.
+    """
+    chunk_surface = self.chunks.get((chunk_key, level))
+    if chunk_surface is not None:
+      return chunk_surface
+
+    self.__request_chunk(chunk_key, level)
+    return None
+
+  def __request_chunk(self, chunk_key: tuple[int, int], level: int):
+    if (chunk_key, level) not in self.pending_chunks:
+      self.pending_chunks[(chunk_key, level)] = set()
+      self.chunk_builder.submit(self.__build_chunk, chunk_key, level, self.__get_chunk_layers(chunk_key))
+
+  def __reduce_chunk(self, chunk_surface: pygame.Surface, chunk_key: tuple[int, int], level: int) -> pygame.Surface:
+    """
+      Reduz a superfície do pedaço, montada no tamanho do mundo, para o nível
+    """
+    if level == 0:
+      return chunk_surface
+
+    return pygame.transform.smoothscale(chunk_surface, self.__get_level_size(self.__get_chunk_rect(chunk_key), level))
+
+  def __build_chunk(self, chunk_key: tuple[int, int], level: int, layers: tuple):
+    """
+      Monta a superfície do pedaço no nível com as camadas copiadas\n
+      quando ele foi pedido. Roda nas threads do pool.\n
+      Sempre entrega um resultado, mesmo quando a montagem falha, para\n
+      que o pedaço não fique pendente para sempre.
+    """
+    try:
+      chunk_rect = self.__get_chunk_rect(chunk_key)
+
+      # Ao adicionar a flag SCRALPHA, o pygame nos permite a fazer blit levando em conta
+      # a opacidade do sprite
+      chunk_surface = pygame.Surface(chunk_rect.size, pygame.SRCALPHA)
+
+      # Há um conjunto de sprites para cada thread, então nunca precisa esperar
+      self.thread_sprites.sprites = self.sprite_sets.get()
+      try:
+        blit_sequence(chunk_surface, self.get_chunk_blits(chunk_key, layers))
+      finally:
+        self.sprite_sets.put(self.thread_sprites.sprites)
+        self.thread_sprites.sprites = None
+
+      self.built_chunks.put((chunk_key, level, self.__reduce_chunk(chunk_surface, chunk_key, level)))
+    except Exception as error:
+      print(f"Não foi possível montar o pedaço {chunk_key} do mapa no nível {level}: {error}")
+      self.built_chunks.put((chunk_key, level, None))
+
+  def __get_next_prefetch_chunk(self) -> tuple[int, int] | None:
+    """
+      Retorna o pedaço mais perto da câmera que ainda não foi montado\n
+      no nível atual e que cabe no limite de memória sem descartar\n
+      nenhum outro.
+    """
+    view_center = self.camera.get_visible_area().center
+    level = self.view_level
+
+    chunk_rects = [
+      (chunk_key, chunk_rect) for chunk_key, chunk_rect in self.get_chunk_rects()
+      if self.chunks.peek((chunk_key, level)) is None and (chunk_key, level) not in self.pending_chunks
+    ]
+    if not chunk_rects:
+      return None
+
+    chunk_key, chunk_rect = min(
+      chunk_rects,
+      key=lambda item: (item[1].centerx - view_center[0]) ** 2 + (item[1].centery - view_center[1]) ** 2
+    )
+
+    level_width, level_height = self.__get_level_size(chunk_rect, level)
+    if self.chunks.memory_used + level_width * level_height * 4 > self.chunks.memory_budget:
+      return None
+
+    return chunk_key
+
+  def __prefetch_chunks(self):
+    """
+      Tarefa que monta, na thread principal, os pedaços que ainda não\n
+      apareceram, dos mais perto para os mais longe da câmera. Cada\n
+      pedaço de tarefa faz só alguns blits.
+    """
+    while True:
+      chunk_key = self.__get_next_prefetch_chunk()
+      if chunk_key is None:
+        self.prefetching = False
+        return
+
+      # O pedaço fica pendente como os das threads, então as casas que
+      # mudarem durante a montagem são montadas de novo quando ele chegar
+      level = self.view_level
+      self.pending_chunks[(chunk_key, level)] = set()
+
+      chunk_surface = pygame.Surface(self.__get_chunk_rect(chunk_key).size, pygame.SRCALPHA)
+      sequence = self.get_chunk_blits(chunk_key)
+      for start in range(0, len(sequence), MAP_PREFETCH_BLITS_PER_SLICE):
+        blit_sequence(chunk_surface, sequence[start:start + MAP_PREFETCH_BLITS_PER_SLICE])
+        yield
+
+      self.built_chunks.put((chunk_key, level, self.__reduce_chunk(chunk_surface, chunk_key, level)))
+
+  def get_chunk_rects(self) -> list[tuple[tuple[int, int], pygame.Rect]]:
+    """
+      Retorna todos os pedaços do mapa, com a área de cada um
+    """
+    map_rect = pygame.Rect((0, 0), self.map_surface_size)
+    return [(chunk_key, self.__get_chunk_rect(chunk_key)) for chunk_key in self.__get_chunk_keys_in(map_rect)]
+
+  def __get_chunk_layers(self, chunk_key: tuple[int, int]) -> tuple:
+    """
+      Copia as camadas do pedaço para montar ele fora da thread\n
+      principal. Os passos e os jogadores desenhados são trocados\n
+      inteiros a cada atualização, então basta guardar eles. Já as\n
+      entidades mudam no lugar, então as colunas do pedaço são copiadas.
+    """
+    chunk_x, chunk_y = chunk_key
+    first_y = chunk_y * MAP_CHUNK_SIZE
+    entities = [
+      column[first_y:first_y + MAP_CHUNK_SIZE]
+      for column in self.drawn_entities[chunk_x * MAP_CHUNK_SIZE:(chunk_x + 1) * MAP_CHUNK_SIZE]
+    ]
+
+    return (self.drawn_possible_steps, entities, self.drawn_players)
+
+  def get_chunk_blits(self, chunk_key: tuple[int, int], layers: tuple | None = None) -> list[tuple[pygame.Surface, tuple[int, int]]]:
+    """
+      Retorna a sequência de blits que monta todas as casas do\n
+      pedaço, com posições relativas ao pedaço. Sem `layers`, são\n
+      usadas as camadas desenhadas agora.
+    """
+    if layers is None:
+      layers = self.__get_chunk_layers(chunk_key)
+
+    chunk_rect = self.__get_chunk_rect(chunk_key)
+    chunk_x, chunk_y = chunk_key
+    map_size = self.game.map_size
+
+    sequence = []
+    for x in range(chunk_x * MAP_CHUNK_SIZE, min((chunk_x + 1) * MAP_CHUNK_SIZE, map_size)):
+      for y in range(chunk_y * MAP_CHUNK_SIZE, min((chunk_y + 1) * MAP_CHUNK_SIZE, map_size)):
+        sequence.extend(self.__get_cell_blits(chunk_rect, x, y, layers))
+
+    return sequence
+
+  def __receive_built_chunks(self):
+    """
+      Guarda os pedaços que as threads terminaram de montar e\n
+      marca eles para serem copiados para o viewport.
+    """
+    while True:
+      try:
+        chunk_key, level, chunk_surface = self.built_chunks.get_nowait()
+      except queue.Empty:
+        return
+
+      # As casas que mudaram enquanto o pedaço era montado podem ter sido
+      # lidas antes da mudança, então elas são montadas de novo. Nos pedaços
+      # reduzidos, o pedaço inteiro é montado de novo.
+      changed_cells = self.pending_chunks.pop((chunk_key, level), ())
+
+      # Se a montagem falhou, o pedaço é pedido de novo quando aparecer na câmera
+      if chunk_surface is None:
+        self.changed_chunks.add(chunk_key)
+        continue
+
+      if level > 0 and changed_cells:
+        self.__request_chunk(chunk_key, level)
+        continue
+
+      self.__compose_cells(chunk_surface, chunk_key, changed_cells)
+
+      self.chunks.put((chunk_key, level), chunk_surface)
+      self.changed_chunks.add(chunk_key)
+
+  def __copy_sprites(self) -> dict[pygame.Surface, pygame.Surface]:
+    """
+      Copia todos os sprites usados para montar as casas
+    """
+    sprites = [*self.depth_tiles, *self.selected_depth_tiles, *self.scaled_identifiers.values()]
+    return {sprite: sprite.copy() for sprite in sprites}
+
+  def __get_thread_sprite(self, sprite: pygame.Surface) -> pygame.Surface:
+    """
+      Retorna a cópia do sprite da montagem que a thread atual está\n
+      fazendo. Fora das montagens é usado o próprio sprite.
+    """
+    sprites = getattr(self.thread_sprites, "sprites", None)
+    if sprites is None:
+      return sprite
+
+    return sprites[sprite]
+
+  def __get_centered_position(self, sprite: pygame.Surface, tile_rect: pygame.Rect) -> tuple[int, int]:
+    sprite_rect = sprite.get_rect()
+    sprite_rect.center = tile_rect.center
+    return sprite_rect.topleft
+
+  def __get_cell_blits(self, chunk_rect: pygame.Rect, x: int, y: int, layers: tuple) -> list[tuple[pygame.Surface, tuple[int, int]]]:
+    """
+      Retorna os blits de uma casa do mapa dentro do pedaço, com uma\n
+      camada por item, de baixo para cima. Os sprites são compartilhados\n
+      por todas as casas, nenhum deles é copiado.
+    """
+    possible_steps, entities, players = layers
+
+    tile_rect = self.__get_tile_rect(x, y).move(-chunk_rect.left, -chunk_rect.top)
+    cell_blits = [(self.__get_thread_sprite(self.depth_tiles[x]), tile_rect.topleft)]
+
+    # Caso tenha um passo para aquele lugar, mostra o caminho de uma maneira diferente
+    if (x, y) in possible_steps:
+      cell_blits.append((self.__get_thread_sprite(self.selected_depth_tiles[x]), tile_rect.topleft))
+
+    entity_at = entities[x % MAP_CHUNK_SIZE][y % MAP_CHUNK_SIZE]
+    if entity_at != None:
+      sprite = self.scaled_identifiers[entity_at.identifier]
+      cell_blits.append((self.__get_thread_sprite(sprite), self.__get_centered_position(sprite, tile_rect)))
+
+    # Colocar o player separado pra uma maior facilidade de manter o tesouro
+    # no mesmo lugar caso o player não pegue
+    player_at = players.get((x, y))
+    if player_at != None:
+      sprite = self.scaled_identifiers[player_at.identifier]
+      cell_blits.append((self.__get_thread_sprite(sprite), self.__get_centered_position(sprite, tile_rect)))
 
-        if possible_player_at == None and entity_at == None and not self.game.has_current_possible_steps():
+    return cell_blits
+
+  def __compose_cells(self, chunk_surface: pygame.Surface, chunk_key: tuple[int, int], cells):
+    """
+      Monta de novo as casas dentro do pedaço, juntando as camadas\n
+      de todas elas em um único `blits`
+    """
+    chunk_rect = self.__get_chunk_rect(chunk_key)
+    layers = self.__get_chunk_layers(chunk_key)
+
+    sequence = []
+    for x, y in cells:
+      tile_rect = self.__get_tile_rect(x, y).move(-chunk_rect.left, -chunk_rect.top)
+      chunk_surface.fill((0, 0, 0, 0), tile_rect)
+      sequence.extend(self.__get_cell_blits(chunk_rect, x, y, layers))
+
+    blit_sequence(chunk_surface, sequence)
+
+  def __update_highlight_layer(self) -> set[tuple[int, int]]:
+    possible_steps = set()
+    if self.game.has_current_possible_steps():
+      for steps in self.game.current_possible_steps.values():
+        possible_steps.update(steps)
+
+    changed_cells = possible_steps ^ self.drawn_possible_steps
+    self.drawn_possible_steps = possible_steps
+    return changed_cells
+
+  def __update_entity_layer(self) -> set[tuple[int, int]]:
+    changed_cells = set()
+
+    for x in range(0, self.game.map_size):
+      column = self.game.map[x]
+      drawn_column = self.drawn_entities[x]
+
+      for y, entity_at in enumerate(column):
+        # Compara pela identidade, pois as entidades continuam sendo os mesmos objetos
+        if entity_at is drawn_column[y]:
           continue
 
-        x_gap = self.gap * x
-        y_gap = self.gap * y
-        tile_position = (x * sprite_size + x_gap, y * sprite_size + y_gap)
+        drawn_column[y] = entity_at
+        changed_cells.add((x, y))
 
-        # Caso tenha um passo para aquele lugar, mostra o caminho de uma maneira diferente
-        real_tile_source = self.selected_tile_source if self.game.is_in_current_possible_steps((x, y)) else self.tile_source
-        tile_surface = real_tile_source.sprites[depth].copy()
+    return changed_cells
 
-        tile_surface_rect = tile_surface.get_rect()
-        tile_surface_rect.center = (tile_surface.get_width() // 2, tile_surface.get_height() // 2)
+  def __update_player_layer(self) -> set[tuple[int, int]]:
+    map_size = self.game.map_size
 
-        # Coloca a entidade no quadrado
-        if entity_at != None:
-          entity_identifier = pygame.transform.scale_by(entity_at.identifier, (sprite_size * 0.80 / entity_at.identifier.get_width(), sprite_size * 0.80 / entity_at.identifier.get_height()))
+    # Se houver mais de um jogador na mesma casa, o primeiro é o que aparece.
+    # Os jogadores no submarino ficam fora do mapa.
+    players_by_position: dict[tuple[int, int], Player] = {}
+    for player in self.game.players:
+      player_x, player_y = player.position
+      if 0 <= player_x < map_size and 0 <= player_y < map_size:
+        players_by_position.setdefault(player.position, player)
 
-          entity_identifier_rect = entity_identifier.get_rect()
-          entity_identifier_rect.center = tile_surface_rect.center
+    changed_cells = set()
+    for position in players_by_position.keys() | self.drawn_players.keys():
+      if players_by_position.get(position) is not self.drawn_players.get(position):
+        changed_cells.add(position)
 
-          tile_surface.blit(entity_identifier, entity_identifier_rect.topleft)
+    self.drawn_players = players_by_position
+    return changed_cells
 
+  def request_map_update(self):
+    """
+      Atualiza, se precisar, o mapa com bombas, passos, etc.\n
+      Cada camada só marca as casas em que ela mudou, e só essas\n
+      casas são montadas de novo, nos pedaços que estão guardados.
+    """
+    if not self.map_needs_update:
+      return
 
-        # Colocar o player separado pra uma maior facilidade de manter o tesouro
-        # no mesmo lugar caso o player não pegue
-        if possible_player_at != None:
-          player_identifier = pygame.transform.scale_by(possible_player_at.identifier, (sprite_size * 0.80 / possible_player_at.identifier.get_width(), sprite_size * 0.80 / possible_player_at.identifier.get_height()))
+    self.map_needs_update = False
 
-          player_identifier_rect = player_identifier.get_rect()
-          player_identifier_rect.center = tile_surface_rect.center
+    changed_cells = self.__update_highlight_layer()
+    changed_cells |= self.__update_entity_layer()
+    changed_cells |= self.__update_player_layer()
 
-          tile_surface.blit(player_identifier, player_identifier_rect.topleft)
+    changed_cells_by_chunk: dict[tuple[int, int], list[tuple[int, int]]] = {}
+    for x, y in changed_cells:
+      changed_cells_by_chunk.setdefault(self.__get_chunk_key(x, y), []).append((x, y))
 
+    for chunk_key, cells in changed_cells_by_chunk.items():
+      self.changed_chunks.add(chunk_key)
 
-        map_object_copy.blit(tile_surface, tile_position)
+      for level in range(MAP_CHUNK_MAX_LEVEL + 1):
+        # Os pedaços que não estão guardados já vão ser montados com o estado novo
+        if (chunk_key, level) in self.pending_chunks:
+          self.pending_chunks[(chunk_key, level)].update(cells)
+          continue
 
-      depth += 2 if map_size == 15 else 1
+        chunk_surface = self.chunks.peek((chunk_key, level))
+        if chunk_surface is None:
+          continue
 
-    self.map_object = map_object_copy
+        # Os reduzidos são descartados e montados de novo quando aparecerem na tela
+        if level == 0:
+          self.__compose_cells(chunk_surface, chunk_key, cells)
+        else:
+          self.chunks.discard((chunk_key, level))
+
+    if changed_cells:
+      for listener in self.cell_listeners:
+        listener(changed_cells)
+
+  def add_cell_listener(self, listener: Callable[[set[tuple[int, int]]], None]):
+    """
+      Registra uma função que recebe as casas que mudaram\n
+      sempre que o mapa é atualizado.
+    """
+    self.cell_listeners.append(listener)
+
+  def center_camera_on(self, position: tuple[float, float]):
+    """
+      Centraliza a câmera no ponto do mapa, em pixels do mapa sem zoom.
+    """
+    self.camera.center_on(position)
+    self.__update_submarine_area()
+
+  def __copy_chunk_to_view(self, chunk_key: tuple[int, int], keep_drawn: bool = False) -> pygame.Rect | None:
+    """
+      Copia a parte visível do pedaço para o viewport, esticada pelo\n
+      zoom. Retorna a área do viewport que mudou. Com `keep_drawn`,\n
+      um pedaço que ainda não está pronto deixa o que já está no\n
+      viewport, ao invés de mostrar o placeholder.
+    """
+    chunk_rect = self.__get_chunk_rect(chunk_key)
+    area = self.view_area
+    visible_part = chunk_rect.clip(area)
+    if visible_part.width == 0 or visible_part.height == 0:
+      return None
+
+    # As bordas são arredondadas a partir da posição no mapa, para que
+    # pedaços vizinhos não fiquem com espaços ou sobreposições entre eles
+    scale_x = self.map_object_rect.width / area.width
+    scale_y = self.map_object_rect.height / area.height
+    left = round((visible_part.left - area.left) * scale_x)
+    top = round((visible_part.top - area.top) * scale_y)
+    right = round((visible_part.right - area.left) * scale_x)
+    bottom = round((visible_part.bottom - area.top) * scale_y)
+    view_rect = pygame.Rect(left, top, right - left, bottom - top)
+
+    chunk_surface = self.__get_chunk(chunk_key, self.view_level)
+    if chunk_surface is None:
+      # O pedaço ainda está sendo montado, então ele vai ser copiado quando chegar
+      if keep_drawn:
+        return None
+
+      self.view_object.fill(MAP_CHUNK_PLACEHOLDER_COLOR, view_rect)
+      return view_rect
+
+    source_rect = self.__get_level_rect(visible_part.move(-chunk_rect.left, -chunk_rect.top), self.view_level)
+    source = chunk_surface.subsurface(source_rect.clip(chunk_surface.get_rect()))
+    if view_rect.size != source.get_size():
+      source = pygame.transform.scale(source, view_rect.size)
+
+    # Copia sem mistura (o máximo entre 0 e o pixel é o próprio pixel), já que
+    # a transparência só deve ser aplicada quando o viewport for desenhado na tela
+    self.view_object.fill((0, 0, 0, 0), view_rect)
+    self.view_object.blit(source, view_rect.topleft, special_flags=pygame.BLEND_RGBA_MAX)
+    return view_rect
+
+  def __request_view_update(self) -> list[pygame.Rect]:
+    """
+      Atualiza, se precisar, a parte visível do mapa. Só os pedaços\n
+      dentro da câmera são montados e copiados para o viewport.\n
+      Retorna as áreas da tela que mudaram.
+    """
+    self.__receive_built_chunks()
+
+    visible_area = self.camera.get_visible_area()
+
+    camera_changed = visible_area != self.view_area
+    if camera_changed:
+      # A câmera mudou, então o viewport inteiro é montado de novo
+      self.view_area = visible_area.copy()
+      self.view_level = self.__get_view_level(visible_area)
+      self.view_object.fill((0, 0, 0, 0))
+      chunk_keys = self.__get_chunk_keys_in(visible_area)
+
+      if self.scheduler and not self.prefetching:
+        self.prefetching = True
+        self.scheduler.add(self.__prefetch_chunks())
+    else:
+      chunk_keys = [chunk_key for chunk_key in self.__get_chunk_keys_in(visible_area) if chunk_key in self.changed_chunks]
+
+    self.changed_chunks.clear()
+
+    changed_rects = []
+    for chunk_key in chunk_keys:
+      # Sem a câmera mudar, o viewport ainda tem o pedaço como ele era antes
+      view_rect = self.__copy_chunk_to_view(chunk_key, keep_drawn=not camera_changed)
+      if view_rect is not None:
+        changed_rects.append(view_rect.move(self.map_object_rect.topleft))
+
+    return changed_rects
+
+  def get_cell_at(self, position: tuple[int, int]) -> tuple[int, int]:
+    """
+      Retorna a casa do mapa que está na posição da tela, considerando a câmera.\n
+      Essa posição não leva em conta a separação de gaps. Então, se for clicado\n
+      entre os gaps o click ainda pode ser processado.
+    """
+    world_x, world_y = self.camera.viewport_to_world(position, self.map_object_rect)
+    map_width, map_height = self.map_surface_size
+    map_size = self.game.map_size
+
+    # Isso dá o resultado em índice 0 até (map-size - 1)
+    x = min(int(map_size * world_x // map_width), map_size - 1)
+    y = min(int(map_size * world_y // map_height), map_size - 1)
+    return (x, y)
+
+  def __listen_camera(self, event: pygame.event.Event) -> bool:
+    """
+      Cuida do zoom (rodinha do mouse) e do deslocamento (arrastar com o\n
+      botão direito) da câmera. Retorna `True` se o evento foi usado.
+    """
+    if event.type == pygame.MOUSEWHEEL:
+      mouse_pos = get_mouse_pos()
+      if not self.is_mouse_within_bounding_box(mouse_pos):
+        return True
+
+      self.camera.zoom_by(ZOOM_STEP ** event.y, self.camera.viewport_to_world(mouse_pos, self.map_object_rect))
+      self.__update_submarine_area()
+      return True
+
+    if event.type == pygame.MOUSEBUTTONDOWN and event.button == MOUSE_RIGHT_BUTTON:
+      self.is_panning = self.is_mouse_within_bounding_box(event.pos)
+      return True
+
+    if event.type == pygame.MOUSEBUTTONUP and event.button == MOUSE_RIGHT_BUTTON:
+      self.is_panning = False
+      return True
+
+    if event.type == pygame.MOUSEMOTION and self.is_panning:
+      # Arrasta o mapa junto com o mouse
+      offset_x, offset_y = event.rel
+      self.camera.pan_by((-offset_x, -offset_y))
+      self.__update_submarine_area()
+      return True
+
+    return False
+
+  def take_state_from(self, previous: "Map"):
+    """
+      Mantém o zoom e o ponto central da câmera do mapa do layout\n
+      anterior (ex.: depois de a janela mudar de tamanho).
+    """
+    scale = self.map_surface_size[0] / previous.map_surface_size[0]
+
+    self.camera.zoom_by(previous.camera.zoom)
+    self.center_camera_on((previous.camera.center_x * scale, previous.camera.center_y * scale))
+
+  def close(self):
+    self.game.unsubscribe(GameEvent.STATE_CHANGED, self.invalidate_map)
+    self.game.unsubscribe(GameEvent.PLAYER_EXPLODED, self.play_bomb_sound)
+    # Os pedaços que ainda estão na fila não são mais montados
+    self.chunk_builder.shutdown(wait=False, cancel_futures=True)
 
   def is_mouse_within_bounding_box(self, mouse_pos):
     return self.map_object_rect.collidepoint(mouse_pos)
 
-  def draw(self, screen: pygame.Surface):
+  def get_area(self) -> pygame.Rect:
+    return self.map_object_rect
+
+  def update(self):
     self.request_map_update()
-    screen.blit(self.map_object, self.map_object_rect.topleft)
+
+  def get_dirty_rects(self) -> list[pygame.Rect]:
+    # O viewport é atualizado aqui, e não no `draw`, para que só
+    # as partes dele que mudaram sejam desenhadas de novo
+    self._drawn_area = self.map_object_rect.copy()
+    return self.__request_view_update()
+
+  def get_time_until_change(self) -> float | None:
+    # Os pedaços que ainda estão sendo montados nas threads aparecem sozinhos
+    return 0 if self.pending_chunks else None
+
+  def draw(self, screen: pygame.Surface):
+    screen.blit(self.view_object, self.map_object_rect.topleft)
 
   def listen(self, event: pygame.event.Event):
+    if self.__listen_camera(event):
+      return
+
     if not (event.type == pygame.MOUSEBUTTONDOWN and event.button == MOUSE_LEFT_BUTTON):
       return
 
@@ -173,20 +897,7 @@ class Map(Component):
     if (not self.game.need_player_activation and not self.game.need_player_action) or self.game.need_player_decision or self.game.need_submarine_option or self.game.game_has_ended:
       return
 
-    map_width, map_height = self.map_object_rect.size
-    # Por algum motivo, na desestruturação, o "topleft" do rect tá com a ordem invertida
-    # então é preciso separar a definição de variável, ao invés de fazer por desestruturação.
-    map_top  = self.map_object_rect.top
-    map_left = self.map_object_rect.left
-    # Posição do mouse
-    pos_x, pos_y = event.pos
-    map_size = self.game.map_size
-
-    # Isso dá o resultado em índice 0 até (map-size - 1)
-    # Essa posição não leva em conta a separação de gaps. Então, se for clicado entre os gaps
-    # o click ainda pode ser processado.
-    x = (map_size * (pos_x - map_left) // map_width)
-    y = (map_size * (pos_y - map_top) // map_height)
+    x, y = self.get_cell_at(event.pos)
 
     # TODO: se o player ir para uma bomba, ele vai sair do estado de playing
     # TODO: e vai ficar desclassificado.
@@ -199,13 +910,7 @@ class Map(Component):
         # Essa parte, quando o jogador estiver no submarino, vai ser tratada
         # dentro da classe do submarino. Essa aqui só dá conta de quando o
         # jogador já estiver no mapa.
-        self.game.need_player_activation = False
-        self.game.need_player_action = True
-
-        self.game.current_possible_steps = self.game.calculate_possible_steps(
-          (x, y),
-          self.game.sorted_dice_number,
-        )
+        self.game.activate_current_player()
 
       return
 
@@ -217,50 +922,153 @@ class Map(Component):
       # Se ele clicou em si mesmo:
       if self.game.is_player_at(player, (x, y)):
         # passa a vez
-        self.game.need_player_action = False
-        self.game.clear_current_possible_steps()
-        self.game.go_to_next_player_turn()
+        self.game.pass_turn()
         return
 
       # Se não há nenhum passo no local clicado, não há nada a fazer.
       if not self.game.is_in_current_possible_steps((x, y)):
         return
 
-      clicked_step = (x, y)
-      bomb_pos = self.game.get_first_bomb_in_the_way(clicked_step)
-
-      # Pega a entidade antes de mudar o jogador pra lá
-      player.position = clicked_step
-      player.has_already_left_the_submarine = True
-      entity_at_clicked_step = self.game.entity_at(clicked_step)
-      self.game.need_player_action = False
-      self.game.clear_current_possible_steps()
-
-      if bomb_pos != None:
-        # Deixa o jogador desqualificado da partida
-        bomb_x, bomb_y = bomb_pos
-        self.game.map[bomb_x][bomb_y] = None # Tira a bomba de lá
-        player.position = (-1, -1)
-        player.playing = False
-        player.disqualified = True
-        self.game.go_to_next_player_turn()
-        self.bomb_dying_sound.play()
-
-        # TODO: Verificar se todo mundo morreu e acabar a partida
-        return
+      # O jogo cuida das bombas no caminho e do tesouro no local clicado
+      # TODO: Verificar se todo mundo morreu e acabar a partida
+      self.game.move_current_player((x, y))
 
-      if entity_at_clicked_step == None:
-        # Se não há nada no local clicado, não há nada a fazer.
-        # Só passa para o próximo jogador
-        self.game.go_to_next_player_turn()
-        return
 
-      if entity_at_clicked_step.type == EntityType.TREASURE:
-        # Abre o menu para caso o jogador queira pegar o tesouro ou não
-        self.game.need_player_decision = True
-        self.game.treasure_being_taken = entity_at_clicked_step
-        return
+# Cores do minimapa, no índice do código de cada casa (ver `logic.generate_map_cells`)
+MINIMAP_DIVER_CELL = 3
+MINIMAP_PALETTE = [
+  (18, 52, 98),   # EMPTY_CELL
+  (200, 40, 40),  # BOMB_CELL
+  (240, 200, 50), # TREASURE_CELL
+  (250, 250, 250) # MINIMAP_DIVER_CELL
+]
+
+class Minimap(Component):
+  """
+    Mostra o mapa inteiro com um pixel por casa (tesouros, bombas\n
+    e mergulhadores) e a área que a câmera do mapa está mostrando.\n
+    Clicar ou arrastar nele move a câmera do mapa.
+  """
+
+  def __init__(
+    self,
+    position: tuple[int, int],
+    size: int,
+    game_map: Map,
+    game: Game,
+    alignment: Alignment = Alignment.CENTER
+  ):
+    super().__init__(position, alignment)
+    self._interactable = True
+    self._stateless_draw = True
+
+    self.size = size
+    self.game_map = game_map
+    self.game = game
+
+    self.__setup()
+
+  def __setup(self):
+    self.minimap_rect = pygame.Rect(0, 0, self.size, self.size)
+    align_rect(self.minimap_rect, self.alignment, self.position)
+
+    # Superfície de 8 bits com paleta: cada pixel é o código da casa. Ela é
+    # montada uma única vez a partir do mapa compacto, que é guardado por
+    # colunas (x * tamanho + y), então as linhas são as fatias de cada y.
+    map_size = self.game.map_size
+    map_cells = self.game.get_map_cells()
+    rows = b"".join(bytes(map_cells[y::map_size]) for y in range(map_size))
+
+    self.minimap_object = pygame.image.frombytes(rows, (map_size, map_size), "P")
+    self.minimap_object.set_palette(MINIMAP_PALETTE)
+
+    for position in self.game_map.drawn_players:
+      self.minimap_object.set_at(position, MINIMAP_PALETTE[MINIMAP_DIVER_CELL])
+
+    # Versão esticada para o tamanho do minimapa, refeita só quando algo muda
+    self.scaled_object: pygame.Surface | None = None
+    self.is_dragging = False
+
+    # Muda sempre que algum pixel muda
+    self.minimap_version = 0
+
+    # Depois disso, só as casas que o mapa avisar são atualizadas
+    self.game_map.add_cell_listener(self.update_cells)
+
+  def update_cells(self, changed_cells: set[tuple[int, int]]):
+    """
+      Atualiza só os pixels das casas que mudaram
+    """
+    for x, y in changed_cells:
+      if (x, y) in self.game_map.drawn_players:
+        cell = MINIMAP_DIVER_CELL
+      else:
+        entity = self.game_map.drawn_entities[x][y]
+        if entity is None:
+          cell = EMPTY_CELL
+        else:
+          cell = BOMB_CELL if entity.type == EntityType.BOMB else TREASURE_CELL
+
+      self.minimap_object.set_at((x, y), MINIMAP_PALETTE[cell])
+
+    self.scaled_object = None
+    self.minimap_version += 1
+
+  def __center_camera_at(self, mouse_pos: tuple[int, int]):
+    """
+      Centraliza a câmera do mapa no ponto clicado do minimapa
+    """
+    map_width, map_height = self.game_map.get_world_size()
+    relative_x = min(max((mouse_pos[0] - self.minimap_rect.left) / self.minimap_rect.width, 0), 1)
+    relative_y = min(max((mouse_pos[1] - self.minimap_rect.top) / self.minimap_rect.height, 0), 1)
+
+    self.game_map.center_camera_on((relative_x * map_width, relative_y * map_height))
+
+  def is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
+    return self.minimap_rect.collidepoint(mouse_pos)
+
+  def listen(self, event):
+    if event.type == pygame.MOUSEBUTTONDOWN and event.button == MOUSE_LEFT_BUTTON:
+      self.is_dragging = self.is_mouse_within_bounding_box(event.pos)
+      if self.is_dragging:
+        self.__center_camera_at(event.pos)
+
+    elif event.type == pygame.MOUSEBUTTONUP and event.button == MOUSE_LEFT_BUTTON:
+      self.is_dragging = False
+
+    elif event.type == pygame.MOUSEMOTION and self.is_dragging:
+      self.__center_camera_at(event.pos)
+
+  def get_area(self) -> pygame.Rect:
+    return self.minimap_rect
 
+  def get_draw_state(self):
+    camera = self.game_map.camera
+    return (self.minimap_version, tuple(camera.get_visible_area()) if camera.is_zoomed() else None)
+
+  def draw(self, screen):
+    if self.scaled_object is None:
+      self.scaled_object = pygame.transform.scale(self.minimap_object, self.minimap_rect.size)
+
+    screen.blit(self.scaled_object, self.minimap_rect.topleft)
+
+    # Área que a câmera está mostrando
+    camera = self.game_map.camera
+    if camera.is_zoomed():
+      area = camera.get_visible_area()
+      map_width, map_height = self.game_map.get_world_size()
+      scale_x = self.minimap_rect.width / map_width
+      scale_y = self.minimap_rect.height / map_height
+
+      camera_rect = pygame.Rect(
+        self.minimap_rect.left + round(area.left * scale_x),
+        self.minimap_rect.top + round(area.top * scale_y),
+        max(round(area.width * scale_x), 2),
+        max(round(area.height * scale_y), 2)
+      )
+      pygame.draw.rect(screen, "white", camera_rect, 1)
+
+    pygame.draw.rect(screen, "white", self.minimap_rect, 1)
 
 class PlayerBoard(Component):
   """
@@ -329,10 +1137,40 @@ class PlayerBoard(Component):
     self.indicator_anim_cursor.use_anim(indicator_anim)
 
 
-  def draw(self, screen):
-    self.player_treasure_count.text = f"{self.player.get_treasure_count()}({self.player.get_treasures_weight()}kg)"
-    self.player_depth.text = f"{self.player.get_depth()}"
+  def get_area(self) -> pygame.Rect:
+    return self.board_object_rect.union(self.turn_indicator_rect)
+
+  def update(self):
+    # Pega o jogador de novo pelo id, pois o objeto dele pode ser trocado
+    # (ex.: pelo snapshot mais recente, no modo com a thread de lógica)
+    self.player = self.game.get_player_by_id(self.player.player_id)
+
+    treasure_count = f"{self.player.get_treasure_count()}({self.player.get_treasures_weight()}kg)"
+    if treasure_count != self.player_treasure_count.text:
+      self.player_treasure_count.text = treasure_count
+
+    depth = f"{self.player.get_depth()}"
+    if depth != self.player_depth.text:
+      self.player_depth.text = depth
 
+  def step(self, dt: float):
+    if self.game.player_of_turn == self.player.player_id:
+      # Cada sprite dura 1, então são 10 sprites por segundo # Quanto maior, mais rápido
+      self.indicator_anim_cursor.update(10 * dt)
+
+  def get_draw_state(self):
+    state = (self.player_treasure_count.text, self.player_depth.text)
+
+    # O indicador de turno é animado
+    if self.game.player_of_turn == self.player.player_id:
+      return state + (self.indicator_anim_cursor.current,)
+
+    return state
+
+  def get_time_until_change(self) -> float | None:
+    return 0 if self.game.player_of_turn == self.player.player_id else None
+
+  def draw(self, screen):
     board_copy = self.board_object.copy()
     self.player_name_text.draw(board_copy)
     self.player_treasure_count.draw(board_copy)
@@ -340,8 +1178,6 @@ class PlayerBoard(Component):
     screen.blit(board_copy, self.board_object_rect.topleft)
 
     if self.game.player_of_turn == self.player.player_id:
-      dt = 10 / 60 # (número de animação por 60fps) # Quanto maior, mais rápido
-      self.indicator_anim_cursor.update(dt)
       indicator = self.indicator_anim_cursor.current
       screen.blit(indicator, self.turn_indicator_rect.topleft)
 
@@ -361,6 +1197,7 @@ class SoundtrackToggle(Component):
     super().__init__(position, alignment)
     self._interactable = True
     self._animated = True
+    self._stateless_draw = True
 
     self.on_sprite_source = on_sprite_source
     self.off_sprite_source = off_sprite_source
@@ -389,6 +1226,12 @@ class SoundtrackToggle(Component):
     # Só uma verificação tá bom, já que o butão de on deve ser identico ao de off
     return self.on_button.is_mouse_within_bounding_box(mouse_pos)
 
+  def get_area(self) -> pygame.Rect:
+    return self.on_button.get_area().union(self.off_button.get_area())
+
+  def get_draw_state(self):
+    return (self.scene_manager.is_soundtrack_playing(), self.on_button.get_draw_state(), self.off_button.get_draw_state())
+
   def draw(self, screen):
     if self.scene_manager.is_soundtrack_playing():
       self.on_button.draw(screen)
@@ -451,7 +1294,9 @@ class Submarine(Component):
       self.submarine_image.move_by(self.game_map_width / 2, 0)
       self.submarine_image.disabled = True
 
-    self.submarine_speed = 2 if self.game.map_size == 15 else 1
+    # Posição no passo de lógica atual e no anterior, para desenhar entre os dois
+    self.submarine_x = self.submarine_image.get_x_position()
+    self.previous_submarine_x = self.submarine_x
 
   def handle_submarine_click(self):
     if not self.game.first_player_sorted:
@@ -480,18 +1325,9 @@ class Submarine(Component):
 
       # Se já tem um número sorteado e precisa de interação, procede.
 
-      # Tira ele do modo de ativação de interação e coloca ele no modo de ação
-      self.game.need_player_activation = False
-      self.game.need_player_action = True
-
-      # Calcula os possíveis passos para baixo, considerando o dado sorteado
+      # Tira ele do modo de ativação de interação e coloca ele no modo de ação.
       # Até aqui, o número de dados sorteados deve ser maior que 0
-      middle_x = self.game.map_size // 2
-      self.game.current_possible_steps = self.game.calculate_possible_steps(
-        (middle_x, -1),
-        self.game.sorted_dice_number,
-        search_for=[Direction.DOWN] # Só pesquisa os possíveis caminho para baixo
-      )
+      self.game.activate_current_player()
 
     else:
       # TODO: colocar pra voltar pro submarino, guardar tesouros, etc...
@@ -527,25 +1363,50 @@ class Submarine(Component):
       if player_x not in possible_on_board_positions:
         return
 
-      self.game.need_submarine_option = True
+      self.game.open_submarine_options()
 
-  def update_submarine_animation(self):
+  def get_submarine_speed(self) -> float:
+    """
+      Retorna a velocidade do submarino em pixels por segundo, a partir\n
+      da largura que cada coluna do mapa ocupa na tela agora.
+    """
+    return SUBMARINE_COLUMNS_PER_SECOND * self.game.map_object_rect_width / self.game.map_size
+
+  def update_submarine_animation(self, dt: float):
+    submarine_speed = self.get_submarine_speed()
 
     if self.at_the_end:
-      self.submarine_image.move_by(-self.submarine_speed, 0)
-      if self.submarine_image.get_x_position() <= self.initial_x_position:
+      self.submarine_x -= submarine_speed * dt
+      if self.submarine_x <= self.initial_x_position:
         self.at_the_end = False
         self.submarine_image.set_use_flip(False)
     else:
-      self.submarine_image.move_by(self.submarine_speed, 0)
-      if self.submarine_image.get_x_position() >= self.final_x_position:
+      self.submarine_x += submarine_speed * dt
+      if self.submarine_x >= self.final_x_position:
         self.at_the_end = True
         self.submarine_image.set_use_flip(True)
 
-  def draw(self, screen):
+  def get_area(self) -> pygame.Rect:
+    return self.submarine_image.get_area()
+
+  def get_draw_state(self):
+    return self.submarine_image.get_draw_state()
+
+  def step(self, dt: float):
+    self.previous_submarine_x = self.submarine_x
+    self.submarine_image.step(dt)
+
     if self.game.difficulty == Difficulty.HARD and self.game.has_everybody_left_the_submarine_already():
-      self.update_submarine_animation()
+      self.update_submarine_animation(dt)
+
+  def interpolate(self, alpha: float):
+    x = self.previous_submarine_x + (self.submarine_x - self.previous_submarine_x) * alpha
+    self.submarine_image.move_by(round(x) - self.submarine_image.get_x_position(), 0)
 
+  def get_time_until_change(self) -> float | None:
+    return self.submarine_image.get_time_until_change()
+
+  def draw(self, screen):
     self.submarine_image.draw(screen)
 
   def listen(self, event):
@@ -557,7 +1418,10 @@ class FirstPlayerSorter(Component):
     self,
     position: tuple[int, int],
     game: Game,
-    alignment: Alignment = Alignment.CENTER
+    alignment: Alignment = Alignment.CENTER,
+    clock: Clock = None,
+    close_after: float = DEFAULT_DIALOG_DURATION,
+    skip_on_click: bool = False
   ):
     super().__init__(position, alignment=alignment)
     self._interactable = True
@@ -566,8 +1430,17 @@ class FirstPlayerSorter(Component):
     self._expanded = True
 
     self.game = game
+    # Relógio usado para esperar antes de fechar
+    self.clock = clock if clock else MAIN_CLOCK
+    # Tempo, em segundos, que o resultado fica na tela. Com `skip_on_click`,
+    # um clique no diálogo fecha ele antes desse tempo
+    self.close_after = close_after
+    self.skip_on_click = skip_on_click
+    self.skip_requested = False
 
     self.time_before_closure = float
+    # Indica se o resultado do sorteio já está sendo mostrado
+    self.result_shown = False
 
     self.__setup()
 
@@ -615,14 +1488,9 @@ class FirstPlayerSorter(Component):
     self.anim_cursor.play()
 
     def sort_player():
-      self.game.first_player_sorted = True
-      self.game.player_of_turn = random.randint(1, len(self.anim_cursor.anim.frames))
-      self.anim_cursor.reset()
-
-      self.first_title.text = "Primeiro jogador sorteado:"
-      self.second_title.text = f"{self.game.player_of_turn}"
-
-      self.time_before_closure = timer()
+      # O resultado aparece quando o sorteio chega no jogo (ver `update`)
+      self.game.sort_first_player()
+      self.time_before_closure = self.clock.get_time()
 
     self.draw_button = SpriteButton(
       (middle_x, self.background_source.get_real_sprite_height() * 0.85),
@@ -649,20 +1517,80 @@ class FirstPlayerSorter(Component):
     # Muda hitbox do botão pra ser a dessa classe
     self.draw_button.is_mouse_within_bounding_box = self.virtual_is_mouse_within_bounding_box
 
+    # Numa partida continuada o primeiro jogador já foi sorteado
+    if self.game.first_player_sorted:
+      self._expanded = False
+      self.disabled = True
+
+  def step(self, dt: float):
+    # Enquanto o primeiro jogador não é sorteado, os mergulhadores vão passando
+    if self._expanded and not self.game.first_player_sorted:
+      # Cada sprite dura 1, então são 10 sprites por segundo # Quanto maior, mais rápido
+      self.anim_cursor.update(10 * dt)
+
+  def update(self):
+    # O resultado e o tempo para fechar são conferidos uma vez por frame,
+    # antes do desenho, a partir do estado que o jogo já tem
+    if not self._expanded or not self.game.first_player_sorted:
+      return
+
+    if not self.result_shown:
+      self.result_shown = True
+      self.anim_cursor.reset()
+
+      self.first_title.text = "Primeiro jogador sorteado:"
+      self.second_title.text = f"{self.game.player_of_turn}"
+
+    current_time = self.clock.get_time()
+
+    if current_time - self.time_before_closure >= self.close_after or self.skip_requested:
+      self.skip_requested = False
+      self._expanded = False
+      # Desativa o botão para ele não atrapalhar o click dos botões em baixo dele
+      self.disabled = True
+      self.game.start_first_turn()
+
+  def take_state_from(self, previous: "FirstPlayerSorter"):
+    """
+      Continua o sorteio de onde o diálogo do layout anterior parou,\n
+      inclusive a espera para fechar depois do sorteio.
+    """
+    self._expanded = previous._expanded
+    self.disabled = previous.disabled
+    self.time_before_closure = previous.time_before_closure
+    self.skip_requested = previous.skip_requested
+    self.result_shown = previous.result_shown
+
+    self.first_title.text = previous.first_title.text
+    self.second_title.text = previous.second_title.text
+
   def virtual_is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
     return self.virtual_draw_button_rect.collidepoint(mouse_pos)
 
   def is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
     return self.background_rect.collidepoint(mouse_pos)
 
+  def is_skip_click(self, event: pygame.event.Event) -> bool:
+    """
+      Verifica se o evento é um clique no diálogo que pula a espera\n
+      para fechar (só no modo turbo).
+    """
+    return (
+      self.skip_on_click and
+      event.type == pygame.MOUSEBUTTONDOWN and
+      event.button == MOUSE_LEFT_BUTTON and
+      self.background_rect.collidepoint(event.pos)
+    )
+
   def listen(self, event):
     if not self._expanded:
       return
 
     if self.game.first_player_sorted:
+      self.skip_requested = self.skip_requested or self.is_skip_click(event)
       return
 
-    mouse_pos = pygame.mouse.get_pos()
+    mouse_pos = get_mouse_pos()
     if self.virtual_is_mouse_within_bounding_box(mouse_pos):
       self.draw_button.listen(event)
 
@@ -672,6 +1600,16 @@ class FirstPlayerSorter(Component):
 
     self.draw_button.animate(animation_reset)
 
+  def get_area(self) -> pygame.Rect:
+    if not self._expanded:
+      return pygame.Rect(self.background_rect.center, (0, 0))
+
+    return self.background_rect
+
+  def get_draw_state(self):
+    # Enquanto aparece, ele é animado e o `update` confere o tempo para fechar
+    return ALWAYS_DIRTY if self._expanded else None
+
   def draw(self, screen):
     if not self._expanded:
       return
@@ -679,20 +1617,7 @@ class FirstPlayerSorter(Component):
     player: pygame.Surface = None
     if self.game.first_player_sorted:
       player = self.players_source.sprites[self.game.player_of_turn - 1]
-
-      current_time = timer()
-      time_to_close = math.trunc(current_time - self.time_before_closure)
-
-      if time_to_close >= 3:
-        self._expanded = False
-        self.disabled = True
-        self.game.need_dice_sort = True
-        # Desativa o botão para ele não atrapalhar o click dos botões em baixo dele
-        self.disabled = True
-        return
     else:
-      dt = 10 / 60 # (número de animação por 60fps) # Quanto maior, mais rápido
-      self.anim_cursor.update(dt)
       player = self.anim_cursor.current
 
     # Fundo
@@ -716,7 +1641,10 @@ class DiceRoller(Component):
     self,
     position: tuple[int, int],
     game: Game,
-    alignment: Alignment = Alignment.CENTER
+    alignment: Alignment = Alignment.CENTER,
+    clock: Clock = None,
+    close_after: float = DEFAULT_DIALOG_DURATION,
+    skip_on_click: bool = False
   ):
     super().__init__(position, alignment=alignment)
     self._interactable = True
@@ -725,8 +1653,17 @@ class DiceRoller(Component):
     self._expanded = True
 
     self.game = game
-
-    self.dice_sorted = False
+    # Relógio usado para esperar antes de fechar
+    self.clock = clock if clock else MAIN_CLOCK
+    # Tempo, em segundos, que o resultado fica na tela. Com `skip_on_click`,
+    # um clique no diálogo fecha ele antes desse tempo
+    self.close_after = close_after
+    self.skip_on_click = skip_on_click
+    self.skip_requested = False
+
+    self.time_before_closure = 0.0
+    # Versão do estado da partida em que o fim do sorteio foi enviado
+    self.finish_sent_version: int | None = None
     self.__setup()
 
 
@@ -774,14 +1711,10 @@ class DiceRoller(Component):
     self.dice_faces_rect = self.dice_faces_source.generate_sprite_rect(dice_pos, alignment=self.alignment)
 
     def sort_dice():
-      self.time_before_closure = timer()
-
-      self.game.sorted_dice_number = self.game.dice()
-      self.dice_sorted = True
-
-      self.first_title.text = "Número sorteado:"
-      self.second_title.text = f"{self.game.sorted_dice_number}"
+      self.time_before_closure = self.clock.get_time()
 
+      # O número aparece quando o sorteio chega no jogo (ver `update`)
+      self.game.roll_dice()
 
     self.roll_button = SpriteButton(
       (middle_x, self.background_source.get_real_sprite_height() * 0.85),
@@ -808,20 +1741,74 @@ class DiceRoller(Component):
     # Muda hitbox do botão pra ser a dessa classe
     self.roll_button.is_mouse_within_bounding_box = self.virtual_is_mouse_within_bounding_box
 
+  def update(self):
+    # O número sorteado e o tempo para fechar são conferidos uma vez por
+    # frame, antes do desenho, a partir do estado que o jogo já tem
+    if not self.game.need_dice_sort:
+      return
+
+    if not self.game.dice_rolled:
+      self.__set_titles("Clique para sortear", "um número de dado")
+      return
+
+    self.__set_titles("Número sorteado:", f"{self.game.sorted_dice_number}")
+
+    current_time = self.clock.get_time()
+
+    # O diálogo some quando o fim do sorteio chega no jogo. A ação só é
+    # enviada de novo se o estado mudar antes disso (ela foi rejeitada)
+    if self.finish_sent_version == self.game.state_version:
+      return
+
+    if current_time - self.time_before_closure >= self.close_after or self.skip_requested:
+      self.skip_requested = False
+      self.finish_sent_version = self.game.state_version
+      self.game.finish_dice_roll()
+
+  def __set_titles(self, first_title: str, second_title: str):
+    # O texto só é renderizado de novo quando muda
+    if self.first_title.text != first_title:
+      self.first_title.text = first_title
+
+    if self.second_title.text != second_title:
+      self.second_title.text = second_title
+
+  def take_state_from(self, previous: "DiceRoller"):
+    """
+      Mantém o tempo que falta para o diálogo do layout anterior\n
+      fechar. O número sorteado fica no jogo.
+    """
+    self.skip_requested = previous.skip_requested
+    self.time_before_closure = previous.time_before_closure
+    self.finish_sent_version = previous.finish_sent_version
+
   def virtual_is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
     return self.virtual_roll_button_rect.collidepoint(mouse_pos)
 
   def is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
     return self.background_rect.collidepoint(mouse_pos)
 
+  def is_skip_click(self, event: pygame.event.Event) -> bool:
+    """
+      Verifica se o evento é um clique no diálogo que pula a espera\n
+      para fechar (só no modo turbo).
+    """
+    return (
+      self.skip_on_click and
+      event.type == pygame.MOUSEBUTTONDOWN and
+      event.button == MOUSE_LEFT_BUTTON and
+      self.background_rect.collidepoint(event.pos)
+    )
+
   def listen(self, event):
     if not self.game.need_dice_sort:
       return
 
-    if self.dice_sorted:
+    if self.game.dice_rolled:
+      self.skip_requested = self.skip_requested or self.is_skip_click(event)
       return
 
-    mouse_pos = pygame.mouse.get_pos()
+    mouse_pos = get_mouse_pos()
     if self.virtual_is_mouse_within_bounding_box(mouse_pos):
       self.roll_button.listen(event)
 
@@ -835,6 +1822,16 @@ class DiceRoller(Component):
 
     self.roll_button.animate(animation_reset)
 
+  def get_area(self) -> pygame.Rect:
+    if not self.game.need_dice_sort:
+      return pygame.Rect(self.background_rect.center, (0, 0))
+
+    return self.background_rect
+
+  def get_draw_state(self):
+    # Enquanto aparece, ele é animado e o `update` confere o tempo para fechar
+    return ALWAYS_DIRTY if self.game.need_dice_sort else None
+
   def draw(self, screen):
     if not self.game.need_dice_sort:
       return
@@ -845,36 +1842,8 @@ class DiceRoller(Component):
     # Jogador
 
     dice_surface: pygame.Surface = self.dice_3d_source.first_sprite()
-    if self.dice_sorted:
+    if self.game.dice_rolled:
       dice_surface = self.dice_faces_source.sprites[self.game.sorted_dice_number]
-
-      current_time = timer()
-      time_to_close = math.trunc(current_time - self.time_before_closure)
-
-      if time_to_close >= 3:
-        self.game.need_dice_sort = False
-        self.dice_sorted = False
-
-        # Reseta o texto no dado para ficar intuitivo
-        self.first_title.text = "Clique para sortear"
-        self.second_title.text = "um número de dado"
-
-        player = self.game.get_current_player_of_turn()
-
-        # Se ele estiver no submarino e tirar zero, ele não pode fazer nada.
-        # Só esperar pela próxima vez dele.
-        if self.game.sorted_dice_number == 0:
-          self.game.go_to_next_player_turn()
-        else:
-          # Se o jogador tirar 0, ele não pode ser mover, mas pode
-          # interar com a casa que ele está. Por exemplo, se, na casa
-          # que ele está, ainda tem um tesouro, ele pode escolher
-          # pegar o tesouro dessa vez. Fora isso, ele pode jogar
-          # normalmente.
-          self.game.need_player_activation = True
-
-        return
-
       background.blit(dice_surface, self.dice_faces_rect.topleft)
 
     else:
@@ -905,6 +1874,8 @@ class PlayerDecision(Component):
     self.game = game
     self.__setup()
 
+    self.game.subscribe(GameEvent.TREASURE_TOO_HEAVY, self.show_weight_warning)
+
   def __setup(self):
 
     self.background_source = SpriteSource(
@@ -961,29 +1932,9 @@ class PlayerDecision(Component):
       self.second_warning_title.text = ""
 
     def on_yes():
-      player = self.game.get_current_player_of_turn()
-      player_treasures_weight = player.get_treasures_weight()
-
-      treasure = self.game.treasure_being_taken
-      treasure_weight = treasure.weight
-
-      if player_treasures_weight + treasure_weight > 15:
-        self.first_warning_title.text = "O peso dos tesouros não"
-        self.second_warning_title.text = "podem ser maior que 15kg!"
-        return
-
+      # Se o tesouro passar do peso máximo, o jogo avisa com `GameEvent.TREASURE_TOO_HEAVY`
       clean_warning_titles()
-
-      player_x, player_y = player.position
-
-      player.treasures.append(treasure)
-      # Até esse momento, a nova posição do jogador já condiz com a posição do tesouro
-      # na matriz do mapa.
-      self.game.map[player_x][player_y] = None
-      self.game.need_player_decision = False
-      self.game.clear_treasure_being_taken()
-
-      self.game.go_to_next_player_turn()
+      self.game.take_treasure()
 
     self.yes_button = SpriteButton(
       (middle_x - half_of_real_width - button_gap, self.background_source.get_real_sprite_height() * 0.85),
@@ -993,9 +1944,7 @@ class PlayerDecision(Component):
 
     def on_no():
       clean_warning_titles()
-      self.game.need_player_decision = False
-      self.game.clear_treasure_being_taken()
-      self.game.go_to_next_player_turn()
+      self.game.leave_treasure()
 
     self.no_button = SpriteButton(
       (middle_x + half_of_real_width + button_gap, self.background_source.get_real_sprite_height() * 0.85),
@@ -1023,6 +1972,16 @@ class PlayerDecision(Component):
     self.yes_button.is_mouse_within_bounding_box = self.yes_virtual_is_mouse_within_bounding_box
     self.no_button.is_mouse_within_bounding_box = self.no_virtual_is_mouse_within_bounding_box
 
+  def show_weight_warning(self):
+    """
+      Avisa que o tesouro passa do peso máximo que o jogador pode carregar.
+    """
+    self.first_warning_title.text = "O peso dos tesouros não"
+    self.second_warning_title.text = f"podem ser maior que {MAX_TREASURES_WEIGHT}kg!"
+
+  def close(self):
+    self.game.unsubscribe(GameEvent.TREASURE_TOO_HEAVY, self.show_weight_warning)
+
   def yes_virtual_is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
     return self.virtual_yes_button_rect.collidepoint(mouse_pos)
 
@@ -1049,7 +2008,7 @@ class PlayerDecision(Component):
     if not self.game.need_player_decision:
       return
 
-    mouse_pos = pygame.mouse.get_pos()
+    mouse_pos = get_mouse_pos()
     if self.yes_virtual_is_mouse_within_bounding_box(mouse_pos):
       self.yes_button.listen(event)
       return
@@ -1058,6 +2017,16 @@ class PlayerDecision(Component):
       self.no_button.listen(event)
       return
 
+  def get_area(self) -> pygame.Rect:
+    if not self.game.need_player_decision:
+      return pygame.Rect(self.background_rect.center, (0, 0))
+
+    return self.background_rect
+
+  def get_draw_state(self):
+    # Os botões dele são animados
+    return ALWAYS_DIRTY if self.game.need_player_decision else None
+
   def draw(self, screen):
     if not self.game.need_player_decision:
       return
@@ -1129,14 +2098,7 @@ class SubmarineOptions(Component):
     button_gap = 10
 
     def on_store_treasures():
-      self.game.need_submarine_option = False
-      player = self.game.get_current_player_of_turn()
-      if player.get_treasure_count() > 0:
-        for treasure in player.treasures:
-          player.stored_treasures.append(treasure)
-
-        player.treasures.clear()
-
+      self.game.store_treasures()
 
     self.store_treasures_button = SpriteButton(
       (middle_x, self.background_source.get_real_sprite_height() * 0.25 + button_gap),
@@ -1145,11 +2107,7 @@ class SubmarineOptions(Component):
     )
 
     def on_get_on_board():
-      self.game.need_submarine_option = False
-      player = self.game.get_current_player_of_turn()
-      player.position = (-1, -1)
-      player.playing = False
-      self.game.go_to_next_player_turn()
+      self.game.get_on_board()
 
     self.get_on_board_button = SpriteButton(
       (middle_x, self.store_treasures_button.get_y_position() + button_height + button_gap),
@@ -1158,7 +2116,7 @@ class SubmarineOptions(Component):
     )
 
     def on_quit():
-      self.game.need_submarine_option = False
+      self.game.close_submarine_options()
 
     self.quit_button = SpriteButton(
       (middle_x, self.get_on_board_button.get_y_position() + button_height + button_gap),
@@ -1222,7 +2180,7 @@ class SubmarineOptions(Component):
     if not self.game.need_submarine_option:
       return
 
-    mouse_pos = pygame.mouse.get_pos()
+    mouse_pos = get_mouse_pos()
     if self.store_treasures_virtual_is_mouse_within_bounding_box(mouse_pos):
       self.store_treasures_button.listen(event)
       return
@@ -1235,6 +2193,16 @@ class SubmarineOptions(Component):
       self.quit_button.listen(event)
       return
 
+  def get_area(self) -> pygame.Rect:
+    if not self.game.need_submarine_option:
+      return pygame.Rect(self.background_rect.center, (0, 0))
+
+    return self.background_rect
+
+  def get_draw_state(self):
+    # Os botões dele são animados
+    return ALWAYS_DIRTY if self.game.need_submarine_option else None
+
   def draw(self, screen):
     if not self.game.need_submarine_option:
       return
@@ -1255,7 +2223,8 @@ class WinnerDisplay(Component):
     self,
     position: tuple[int, int],
     game: Game,
-    alignment: Alignment = Alignment.CENTER
+    alignment: Alignment = Alignment.CENTER,
+    on_show: Callable[[Player], None] = None
   ):
     super().__init__(position, alignment=alignment)
     self._interactable = True
@@ -1263,6 +2232,8 @@ class WinnerDisplay(Component):
     self.disabled = True
 
     self.game = game
+    # Chamado uma única vez, quando o vencedor é mostrado
+    self.on_show = on_show
 
     self.__setup()
 
@@ -1332,6 +2303,15 @@ class WinnerDisplay(Component):
     # Muda hitbox do botão pra ser a dessa classe
     self.quit_button.is_mouse_within_bounding_box = self.virtual_is_mouse_within_bounding_box
 
+  def take_state_from(self, previous: "WinnerDisplay"):
+    """
+      Mantém o vencedor já mostrado pelo diálogo do layout anterior,\n
+      para que `on_show` não seja chamado de novo.
+    """
+    self.disabled = previous.disabled
+    self.winner = previous.winner
+    self.second_title.text = previous.second_title.text
+
   def virtual_is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
     return self.virtual_quit_button_rect.collidepoint(mouse_pos)
 
@@ -1342,7 +2322,7 @@ class WinnerDisplay(Component):
     if not self.game.game_has_ended:
       return
 
-    mouse_pos = pygame.mouse.get_pos()
+    mouse_pos = get_mouse_pos()
     if self.virtual_is_mouse_within_bounding_box(mouse_pos):
       self.quit_button.listen(event)
 
@@ -1352,12 +2332,25 @@ class WinnerDisplay(Component):
         self.disabled = False
         self.winner = self.game.get_winner_player()
         self.second_title.text = f"jogador {self.winner.player_id}"
+
+        if self.on_show:
+          self.on_show(self.winner)
     else:
       if not self.disabled:
         self.disabled = True
 
     self.quit_button.animate(animation_reset)
 
+  def get_area(self) -> pygame.Rect:
+    if not self.game.game_has_ended:
+      return pygame.Rect(self.background_rect.center, (0, 0))
+
+    return self.background_rect
+
+  def get_draw_state(self):
+    # Os botões dele são animados
+    return ALWAYS_DIRTY if self.game.game_has_ended else None
+
   def draw(self, screen):
     if not self.game.game_has_ended:
       return
@@ -1375,3 +2368,163 @@ class WinnerDisplay(Component):
     self.quit_button.draw(background)
 
     screen.blit(background, self.background_rect.topleft)
+
+class ResumeDecision(Component):
+  """
+    Pergunta se o jogador quer continuar a partida que foi\n
+    salva automaticamente.
+  """
+
+  def __init__(
+    self,
+    position: tuple[int, int],
+    on_yes: Callable[[], None],
+    on_no: Callable[[], None]
+  ):
+    super().__init__(position)
+    self._interactable = True
+    self._animated = True
+    self._expandable = True
+    self._expanded = True
+
+    self.on_yes = on_yes
+    self.on_no = on_no
+    self.__setup()
+
+  def __setup(self):
+
+    self.background_source = SpriteSource(
+      ["square_banner.png"],
+      scale_by_size=(3.5, 2.5)
+    )
+
+    self.background_rect = self.background_source.generate_sprite_rect(self.position)
+
+    middle_x = self.background_source.get_real_sprite_width() // 2
+    middle_y = self.background_source.get_real_sprite_height() // 2
+
+    self.first_title = Text(
+      (middle_x, middle_y - 30),
+      "Há uma partida salva.",
+      32,
+      "white",
+    )
+
+    self.second_title = Text(
+      (middle_x, middle_y),
+      "Deseja continuar?",
+      32,
+      "white",
+    )
+
+    yes_button_source = SpriteSource(
+      ["buttons", "yes.png"],
+      (64, 26),
+      scale_by_size=(2, 2)
+    )
+
+    no_button_source = SpriteSource(
+      ["buttons", "no.png"],
+      (64, 26),
+      scale_by_size=(2, 2)
+    )
+
+    half_of_real_width = yes_button_source.get_real_sprite_width() // 2
+    button_gap = 30
+
+    def close():
+      self._expanded = False
+      # Desativa o componente para ele não atrapalhar o click dos botões em baixo dele
+      self.disabled = True
+
+    def on_yes():
+      close()
+      self.on_yes()
+
+    def on_no():
+      close()
+      self.on_no()
+
+    self.yes_button = SpriteButton(
+      (middle_x - half_of_real_width - button_gap, self.background_source.get_real_sprite_height() * 0.85),
+      yes_button_source,
+      on_click=lambda _: on_yes()
+    )
+
+    self.no_button = SpriteButton(
+      (middle_x + half_of_real_width + button_gap, self.background_source.get_real_sprite_height() * 0.85),
+      no_button_source,
+      on_click=lambda _: on_no()
+    )
+
+    # Só vai ter a hitbox do botão, como a posição é relativa a posição
+    # geral passada na classe. Temos que acontar a ela
+    sprite_width, sprite_height = self.yes_button.sprite_source.real_sprite_size
+
+    remaining_background_left = self.get_x_position() - self.background_source.get_real_sprite_width() // 2
+    remaining_background_top = self.get_y_position() - self.background_source.get_real_sprite_height() // 2
+
+    yes_button_left = remaining_background_left + self.yes_button.get_x_position() - (sprite_width // 2)
+    yes_button_top = remaining_background_top + self.yes_button.get_y_position() - (sprite_height // 2)
+
+    no_button_left = remaining_background_left + self.no_button.get_x_position() - (sprite_width // 2)
+    no_button_top = remaining_background_top + self.no_button.get_y_position() - (sprite_height // 2)
+
+    self.virtual_yes_button_rect = pygame.Rect(yes_button_left, yes_button_top, sprite_width, sprite_height)
+    self.virtual_no_button_rect = pygame.Rect(no_button_left, no_button_top, sprite_width, sprite_height)
+
+    # Muda hitbox do botão pra ser a dessa classe
+    self.yes_button.is_mouse_within_bounding_box = self.yes_virtual_is_mouse_within_bounding_box
+    self.no_button.is_mouse_within_bounding_box = self.no_virtual_is_mouse_within_bounding_box
+
+  def yes_virtual_is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
+    return self.virtual_yes_button_rect.collidepoint(mouse_pos)
+
+  def no_virtual_is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
+    return self.virtual_no_button_rect.collidepoint(mouse_pos)
+
+  def is_mouse_within_bounding_box(self, mouse_pos: tuple[int, int]):
+    return self.background_rect.collidepoint(mouse_pos)
+
+  def animate(self, animation_reset = False):
+    if not self._expanded:
+      return
+
+    self.yes_button.animate(animation_reset)
+    self.no_button.animate(animation_reset)
+
+  def listen(self, event):
+    if not self._expanded:
+      return
+
+    mouse_pos = get_mouse_pos()
+    if self.yes_virtual_is_mouse_within_bounding_box(mouse_pos):
+      self.yes_button.listen(event)
+      return
+
+    if self.no_virtual_is_mouse_within_bounding_box(mouse_pos):
+      self.no_button.listen(event)
+      return
+
+  def get_area(self) -> pygame.Rect:
+    if not self._expanded:
+      return pygame.Rect(self.background_rect.center, (0, 0))
+
+    return self.background_rect
+
+  def get_draw_state(self):
+    # Os botões dele são animados
+    return ALWAYS_DIRTY if self._expanded else None
+
+  def draw(self, screen):
+    if not self._expanded:
+      return
+
+    background = self.background_source.first_sprite().copy()
+
+    self.first_title.draw(background)
+    self.second_title.draw(background)
+
+    self.yes_button.draw(background)
+    self.no_button.draw(background)
+    screen.blit(background, self.background_rect.topleft)
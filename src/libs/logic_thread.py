@@ -0,0 +1,281 @@
+import queue
+import threading
+from concurrent.futures import Future
+from types import MappingProxyType
+from typing import Any, Callable, Dict
+from logic import Game, GameEvent, Player
+
+# Ações da partida (as funções de `Game` que mudam o estado). No modo com
+# a thread de lógica, elas só são executadas pela thread de lógica
+GAME_ACTIONS = frozenset({
+  "configure_game",
+  "populate_map",
+  "restore_snapshot",
+  "sort_first_player",
+  "start_first_turn",
+  "roll_dice",
+  "finish_dice_roll",
+  "activate_current_player",
+  "pass_turn",
+  "move_current_player",
+  "take_treasure",
+  "leave_treasure",
+  "open_submarine_options",
+  "close_submarine_options",
+  "store_treasures",
+  "get_on_board"
+})
+
+# Ações que preparam a partida antes do layout da cena. A cena monta os
+# componentes a partir do jogo já configurado, então elas esperam o resultado
+SETUP_ACTIONS = frozenset({
+  "configure_game",
+  "populate_map",
+  "restore_snapshot"
+})
+
+# Objeto usado para avisar a thread de lógica que ela deve terminar
+STOP_SIGNAL = object()
+
+class FrozenPlayer(Player):
+  """
+    Cópia de um jogador que não pode ser modificada.
+  """
+  def __init__(self, player: Player):
+    # Não chama o `__init__` do Player, que criaria um jogador novo
+    self.__dict__.update(
+      player.__dict__,
+      treasures=tuple(player.treasures),
+      stored_treasures=tuple(player.stored_treasures)
+    )
+
+  def __setattr__(self, name: str, value: Any):
+    raise AttributeError(f"O jogador de um snapshot não pode ser modificado ({name}).")
+
+class GameSnapshot(Game):
+  """
+    Cópia imutável do estado da partida, com as mesmas consultas\n
+    de `Game` (ex.: `get_current_player_of_turn`). As entidades do\n
+    mapa são compartilhadas com o jogo, pois nunca são modificadas,\n
+    só trocadas; o resto é copiado para tuplas e cópias congeladas.
+  """
+  def __init__(self, game: Game):
+    state = dict(game.__dict__)
+    state["listeners"] = MappingProxyType({})
+
+    if "map" in state:
+      state["map"] = tuple(tuple(column) for column in game.map)
+      state["map_cells"] = bytes(game.map_cells)
+
+    if "players" in state:
+      state["players"] = tuple(FrozenPlayer(player) for player in game.players)
+
+    if state.get("current_possible_steps") is not None:
+      state["current_possible_steps"] = MappingProxyType({
+        direction: tuple(steps) for direction, steps in game.current_possible_steps.items()
+      })
+
+    self.__dict__.update(state)
+
+  def __setattr__(self, name: str, value: Any):
+    raise AttributeError(f"O snapshot da partida não pode ser modificado ({name}).")
+
+class LogicThread:
+  """
+    Thread dona do objeto do jogo. As ações da partida são\n
+    enviadas por uma fila e executadas uma de cada vez nela,\n
+    na ordem em que chegaram. Depois de cada ação (mesmo uma\n
+    que falhou), um snapshot novo é montado na própria thread\n
+    e só então publicado, então o snapshot publicado sempre\n
+    corresponde ao objeto do jogo entre duas ações.
+  """
+  def __init__(self, game: Game):
+    self.game = game
+    self.queue: queue.Queue = queue.Queue()
+
+    # Protege os snapshots publicados e avisa quem espera por um deles
+    self.condition = threading.Condition()
+    self.snapshot = GameSnapshot(game)
+    # Snapshots publicados que ainda não foram adotados, cada um com os eventos da sua ação
+    self.published: list[tuple[GameSnapshot, list[GameEvent]]] = []
+    # Ações na fila ou sendo executadas
+    self.unfinished_actions = 0
+
+    # Eventos avisados pelo jogo durante a ação que está sendo executada
+    self.action_events: list[GameEvent] = []
+    for event in GameEvent:
+      game.subscribe(event, lambda event=event: self.action_events.append(event))
+
+    self.thread = threading.Thread(target=self.__logic_loop, name="game-logic", daemon=True)
+    self.thread.start()
+
+  def submit(self, action: str, *args, state_version: int | None = None, **kwargs) -> Future:
+    """
+      Coloca uma ação da partida na fila. Com `state_version`, a ação\n
+      só é executada se o jogo ainda estiver nessa versão do estado\n
+      (a que a interface viu quando decidiu a ação); caso contrário,\n
+      ela é rejeitada e o `Future` fica com o resultado `None`. O\n
+      resultado da ação fica disponível no `Future` retornado depois\n
+      que o snapshot com ela já foi publicado.
+    """
+    if action not in GAME_ACTIONS:
+      raise SystemExit(f"A ação {action} não é uma ação da partida.")
+
+    future = Future()
+    with self.condition:
+      self.unfinished_actions += 1
+
+    self.queue.put((future, action, args, kwargs, state_version))
+    return future
+
+  def take_published_state(self, state_version: int | None = None) -> tuple[GameSnapshot | None, list[GameEvent]]:
+    """
+      Retorna o último snapshot publicado (ou `None`, se nenhum foi\n
+      publicado desde a última chamada) e os eventos que aconteceram\n
+      até ele. Com `state_version`, espera o snapshot dessa versão e\n
+      para nele, deixando os seguintes para a próxima chamada.
+    """
+    with self.condition:
+      if state_version is not None:
+        self.condition.wait_for(lambda: self.snapshot.state_version >= state_version or not self.unfinished_actions)
+
+        if self.snapshot.state_version < state_version:
+          raise SystemExit(f"O estado da partida {state_version} nunca foi alcançado (o último é o {self.snapshot.state_version}).")
+
+      taken = self.published
+      if state_version is not None:
+        taken = [item for item in self.published if item[0].state_version <= state_version]
+
+      self.published = self.published[len(taken):]
+
+    events = [event for _, action_events in taken for event in action_events]
+    return (taken[-1][0] if taken else None, events)
+
+  def close(self):
+    """
+      Espera as ações que já estão na fila e termina a thread de lógica.
+    """
+    self.queue.put(STOP_SIGNAL)
+    self.thread.join()
+
+  def __publish(self):
+    snapshot = GameSnapshot(self.game)
+
+    with self.condition:
+      self.snapshot = snapshot
+      self.published.append((snapshot, self.action_events))
+
+  def __run_action(self, future: Future, action: str, args: tuple, kwargs: dict, state_version: int | None):
+    if not future.set_running_or_notify_cancel():
+      return
+
+    # A ação foi decidida em um estado que já mudou (ex.: dois cliques no
+    # mesmo botão antes do snapshot novo chegar na interface)
+    if state_version is not None and state_version != self.game.state_version:
+      future.set_result(None)
+      return
+
+    self.action_events = []
+    try:
+      result = getattr(self.game, action)(*args, **kwargs)
+    except BaseException as error:
+      # O jogo pode ter ficado com a ação pela metade, então o estado em que
+      # ele ficou também é publicado. O erro (ex.: o SystemExit dos erros do
+      # jogo) é levantado de novo na interface
+      self.__publish()
+      future.set_exception(error)
+      return
+
+    self.__publish()
+    future.set_result(result)
+
+  def __logic_loop(self):
+    item = self.queue.get()
+
+    while item is not STOP_SIGNAL:
+      self.__run_action(*item)
+
+      with self.condition:
+        self.unfinished_actions -= 1
+        self.condition.notify_all()
+
+      item = self.queue.get()
+
+class ThreadedGame:
+  """
+    Objeto do jogo usado pela interface no modo com a thread de lógica.\n
+    As leituras são feitas no snapshot adotado pela thread de renderização,\n
+    que só muda entre os frames (com :py:meth:`sync`). As ações da partida\n
+    são só enviadas para a thread de lógica, sem esperar, junto com a\n
+    versão do snapshot em que a interface decidiu a ação: a thread de\n
+    lógica rejeita as que foram decididas em um estado que já mudou. A\n
+    interface vê o resultado delas no próximo snapshot publicado e nos\n
+    eventos do jogo, que são avisados na thread de renderização. Só as\n
+    ações que preparam a partida (`SETUP_ACTIONS`) esperam o resultado.
+  """
+  def __init__(self, logic_thread: LogicThread):
+    self.logic_thread = logic_thread
+    self.snapshot = logic_thread.snapshot
+    self.listeners: Dict[GameEvent, list[Callable[[], None]]] = {event: [] for event in GameEvent}
+
+    # Ações enviadas que ainda não terminaram
+    self.pending_actions: list[Future] = []
+
+    # Estado que é só da interface (ex.: `running` e a área do mapa na tela)
+    # fica no próprio objeto, e não passa pela thread de lógica
+    self.running = False
+
+  def __getattr__(self, name: str):
+    if name in SETUP_ACTIONS:
+      return lambda *args, **kwargs: self.__run_setup_action(name, *args, **kwargs)
+
+    if name in GAME_ACTIONS:
+      return lambda *args, **kwargs: self.__submit_action(name, *args, **kwargs)
+
+    return getattr(self.snapshot, name)
+
+  def __run_setup_action(self, action: str, *args, **kwargs):
+    result = self.logic_thread.submit(action, *args, **kwargs).result()
+    self.sync()
+    return result
+
+  def __submit_action(self, action: str, *args, **kwargs):
+    future = self.logic_thread.submit(action, *args, state_version=self.snapshot.state_version, **kwargs)
+    self.pending_actions.append(future)
+
+  def subscribe(self, event: GameEvent, listener: Callable[[], None]):
+    self.listeners[event].append(listener)
+
+  def unsubscribe(self, event: GameEvent, listener: Callable[[], None]):
+    self.listeners[event].remove(listener)
+
+  def sync(self, state_version: int | None = None):
+    """
+      Adota o último snapshot publicado e avisa os eventos que\n
+      aconteceram até ele. Deve ser chamada no início de cada frame.\n
+      Com `state_version`, espera e adota exatamente o snapshot dessa\n
+      versão (ex.: na reprodução de uma gravação, o mesmo que foi\n
+      adotado naquele frame durante a gravação).
+    """
+    snapshot, events = self.logic_thread.take_published_state(state_version)
+    if snapshot is not None:
+      self.snapshot = snapshot
+
+    finished_actions = [future for future in self.pending_actions if future.done()]
+    self.pending_actions = [future for future in self.pending_actions if future not in finished_actions]
+
+    for future in finished_actions:
+      # Levanta de novo os erros da ação (ex.: o SystemExit dos erros do jogo)
+      future.result()
+
+    for event in events:
+      for listener in list(self.listeners[event]):
+        listener()
+
+  def wait_for_actions(self):
+    """
+      Espera as ações enviadas terminarem (ex.: na reprodução de uma\n
+      gravação sem as versões do estado).
+    """
+    for future in self.pending_actions:
+      future.exception()
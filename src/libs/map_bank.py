@@ -0,0 +1,101 @@
+import mmap
+import random
+import struct
+from logic import Difficulty, generate_map_cells, get_difficulty_index
+
+# Formato do arquivo do banco de mapas (little-endian):
+# - Cabeçalho: assinatura(4s), versão(H), quantidade de seções(H)
+# - Tabela de seções, uma entrada por (tamanho do mapa, dificuldade, semente):
+#   tamanho do mapa(H), índice da dificuldade(B), semente(Q), quantidade de mapas(I), deslocamento(Q)
+# - Registros: cada seção guarda os seus mapas em sequência. Todos os registros
+#   de uma seção têm o mesmo tamanho (map_size * map_size bytes, um byte por célula),
+#   então o mapa K fica em `deslocamento + K * tamanho do registro`.
+MAP_BANK_SIGNATURE = b"DSMB"
+MAP_BANK_VERSION = 1
+
+HEADER_FORMAT = struct.Struct("<4sHH")
+SECTION_FORMAT = struct.Struct("<HBxQIQ")
+
+def build_map_bank(path: str, sections: list[tuple[int, Difficulty, int, int]]):
+  """
+    Gera um banco de mapas no arquivo especificado.\n
+    Cada seção é uma tupla (tamanho do mapa, dificuldade, semente, quantidade de mapas).\n
+    Os mapas de uma seção são gerados em sequência a partir da semente, então\n
+    o mesmo arquivo sempre é gerado para as mesmas seções.
+  """
+  offset = HEADER_FORMAT.size + SECTION_FORMAT.size * len(sections)
+  section_entries = []
+
+  for map_size, difficulty, seed, count in sections:
+    section_entries.append((map_size, get_difficulty_index(difficulty), seed, count, offset))
+    offset += map_size * map_size * count
+
+  with open(path, "wb") as file:
+    file.write(HEADER_FORMAT.pack(MAP_BANK_SIGNATURE, MAP_BANK_VERSION, len(sections)))
+
+    for section_entry in section_entries:
+      file.write(SECTION_FORMAT.pack(*section_entry))
+
+    for map_size, difficulty, seed, count in sections:
+      rng = random.Random(seed)
+      for _ in range(count):
+        file.write(generate_map_cells(map_size, difficulty, rng))
+
+class MapBank:
+  """
+    Acesso somente leitura a um banco de mapas gerado por\n
+    :py:func:`build_map_bank`. O arquivo é mapeado em memória,\n
+    então pegar um mapa não precisa gerar nem interpretar nada.
+  """
+  def __init__(self, path: str):
+    self.path = path
+
+    self.file = open(path, "rb")
+    self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    signature, version, section_count = HEADER_FORMAT.unpack_from(self.buffer, 0)
+
+    if signature != MAP_BANK_SIGNATURE:
+      raise SystemExit(f"O arquivo não é um banco de mapas: {path}")
+
+    if version != MAP_BANK_VERSION:
+      raise SystemExit(f"Versão do banco de mapas não suportada: {version}. Em: {path}")
+
+    # (tamanho do mapa, índice da dificuldade, semente) -> (quantidade de mapas, deslocamento)
+    self.sections: dict[tuple[int, int, int], tuple[int, int]] = {}
+
+    for index in range(section_count):
+      map_size, difficulty_index, seed, count, offset = SECTION_FORMAT.unpack_from(
+        self.buffer,
+        HEADER_FORMAT.size + index * SECTION_FORMAT.size
+      )
+      self.sections[(map_size, difficulty_index, seed)] = (count, offset)
+
+  def get_map_count(self, map_size: int, difficulty: Difficulty, seed: int) -> int:
+    """
+      Retorna a quantidade de mapas guardados para a combinação fornecida.
+    """
+    count, _ = self.sections.get((map_size, get_difficulty_index(difficulty), seed), (0, 0))
+    return count
+
+  def get_map(self, map_size: int, difficulty: Difficulty, seed: int, index: int) -> bytes | None:
+    """
+      Retorna as células do mapa de índice `index` para a combinação\n
+      fornecida, no mesmo formato de :py:func:`logic.generate_map_cells`.\n
+      Caso o banco não tenha esse mapa, retorna `None`.
+    """
+    section = self.sections.get((map_size, get_difficulty_index(difficulty), seed))
+    if section is None:
+      return None
+
+    count, offset = section
+    if not 0 <= index < count:
+      return None
+
+    record_size = map_size * map_size
+    start = offset + index * record_size
+    return self.buffer[start:start + record_size]
+
+  def close(self):
+    self.buffer.close()
+    self.file.close()
@@ -0,0 +1,218 @@
+import pathlib
+import queue
+import sqlite3
+import threading
+
+# Quantidade máxima de partidas gravadas em uma mesma transação
+MAX_BATCH_SIZE = 64
+
+# Objeto usado para avisar a thread de escrita que ela deve terminar
+STOP_SIGNAL = object()
+
+CREATE_TABLES = """
+  CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    map_size INTEGER NOT NULL,
+    difficulty INTEGER NOT NULL,
+    seed INTEGER,
+    map_index INTEGER,
+    turns INTEGER NOT NULL,
+    elapsed_time REAL NOT NULL,
+    player_count INTEGER NOT NULL,
+    winner_id INTEGER
+  );
+
+  CREATE TABLE IF NOT EXISTS match_players (
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    player_id INTEGER NOT NULL,
+    difficulty INTEGER NOT NULL,
+    stored_weight INTEGER NOT NULL,
+    carried_weight INTEGER NOT NULL,
+    disqualified INTEGER NOT NULL,
+    winner INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    elapsed_time REAL NOT NULL
+  );
+
+  -- Índices das primeiras versões do histórico, que não tinham todas as colunas do placar
+  DROP INDEX IF EXISTS match_players_leaderboard;
+  DROP INDEX IF EXISTS match_players_leaderboard_by_difficulty;
+
+  -- Além das colunas da ordenação, os índices guardam todas as colunas
+  -- lidas pelo placar, então a consulta não precisa ler a tabela
+  CREATE INDEX IF NOT EXISTS match_players_leaderboard_covering
+    ON match_players (stored_weight DESC, turns ASC, player_id, elapsed_time, difficulty, match_id);
+
+  CREATE INDEX IF NOT EXISTS match_players_leaderboard_by_difficulty_covering
+    ON match_players (difficulty, stored_weight DESC, turns ASC, player_id, elapsed_time, match_id);
+"""
+
+INSERT_MATCH = """
+  INSERT INTO matches (finished_at, map_size, difficulty, seed, map_index, turns, elapsed_time, player_count, winner_id)
+  VALUES (:finished_at, :map_size, :difficulty, :seed, :map_index, :turns, :elapsed_time, :player_count, :winner_id)
+"""
+
+INSERT_MATCH_PLAYER = """
+  INSERT INTO match_players (match_id, player_id, difficulty, stored_weight, carried_weight, disqualified, winner, turns, elapsed_time)
+  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# As consultas do placar são feitas de forma que o SQLite consiga
+# ler só as N primeiras linhas dos índices acima, sem ler a tabela
+SELECT_LEADERBOARD = """
+  SELECT player_id, stored_weight, turns, elapsed_time, difficulty, match_id
+  FROM match_players
+  ORDER BY stored_weight DESC, turns ASC
+  LIMIT ?
+"""
+
+SELECT_LEADERBOARD_BY_DIFFICULTY = """
+  SELECT player_id, stored_weight, turns, elapsed_time, difficulty, match_id
+  FROM match_players
+  WHERE difficulty = ?
+  ORDER BY stored_weight DESC, turns ASC
+  LIMIT ?
+"""
+
+def connect(path: str) -> sqlite3.Connection:
+  """
+    Abre o banco do histórico de partidas para escrita.\n
+    Só a thread de escrita usa essa conexão.
+  """
+  connection = sqlite3.connect(path)
+  # O modo WAL permite ler o placar enquanto a thread de escrita grava
+  connection.execute("PRAGMA journal_mode=WAL")
+  connection.execute("PRAGMA synchronous=NORMAL")
+  return connection
+
+def ensure_schema(connection: sqlite3.Connection):
+  """
+    Cria as tabelas e os índices que ainda não existem e troca os\n
+    índices das versões antigas. É chamada uma vez, pela escrita.
+  """
+  connection.executescript(CREATE_TABLES)
+
+def connect_read_only(path: str) -> sqlite3.Connection:
+  """
+    Abre o banco do histórico de partidas só para leitura, sem\n
+    mudar o modo do journal nem o esquema.
+  """
+  return sqlite3.connect(f"{pathlib.Path(path).absolute().as_uri()}?mode=ro", uri=True)
+
+class MatchHistory:
+  """
+    Grava o resumo das partidas em um banco SQLite.\n
+    Toda a escrita é feita por uma thread separada, então enviar\n
+    uma partida com :py:meth:`submit` nunca acessa o disco na\n
+    thread de renderização.
+  """
+  def __init__(self, path: str):
+    self.path = path
+    self.queue: queue.Queue = queue.Queue()
+
+    self.thread = threading.Thread(target=self.__write_loop, name="match-history-writer", daemon=True)
+    self.thread.start()
+
+  def submit(self, summary: dict):
+    """
+      Coloca o resumo da partida na fila de escrita. O resumo tem o formato:\n
+      {finished_at, map_size, difficulty, seed, map_index, turns, elapsed_time,\n
+      winner_id, players: [{player_id, stored_weight, carried_weight, disqualified}]}
+    """
+    self.queue.put(summary)
+
+  def close(self):
+    """
+      Espera a fila ser gravada e termina a thread de escrita.
+    """
+    self.queue.put(STOP_SIGNAL)
+    self.thread.join()
+
+  def __next_batch(self) -> tuple[list[dict], bool]:
+    # Espera pela primeira partida e junta as que já estiverem na fila
+    batch = []
+    item = self.queue.get()
+
+    while item is not STOP_SIGNAL:
+      batch.append(item)
+
+      if len(batch) >= MAX_BATCH_SIZE:
+        return batch, False
+
+      try:
+        item = self.queue.get_nowait()
+      except queue.Empty:
+        return batch, False
+
+    return batch, True
+
+  def __write_batch(self, connection: sqlite3.Connection, batch: list[dict]):
+    with connection:
+      for summary in batch:
+        cursor = connection.execute(INSERT_MATCH, {**summary, "player_count": len(summary["players"])})
+        match_id = cursor.lastrowid
+
+        connection.executemany(INSERT_MATCH_PLAYER, [
+          (
+            match_id,
+            player["player_id"],
+            summary["difficulty"],
+            player["stored_weight"],
+            player["carried_weight"],
+            int(player["disqualified"]),
+            int(player["player_id"] == summary["winner_id"]),
+            summary["turns"],
+            summary["elapsed_time"]
+          )
+          for player in summary["players"]
+        ])
+
+  def __write_loop(self):
+    # A conexão é criada dentro da thread, pois o sqlite3 não deixa
+    # uma conexão ser usada por uma thread diferente da que a criou
+    connection = connect(self.path)
+
+    try:
+      ensure_schema(connection)
+
+      stopped = False
+      while not stopped:
+        batch, stopped = self.__next_batch()
+        if batch:
+          self.__write_batch(connection, batch)
+    finally:
+      connection.close()
+
+def get_leaderboard(path: str, limit: int = 10, difficulty: int | None = None) -> list[dict]:
+  """
+    Retorna os `limit` melhores resultados de jogadores, ordenados pelo\n
+    peso dos tesouros guardados (e, no empate, pela menor quantidade de\n
+    turnos). Pode ser filtrado pelo índice da dificuldade.\n
+    Essa função acessa o disco, então ela não deve ser chamada a cada frame.\n
+    Enquanto nenhuma partida tiver sido gravada, o placar é vazio.
+  """
+  if not pathlib.Path(path).exists():
+    return []
+
+  connection = connect_read_only(path)
+
+  try:
+    if difficulty is None:
+      rows = connection.execute(SELECT_LEADERBOARD, (limit,)).fetchall()
+    else:
+      rows = connection.execute(SELECT_LEADERBOARD_BY_DIFFICULTY, (difficulty, limit)).fetchall()
+  finally:
+    connection.close()
+
+  return [
+    {
+      "player_id": player_id,
+      "stored_weight": stored_weight,
+      "turns": turns,
+      "elapsed_time": elapsed_time,
+      "difficulty": difficulty,
+      "match_id": match_id
+    }
+    for player_id, stored_weight, turns, elapsed_time, difficulty, match_id in rows
+  ]
@@ -0,0 +1,152 @@
+import json
+import math
+import pygame
+from typing import Iterator
+
+# Versão do formato do arquivo de gravação. Deve ser incrementada
+# sempre que o formato mudar de forma incompatível.
+RECORDING_VERSION = 1
+
+# Formato do arquivo de gravação (uma linha JSON por registro):
+# - Primeira linha (cabeçalho):
+#   {"version": int, "seed": int, "window_size": [w, h]}
+# - Demais linhas (uma por frame):
+#   {"frame": int, "time": float, "state_version": int, "events": [{"type": int, "attributes": {...}}, ...]}
+# O tempo é contado em segundos a partir do início da gravação. O `state_version`
+# é a versão do estado da partida que a interface viu no frame (`Game.state_version`),
+# e não existe nas gravações antigas.
+
+def _serialize_value(value):
+  if isinstance(value, (bool, int, float, str)) or value is None:
+    return value
+
+  if isinstance(value, (tuple, list)):
+    return [_serialize_value(item) for item in value]
+
+  # Atributos que não podem ser representados (ex.: objetos de janela)
+  return None
+
+def _deserialize_value(value):
+  # As tuplas são salvas como listas no JSON, então elas são restauradas aqui
+  if isinstance(value, list):
+    return tuple(_deserialize_value(item) for item in value)
+
+  return value
+
+def serialize_event(event: pygame.event.Event) -> dict:
+  """
+    Transforma um evento do pygame em um dicionário que\n
+    pode ser salvo como JSON.
+  """
+  attributes = {key: _serialize_value(value) for key, value in event.dict.items()}
+  return {"type": event.type, "attributes": attributes}
+
+def deserialize_event(data: dict) -> pygame.event.Event:
+  """
+    Recria um evento do pygame a partir de um dicionário\n
+    gerado por `serialize_event`.
+  """
+  attributes = {key: _deserialize_value(value) for key, value in data["attributes"].items()}
+  return pygame.event.Event(data["type"], attributes)
+
+class InputRecorder:
+  """
+    Grava todos os eventos de entrada que chegam no jogo,\n
+    frame a frame, junto com o índice do frame e o tempo\n
+    em que ele aconteceu.
+  """
+  def __init__(self, path: str, seed: int, window_size: tuple[int, int], start_time: float):
+    self.path = path
+    self.start_time = start_time
+    self.file = open(path, "w", encoding="utf-8")
+
+    header = {"version": RECORDING_VERSION, "seed": seed, "window_size": list(window_size)}
+    self.file.write(json.dumps(header) + "\n")
+
+  def record(self, frame_index: int, time: float, events: list[pygame.event.Event], state_version: int):
+    """
+      Grava os eventos de um frame e a versão do estado da partida\n
+      que a interface viu nele. Os frames sem eventos também são\n
+      gravados para que o tempo de cada frame seja reproduzido exatamente.
+    """
+    frame = {
+      "frame": frame_index,
+      "time": time - self.start_time,
+      "state_version": state_version,
+      "events": [serialize_event(event) for event in events]
+    }
+    self.file.write(json.dumps(frame, separators=(",", ":")) + "\n")
+
+  def close(self):
+    if not self.file.closed:
+      self.file.close()
+
+class InputPlayer:
+  """
+    Lê uma gravação feita pelo :py:class:`InputRecorder` e entrega\n
+    os frames, na mesma ordem, para serem reproduzidos.
+  """
+  def __init__(self, path: str):
+    self.path = path
+
+    with open(path, "r", encoding="utf-8") as file:
+      header = json.loads(file.readline())
+
+    if header.get("version") != RECORDING_VERSION:
+      raise SystemExit(f"Versão de gravação não suportada: {header.get('version')}. Em: {path}")
+
+    self.seed: int = header["seed"]
+    self.window_size: tuple[int, int] = tuple(header["window_size"])
+
+  def frames(self) -> Iterator[tuple[int, float, list[pygame.event.Event], int | None]]:
+    """
+      Retorna, para cada frame gravado, o índice do frame, o tempo\n
+      dele, a lista de eventos que aconteceram nele e a versão do\n
+      estado da partida vista nele (`None` nas gravações antigas).
+    """
+    with open(self.path, "r", encoding="utf-8") as file:
+      file.readline() # Pula o cabeçalho
+
+      for line in file:
+        if not line.strip():
+          continue
+
+        frame = json.loads(line)
+        events = [deserialize_event(event) for event in frame["events"]]
+        yield frame["frame"], frame["time"], events, frame.get("state_version")
+
+class FrameTimeMetrics:
+  """
+    Coleta o tempo gasto em cada frame e gera um resumo\n
+    com as métricas de desempenho.
+  """
+  def __init__(self):
+    self.frame_times: list[float] = []
+
+  def add(self, frame_time: float):
+    self.frame_times.append(frame_time)
+
+  def __percentile(self, sorted_times: list[float], percentile: float) -> float:
+    index = min(len(sorted_times) - 1, math.ceil(percentile / 100 * len(sorted_times)) - 1)
+    return sorted_times[max(index, 0)]
+
+  def summary(self) -> dict:
+    """
+      Retorna as métricas em milissegundos (exceto a quantidade de frames e o fps).
+    """
+    if not self.frame_times:
+      return {"frames": 0}
+
+    sorted_times = sorted(self.frame_times)
+    total_time = sum(sorted_times)
+
+    return {
+      "frames": len(sorted_times),
+      "total_ms": total_time * 1000,
+      "average_ms": total_time / len(sorted_times) * 1000,
+      "median_ms": self.__percentile(sorted_times, 50) * 1000,
+      "p95_ms": self.__percentile(sorted_times, 95) * 1000,
+      "p99_ms": self.__percentile(sorted_times, 99) * 1000,
+      "max_ms": sorted_times[-1] * 1000,
+      "fps": len(sorted_times) / total_time if total_time > 0 else 0.0
+    }
@@ -0,0 +1,49 @@
+import time
+from collections import deque
+from typing import Generator
+
+# Tempo, em segundos, que as tarefas podem usar em cada frame
+DEFAULT_FRAME_BUDGET = 0.004
+
+class TaskScheduler:
+  """
+    Roda tarefas adiadas na thread principal, em pedaços pequenos,\n
+    sem passar de um orçamento de tempo por frame. Cada tarefa é um\n
+    gerador: cada `yield` marca o fim de um pedaço, e a tarefa só\n
+    continua quando ainda sobra tempo no frame (ou no próximo). As\n
+    tarefas são revezadas, então uma tarefa longa não trava as outras.
+  """
+  def __init__(self):
+    self.tasks: deque[Generator] = deque()
+
+  def add(self, task: Generator):
+    self.tasks.append(task)
+
+  def has_tasks(self) -> bool:
+    return len(self.tasks) > 0
+
+  def run(self, budget: float = DEFAULT_FRAME_BUDGET) -> int:
+    """
+      Continua as tarefas enquanto sobrar tempo no orçamento, em segundos.\n
+      Retorna quantos pedaços foram rodados.
+    """
+    deadline = time.perf_counter() + budget
+    slices = 0
+
+    while self.tasks and time.perf_counter() < deadline:
+      task = self.tasks.popleft()
+      slices += 1
+      try:
+        next(task)
+      except StopIteration:
+        continue
+
+      self.tasks.append(task)
+
+    return slices
+
+  def clear(self):
+    for task in self.tasks:
+      task.close()
+
+    self.tasks.clear()
@@ -0,0 +1,328 @@
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from logic import Game, GameEvent, MAX_MAP_SIZE, get_difficulty_index, get_difficulty_by_index
+
+# Formato do bloco de memória compartilhada (little-endian, tamanho fixo):
+# - Cabeçalho: assinatura(4s), versão(H), tamanho máximo do mapa(H), sequência(Q)
+# - Estado: turno(I), oxigênio(i), tamanho do mapa(H), quantidade de jogadores(B),
+#   jogador do turno(B), número do dado(B), índice da dificuldade(B), flags(H)
+# - Jogadores (MAX_PLAYERS entradas, as que sobram ficam zeradas):
+#   id(B), x(h), y(h), flags(B), quantidade de tesouros(B), peso dos tesouros(H),
+#   quantidade de tesouros guardados(B), peso dos tesouros guardados(H)
+# - Mapa: `tamanho máximo do mapa * tamanho máximo do mapa` bytes, só os
+#   `tamanho do mapa * tamanho do mapa` primeiros são usados, no formato de
+#   `logic.generate_map_cells`. O bit POSSIBLE_STEP_BIT fica ligado nas casas
+#   que o jogador do turno pode andar.
+#
+# O tamanho máximo do mapa é o maior que a partida aceita (`logic.MAX_MAP_SIZE`)
+# e fica no cabeçalho, então os leitores calculam o tamanho do bloco a partir dele.
+#
+# A sequência funciona como um seqlock: ela fica ímpar enquanto o estado está
+# sendo escrito e par quando ele está completo. Um leitor só aceita uma cópia
+# se a sequência era par e não mudou durante a cópia.
+STATE_SIGNATURE = b"DSST"
+STATE_VERSION = 2
+
+MAX_PLAYERS = 4
+
+HEADER_FORMAT = struct.Struct("<4sHHQ")
+STATE_FORMAT = struct.Struct("<IiHBBBBH")
+PLAYER_FORMAT = struct.Struct("<BhhBBHBH")
+
+SEQUENCE_OFFSET = 8
+STATE_OFFSET = HEADER_FORMAT.size
+PLAYERS_OFFSET = STATE_OFFSET + STATE_FORMAT.size
+MAP_OFFSET = PLAYERS_OFFSET + PLAYER_FORMAT.size * MAX_PLAYERS
+
+SEQUENCE_FORMAT = struct.Struct("<Q")
+
+# Flags do estado
+FIRST_PLAYER_SORTED = 1 << 0
+NEED_DICE_SORT = 1 << 1
+NEED_PLAYER_ACTIVATION = 1 << 2
+NEED_PLAYER_ACTION = 1 << 3
+NEED_PLAYER_DECISION = 1 << 4
+NEED_SUBMARINE_OPTION = 1 << 5
+GAME_HAS_ENDED = 1 << 6
+
+# Flags dos jogadores
+PLAYER_PLAYING = 1 << 0
+PLAYER_DISQUALIFIED = 1 << 1
+PLAYER_HAS_LEFT_THE_SUBMARINE = 1 << 2
+
+POSSIBLE_STEP_BIT = 0x80
+
+def get_block_size(max_map_size: int) -> int:
+  return MAP_OFFSET + max_map_size * max_map_size
+
+# Quantidade máxima de tentativas de leitura antes de desistir
+MAX_READ_ATTEMPTS = 1000
+
+STATE_FLAGS = {
+  "first_player_sorted": FIRST_PLAYER_SORTED,
+  "need_dice_sort": NEED_DICE_SORT,
+  "need_player_activation": NEED_PLAYER_ACTIVATION,
+  "need_player_action": NEED_PLAYER_ACTION,
+  "need_player_decision": NEED_PLAYER_DECISION,
+  "need_submarine_option": NEED_SUBMARINE_OPTION,
+  "game_has_ended": GAME_HAS_ENDED
+}
+
+PLAYER_FLAGS = {
+  "playing": PLAYER_PLAYING,
+  "disqualified": PLAYER_DISQUALIFIED,
+  "has_already_left_the_submarine": PLAYER_HAS_LEFT_THE_SUBMARINE
+}
+
+class StatePublisher:
+  """
+    Espelha o estado da partida em um bloco de memória compartilhada\n
+    com formato fixo, para que outros processos (análises, overlays,\n
+    bots) possam ler o estado sem nenhuma serialização.\n
+    O bloco é atualizado uma vez a cada `GameEvent.STATE_CHANGED`.
+  """
+  def __init__(self, game: Game, name: str):
+    self.game = game
+    self.name = name
+    self.max_map_size = MAX_MAP_SIZE
+
+    try:
+      self.memory = shared_memory.SharedMemory(name=name, create=True, size=get_block_size(self.max_map_size))
+    except FileExistsError:
+      raise SystemExit(f"Já existe um bloco de memória compartilhada com o nome: {name}")
+
+    self.sequence = 0
+    HEADER_FORMAT.pack_into(self.memory.buf, 0, STATE_SIGNATURE, STATE_VERSION, self.max_map_size, self.sequence)
+
+    # O que já está no bloco: o tamanho do mapa, as casas (sem o bit dos passos)
+    # e os índices das casas com o bit dos passos. Só o que muda é escrito de novo
+    self.published_map_size: int | None = None
+    self.published_cells = bytearray()
+    self.published_steps: set[int] = set()
+
+    self.game.subscribe(GameEvent.STATE_CHANGED, self.publish)
+
+  def __write_sequence(self):
+    SEQUENCE_FORMAT.pack_into(self.memory.buf, SEQUENCE_OFFSET, self.sequence)
+
+  def publish(self):
+    """
+      Escreve o estado atual da partida no bloco compartilhado.
+    """
+    game = self.game
+    buffer = self.memory.buf
+
+    # Ex.: uma partida salva com um mapa maior do que o jogo aceita hoje
+    if game.map_size > self.max_map_size:
+      raise SystemExit(f"O mapa de {game.map_size}x{game.map_size} não cabe no estado compartilhado (o máximo é {self.max_map_size}x{self.max_map_size}).")
+
+    flags = 0
+    for attribute, flag in STATE_FLAGS.items():
+      if getattr(game, attribute):
+        flags |= flag
+
+    map_size = game.map_size
+    possible_steps = set()
+    if game.has_current_possible_steps():
+      for steps in game.current_possible_steps.values():
+        possible_steps.update(x * map_size + y for x, y in steps)
+
+    # Sequência ímpar: os leitores sabem que o estado está incompleto
+    self.sequence += 1
+    self.__write_sequence()
+
+    STATE_FORMAT.pack_into(
+      buffer,
+      STATE_OFFSET,
+      game.turn,
+      game.oxygen_tanks,
+      game.map_size,
+      game.player_count,
+      game.player_of_turn,
+      game.sorted_dice_number,
+      get_difficulty_index(game.difficulty),
+      flags
+    )
+
+    for index in range(MAX_PLAYERS):
+      offset = PLAYERS_OFFSET + index * PLAYER_FORMAT.size
+
+      if index >= len(game.players):
+        PLAYER_FORMAT.pack_into(buffer, offset, 0, 0, 0, 0, 0, 0, 0, 0)
+        continue
+
+      player = game.players[index]
+      player_flags = 0
+      for attribute, flag in PLAYER_FLAGS.items():
+        if getattr(player, attribute):
+          player_flags |= flag
+
+      player_x, player_y = player.position
+      PLAYER_FORMAT.pack_into(
+        buffer,
+        offset,
+        player.player_id,
+        player_x,
+        player_y,
+        player_flags,
+        player.get_treasure_count(),
+        player.get_treasures_weight(),
+        player.get_stored_treasure_count(),
+        player.get_stored_treasures_weight()
+      )
+
+    self.__write_map(game.map_cells, map_size, possible_steps)
+
+    # Sequência par: o estado está completo
+    self.sequence += 1
+    self.__write_sequence()
+
+  def __write_map(self, map_cells: bytes, map_size: int, possible_steps: set[int]):
+    """
+      Escreve no bloco só as colunas do mapa que mudaram (as entidades\n
+      só são tiradas do mapa) e as casas em que o bit dos passos mudou.\n
+      As colunas são comparadas inteiras, sem percorrer as casas.
+    """
+    region = self.memory.buf[MAP_OFFSET:MAP_OFFSET + map_size * map_size]
+
+    if map_size != self.published_map_size:
+      region[:] = map_cells
+      self.published_map_size = map_size
+      self.published_cells = bytearray(map_cells)
+      self.published_steps = set()
+    else:
+      changed_columns = set()
+      for x in range(map_size):
+        start = x * map_size
+        column = map_cells[start:start + map_size]
+        if column == self.published_cells[start:start + map_size]:
+          continue
+
+        region[start:start + map_size] = column
+        self.published_cells[start:start + map_size] = column
+        changed_columns.add(x)
+
+      # As colunas escritas de novo perderam o bit dos passos
+      if changed_columns:
+        self.published_steps = {index for index in self.published_steps if index // map_size not in changed_columns}
+
+    for index in self.published_steps - possible_steps:
+      region[index] = map_cells[index]
+
+    for index in possible_steps - self.published_steps:
+      region[index] = map_cells[index] | POSSIBLE_STEP_BIT
+
+    self.published_steps = possible_steps
+    region.release()
+
+  def close(self):
+    """
+      Para de publicar e remove o bloco compartilhado.
+    """
+    self.game.unsubscribe(GameEvent.STATE_CHANGED, self.publish)
+    self.memory.close()
+    self.memory.unlink()
+
+class StateReader:
+  """
+    Lê, de outro processo, o estado publicado por um\n
+    :py:class:`StatePublisher`.
+  """
+  def __init__(self, name: str):
+    self.name = name
+    # O leitor não é dono do bloco, então ele não deve ser removido
+    # quando o processo do leitor terminar
+    try:
+      self.memory = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+      # Antes do Python 3.13 não existe o parâmetro `track`
+      self.memory = shared_memory.SharedMemory(name=name)
+      resource_tracker.unregister(self.memory._name, "shared_memory")
+
+    signature, version, max_map_size, _ = HEADER_FORMAT.unpack_from(self.memory.buf, 0)
+
+    if signature != STATE_SIGNATURE:
+      raise SystemExit(f"O bloco de memória compartilhada não é um estado do Deep Sea: {name}")
+
+    if version != STATE_VERSION:
+      raise SystemExit(f"Versão do estado compartilhado não suportada: {version}. Em: {name}")
+
+    self.max_map_size = max_map_size
+
+  def get_sequence(self) -> int:
+    """
+      Retorna a sequência atual. Ela muda sempre que o estado muda,\n
+      então pode ser usada para saber se há algo novo para ler.
+    """
+    sequence, = SEQUENCE_FORMAT.unpack_from(self.memory.buf, SEQUENCE_OFFSET)
+    return sequence
+
+  def read(self) -> dict | None:
+    """
+      Retorna uma cópia consistente do estado publicado, ou `None`\n
+      caso nenhum estado tenha sido publicado ainda.
+    """
+    for _ in range(MAX_READ_ATTEMPTS):
+      sequence = self.get_sequence()
+
+      if sequence == 0:
+        return None
+
+      if sequence % 2 == 1:
+        continue
+
+      # Copia só as casas usadas pelo tamanho de mapa atual
+      _, _, map_size, *_ = STATE_FORMAT.unpack_from(self.memory.buf, STATE_OFFSET)
+      map_size = min(map_size, self.max_map_size)
+      data = bytes(self.memory.buf[STATE_OFFSET:MAP_OFFSET + map_size * map_size])
+
+      if self.get_sequence() == sequence:
+        return self.__parse(sequence, data)
+
+    raise TimeoutError(f"Não foi possível ler um estado consistente de: {self.name}")
+
+  def __parse(self, sequence: int, data: bytes) -> dict:
+    turn, oxygen_tanks, map_size, player_count, player_of_turn, sorted_dice_number, difficulty_index, flags = STATE_FORMAT.unpack_from(data, 0)
+
+    players = []
+    for index in range(player_count):
+      player_id, player_x, player_y, player_flags, treasure_count, treasures_weight, stored_treasure_count, stored_treasures_weight = PLAYER_FORMAT.unpack_from(
+        data,
+        PLAYERS_OFFSET - STATE_OFFSET + index * PLAYER_FORMAT.size
+      )
+
+      players.append({
+        "player_id": player_id,
+        "position": (player_x, player_y),
+        **{attribute: bool(player_flags & flag) for attribute, flag in PLAYER_FLAGS.items()},
+        "treasure_count": treasure_count,
+        "treasures_weight": treasures_weight,
+        "stored_treasure_count": stored_treasure_count,
+        "stored_treasures_weight": stored_treasures_weight
+      })
+
+    map_start = MAP_OFFSET - STATE_OFFSET
+    raw_cells = data[map_start:map_start + map_size * map_size]
+
+    possible_steps = []
+    for index, cell in enumerate(raw_cells):
+      if cell & POSSIBLE_STEP_BIT:
+        possible_steps.append((index // map_size, index % map_size))
+
+    return {
+      "sequence": sequence,
+      "turn": turn,
+      "oxygen_tanks": oxygen_tanks,
+      "map_size": map_size,
+      "player_count": player_count,
+      "player_of_turn": player_of_turn,
+      "sorted_dice_number": sorted_dice_number,
+      "difficulty": get_difficulty_by_index(difficulty_index),
+      **{attribute: bool(flags & flag) for attribute, flag in STATE_FLAGS.items()},
+      "players": players,
+      "map_cells": bytes(cell & ~POSSIBLE_STEP_BIT for cell in raw_cells),
+      "current_possible_steps": possible_steps
+    }
+
+  def close(self):
+    self.memory.close()
@@ -1,6 +1,9 @@
 import os
 import pygame
 import sys
+from collections import OrderedDict
+from timeit import default_timer
+from typing import Any, Callable
 
 # Padronização dos ids do botões do mouse
 MOUSE_LEFT_BUTTON = 1
@@ -12,22 +15,146 @@ DEFAULT_FONT = "v5easter.ttf"
 LOADED_FONTS = {}
 LOADED_SOUNDS = {}
 
+# Imagens e sprites já carregados e redimensionados, por arquivo e tamanho
+# (os mais usados por último ficam no fim). Refazer o layout para um tamanho
+# de tela que já foi usado não lê o disco e nem redimensiona nada de novo.
+# As superfícies são compartilhadas, então elas não devem ser modificadas.
+SCALED_SURFACE_CACHE_LIMIT = 256
+SCALED_SURFACES: OrderedDict = OrderedDict()
+
+# Fontes de tempo e de posição do mouse usadas pelos componentes.
+# Normalmente elas leem o sistema, mas podem ser trocadas (ex.: na
+# reprodução de uma gravação de entrada) para que uma sessão seja
+# repetida de forma exata, independente do fps.
+_time_source = default_timer
+_mouse_pos_source = pygame.mouse.get_pos
+
+def get_time() -> float:
+  """
+    Retorna o tempo atual, em segundos, da fonte de tempo configurada.
+  """
+  return _time_source()
+
+def set_time_source(source = None):
+  """
+    Troca a fonte de tempo. Sem argumentos, volta a usar o relógio do sistema.
+  """
+  global _time_source
+  _time_source = source if source else default_timer
+
+def get_mouse_pos() -> tuple[int, int]:
+  """
+    Retorna a posição do mouse a partir da fonte configurada.
+  """
+  return _mouse_pos_source()
+
+def set_mouse_pos_source(source = None):
+  """
+    Troca a fonte da posição do mouse. Sem argumentos, volta a ler o mouse do sistema.
+  """
+  global _mouse_pos_source
+  _mouse_pos_source = source if source else pygame.mouse.get_pos
+
+# Cores usadas como colorkey dos sprites com transparência "dura" (só
+# pixels totalmente opacos ou totalmente transparentes). A primeira que não
+# aparece nos pixels opacos do sprite é usada.
+COLORKEY_CANDIDATES = [(255, 0, 255), (0, 255, 255), (1, 2, 3)]
+
+def optimize_image(image: pygame.Surface) -> pygame.Surface:
+  """
+    Converte a imagem para o formato mais rápido de desenhar na tela:\n
+    - totalmente opaca: formato da tela, sem alpha por pixel;\n
+    - transparência "dura": formato da tela com colorkey e RLE;\n
+    - transparência parcial: formato da tela com alpha por pixel.\n
+    As cópias redimensionadas com `pygame.transform` mantêm o formato.
+  """
+  image = image.convert_alpha()
+  width, height = image.get_size()
+  pixel_count = width * height
+
+  # As máscaras contam os pixels em C, sem passar pixel por pixel no Python
+  opaque_count = pygame.mask.from_surface(image, 254).count()
+  if opaque_count == pixel_count:
+    return image.convert()
+
+  visible_count = pygame.mask.from_surface(image, 0).count()
+  if visible_count != opaque_count:
+    return image
+
+  for colorkey in COLORKEY_CANDIDATES:
+    keyed_image = pygame.Surface(image.get_size()).convert()
+    keyed_image.fill(colorkey)
+    keyed_image.blit(image, (0, 0))
+
+    # Se a cor aparecer em algum pixel opaco, ele ficaria transparente
+    colorkey_count = pygame.transform.threshold(None, keyed_image, colorkey, set_behavior=0)
+    if colorkey_count == pixel_count - opaque_count:
+      keyed_image.set_colorkey(colorkey, pygame.RLEACCEL)
+      return keyed_image
+
+  return image
+
 # Tirada de https://www.pygame.org/docs/tut/tom_games3.html#makegames-3
 def load_image(*paths: str) -> pygame.Surface:
   """ 
-    Carrega uma imagem a partir de um arquivo\n
-    e retorna o objeto dela como uma superfície.
+    Carrega uma imagem a partir de um arquivo e retorna\n
+    o objeto dela como uma superfície, já no formato mais\n
+    rápido de desenhar (ver :py:func:`optimize_image`).
   """
   fullname = os.path.join(*GENERAL_ASSETS_PATH, "images", *paths)
 
   try:
-    image = pygame.image.load(fullname).convert_alpha()
+    image = optimize_image(pygame.image.load(fullname))
   except FileNotFoundError:
     print(f"Não foi possível carregar a imagem: {fullname}.")
     raise SystemExit
   
   return image
 
+def get_cached_surfaces(key: tuple, build: Callable[[], Any]) -> Any:
+  """
+    Retorna as superfícies guardadas com a chave, criando elas com\n
+    `build` caso ainda não existam. As menos usadas são descartadas\n
+    quando o cache passa de `SCALED_SURFACE_CACHE_LIMIT` entradas.
+  """
+  if key in SCALED_SURFACES:
+    SCALED_SURFACES.move_to_end(key)
+    return SCALED_SURFACES[key]
+
+  surfaces = build()
+  SCALED_SURFACES[key] = surfaces
+  if len(SCALED_SURFACES) > SCALED_SURFACE_CACHE_LIMIT:
+    SCALED_SURFACES.popitem(last=False)
+
+  return surfaces
+
+def load_scaled_image(size: tuple[int, int], *paths: str) -> pygame.Surface:
+  """
+    Carrega uma imagem já redimensionada para o tamanho fornecido\n
+    (ex.: o fundo de uma cena, do tamanho da tela).
+  """
+  return get_cached_surfaces(
+    ("image", paths, tuple(size)),
+    lambda: pygame.transform.scale(load_image(*paths), size)
+  )
+
+def load_sprites(paths: list[str], sprite_size: tuple[int, int] = None, scale_by_size: tuple[int, int] = None) -> list[pygame.Surface]:
+  """
+    Carrega os sprites de um arquivo (ou a imagem inteira, caso o\n
+    tamanho do sprite não seja fornecido), já redimensionados.\n
+    A lista retornada é nova, mas as superfícies são compartilhadas.
+  """
+  def build() -> list[pygame.Surface]:
+    image = load_image(*paths)
+
+    if sprite_size:
+      return clip_sprites(image, sprite_size, scale_by_size)
+
+    return [image if not scale_by_size else pygame.transform.scale_by(image, scale_by_size)]
+
+  key = ("sprites", tuple(paths), sprite_size and tuple(sprite_size), scale_by_size and tuple(scale_by_size))
+  return list(get_cached_surfaces(key, build))
+
 def load_sound(*paths: str) -> pygame.mixer.Sound:
   """ 
     Carrega um som a partir de um arquivo e\n
@@ -128,6 +255,38 @@ def clip_sprites(image: pygame.Surface, sprite_size: tuple[int, int], scale_by_s
   
   return sprites
 
+def lerp_sprites(sprite: pygame.Surface, other_sprite: pygame.Surface, amount: float) -> pygame.Surface:
+  """
+    Cria um sprite com cada pixel entre o pixel do primeiro sprite e o do\n
+    segundo, na proporção `amount` (0 é o primeiro e 1 é o segundo), então\n
+    o sombreado dos dois é mantido. A transparência é a do primeiro. A\n
+    mistura é feita de uma vez só na superfície inteira, sem passar pixel\n
+    por pixel.
+  """
+  weight = round(255 * amount)
+
+  # Cada sprite é multiplicado pelo seu peso e os dois são somados
+  lerped_sprite = sprite.copy()
+  lerped_sprite.fill((255 - weight, 255 - weight, 255 - weight), special_flags=pygame.BLEND_RGB_MULT)
+
+  weighted_sprite = other_sprite.copy()
+  weighted_sprite.fill((weight, weight, weight), special_flags=pygame.BLEND_RGB_MULT)
+
+  lerped_sprite.blit(weighted_sprite, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+  return lerped_sprite
+
+def blit_sequence(surface: pygame.Surface, sequence: list[tuple[pygame.Surface, tuple[int, int]]]):
+  """
+    Desenha vários sprites na superfície com uma única chamada, ao\n
+    invés de um `blit` por sprite. Cada item da sequência é um par\n
+    (sprite, posição) e eles são desenhados na ordem da sequência.
+  """
+  # O `fblits` só existe em algumas versões do pygame
+  if hasattr(surface, "fblits"):
+    surface.fblits(sequence)
+  else:
+    surface.blits(sequence, doreturn=False)
+
 def sum_tuples(source: tuple[int], addition: tuple[int]) -> tuple:
   if len(source) != len(addition):
     sys.exit("As tuplas somadas devem ser do mesmo tamanho.")
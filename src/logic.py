@@ -1,6 +1,6 @@
 import random
 from enum import Enum
-from typing import Dict
+from typing import Dict, Callable
 import sys
 from libs.components import SpriteSource
 import math
@@ -198,12 +198,86 @@ def get_difficulty_by_index(index: int) -> Difficulty:
 
   sys.exit(f"Não existe um nível de dificuldade para o índice que você deu: {index}.")
 
+def get_difficulty_index(difficulty: Difficulty) -> int:
+  '''
+    Retorna o índice da dificuldade fornecida
+  '''
+  # O último item da lista não retorna como uma tupla
+  # então temos que cuidar desse caso
+  difficulty_value = difficulty.value[0] if type(difficulty.value) == tuple else difficulty.value
+  return difficulty_value["index"] # type: ignore
+
+# Códigos usados para representar o conteúdo de cada célula do mapa
+# de forma compacta (um byte por célula)
+EMPTY_CELL = 0
+BOMB_CELL = 1
+TREASURE_CELL = 2
+
+def generate_map_cells(map_size: int, difficulty: Difficulty, rng = random) -> bytearray:
+  '''
+    Sorteia o conteúdo de cada célula do mapa de acordo com a\n
+    dificuldade e retorna ele de forma compacta, com um byte\n
+    por célula, na ordem `x * map_size + y`.\n
+    O gerador de números aleatórios pode ser trocado com `rng`\n
+    para gerar mapas a partir de uma semente.
+  '''
+  # O último item da lista não retorna como uma tupla
+  # então temos que cuidar desse caso
+  difficulty_value = difficulty.value[0] if type(difficulty.value) == tuple else difficulty.value
+  odds = [*difficulty_value.values()][1] # type: ignore
+
+  population = [*odds.keys()]
+  weights = [*odds.values()]
+
+  map_cells = bytearray(map_size * map_size)
+
+  for x in range(map_size):
+    for y in range(map_size):
+
+      choice = rng.choices(
+        population=population,
+        weights=weights,
+        k=1
+      )
+
+      if choice[0] == "bomb" and y > 2: # Depois das três primeiras profundidades, as bombas podem ser spawnadas
+        map_cells[x * map_size + y] = BOMB_CELL
+      elif choice[0] == "treasure":
+        map_cells[x * map_size + y] = TREASURE_CELL
+      else:
+        # Não precisar definir a célula como vazia já que
+        # a inicialização padrão do bytearray faz isso
+        pass
+
+  return map_cells
+
 class Direction(Enum):
   UP = 0
   DOWN = 1,
   LEFT = 2,
   RIGHT = 3
 
+class GameEvent(Enum):
+  # Um novo turno começou (depois de todas as mudanças do turno anterior)
+  TURN_CHANGED = 0
+  # Qualquer parte do estado da partida mudou. É avisado uma única vez
+  # por ação, depois que todas as mudanças da ação foram feitas.
+  STATE_CHANGED = 1
+  # O jogador do turno passou por uma bomba e foi desclassificado
+  PLAYER_EXPLODED = 2
+  # O jogador do turno tentou pegar um tesouro que passa do peso máximo
+  TREASURE_TOO_HEAVY = 3
+
+# Peso máximo de tesouros que um jogador pode carregar
+MAX_TREASURES_WEIGHT = 15
+
+# Tamanho máximo do mapa (quantidade de casas em cada lado) que pode ser escolhido
+MAX_MAP_SIZE = 300
+
+# Versão do formato do snapshot do jogo. Deve ser incrementada
+# sempre que o formato mudar de forma incompatível.
+SNAPSHOT_VERSION = 1
+
 class Game:
 
   '''
@@ -221,6 +295,32 @@ class Game:
     self.running = False
     self.game_state = GameState.CONFIGURATION
 
+    # Funções que são chamadas quando um evento do jogo acontece
+    self.listeners: Dict[GameEvent, list[Callable[[], None]]] = {event: [] for event in GameEvent}
+
+    # Contador que muda a cada evento do jogo. Dois estados com a mesma
+    # versão são iguais, então ela identifica o estado em que uma ação
+    # foi decidida (ver `libs.logic_thread`)
+    self.state_version = 0
+
+  def subscribe(self, event: GameEvent, listener: Callable[[], None]):
+    '''
+      Registra uma função para ser chamada quando o evento acontecer.
+    '''
+    self.listeners[event].append(listener)
+
+  def unsubscribe(self, event: GameEvent, listener: Callable[[], None]):
+    '''
+      Remove uma função registrada com `subscribe`.
+    '''
+    self.listeners[event].remove(listener)
+
+  def __notify(self, event: GameEvent):
+    self.state_version += 1
+
+    for listener in self.listeners[event]:
+      listener()
+
   def game_has_been_configured(self) -> bool:
     '''
       Verifica se o jogo já foi configurado
@@ -240,6 +340,9 @@ class Game:
 
     self.map_size = map_size
     self.map = self.__generate_map_matrix(map_size)
+    # Código de cada casa do mapa (ver `generate_map_cells`), atualizado junto
+    # com `self.map`, para que o mapa possa ser copiado sem percorrer as casas
+    self.map_cells = bytearray(map_size * map_size)
     # Popula o mapa logo depois da criação
 
     self.player_count = player_count
@@ -253,6 +356,7 @@ class Game:
     self.first_player_sorted = False
 
     self.need_dice_sort = False # Indica se precisa rolar os dados
+    self.dice_rolled = False # Indica se o dado já foi rolado e o número sorteado está sendo mostrado
     self.sorted_dice_number = 0 # Número sorteado de passos
     self.current_possible_steps: Dict[str, list[tuple[int, int]]] | None = None # Os possíveis passos que o jogador pode tomar
 
@@ -285,9 +389,13 @@ class Game:
     '''
     return [[None for _ in range(size)] for _ in range(size)]
 
-  def populate_map(self):
+  def populate_map(self, seed: int | None = None, map_cells: bytes | None = None):
     '''
       Preenche o mapa com bombas e tesouros.\n
+      O mapa é gerado a partir de `seed`. Caso ela não seja\n
+      fornecida, uma semente é sorteada e guardada em `self.seed`.\n
+      Caso `map_cells` seja fornecido (ex.: um mapa já gerado de um\n
+      banco de mapas), ele é usado no lugar de gerar um mapa novo.\n
       Caso o objeto do jogo ainda não tenha sido configurado\n
       essa função não faz nada.
     '''
@@ -296,36 +404,35 @@ class Game:
       sys.exit("Não é possível popular o mapa sem configurar o objeto do jogo primeiro.")
       return
 
-    # O último item da lista não retorna como uma tupla
-    # então temos que cuidar desse caso
-    difficulty_value = self.difficulty.value[0] if type(self.difficulty.value) == tuple else self.difficulty.value
-    odds = [*difficulty_value.values()][1] # type: ignore
+    self.seed = seed if seed is not None else random.randrange(2 ** 32)
+
+    if map_cells is None:
+      map_cells = generate_map_cells(self.map_size, self.difficulty, random.Random(self.seed))
+
+    if len(map_cells) != self.map_size * self.map_size:
+      sys.exit(f"O mapa fornecido não tem o tamanho esperado para um mapa de {self.map_size}x{self.map_size}.")
+      return
 
     for x in range(self.map_size):
       for y in range(self.map_size):
-
-        choice = random.choices(
-          population=[*odds.keys()],
-          weights=[*odds.values()],
-          k=1
-        )
+        cell = map_cells[x * self.map_size + y]
 
         entity = None
 
-        if choice[0] == "bomb" and y > 2: # Depois das três primeiras profundidades, as bombas podem ser spawnadas
+        if cell == BOMB_CELL:
           entity = Bomb()
-        elif choice[0] == "treasure":
+        elif cell == TREASURE_CELL:
           entity = Treasure(y, self.map_size)
-        else:
-          # Não precisar definir a entidade como None já que
-          # a inicialização padrão do objeto entity faz isso
-          pass
 
         self.map[x][y] = entity
 
+    self.map_cells = bytearray(map_cells)
+
     # Coloca os jogadores logo depois da criação
     self.players = [Player() for _ in range(self.player_count)]
 
+    self.__notify(GameEvent.STATE_CHANGED)
+
   def get_player_by_id(self, player_id: int) -> Player | None:
     """
       Retorna o jogador com o id fornecido\n
@@ -432,6 +539,293 @@ class Game:
       # Consome o oxigênio pelo turno
       self.consume_oxygen()
 
+      self.__notify(GameEvent.TURN_CHANGED)
+
+
+  def remove_entity_at(self, position: tuple[int, int]):
+    '''
+      Tira a entidade da casa do mapa (ex.: a bomba que explodiu\n
+      ou o tesouro pego), mantendo `self.map_cells` igual ao mapa.
+    '''
+    x, y = position
+    self.map[x][y] = None
+    self.map_cells[x * self.map_size + y] = EMPTY_CELL
+
+  def get_map_cells(self) -> bytearray:
+    '''
+      Retorna uma cópia do mapa atual no mesmo formato de\n
+      :py:func:`generate_map_cells`. Os códigos são mantidos\n
+      a cada mudança do mapa, então as casas não são percorridas.
+    '''
+    return bytearray(self.map_cells)
+
+  def create_snapshot(self) -> dict:
+    '''
+      Cria uma cópia do estado da partida feita só com tipos\n
+      simples (números, textos, listas e dicionários), que pode\n
+      ser salva e usada depois com `restore_snapshot`.\n
+      O snapshot representa o início de um turno.
+    '''
+    map_cells = self.get_map_cells()
+
+    return {
+      "version": SNAPSHOT_VERSION,
+      "oxygen_tanks": self.oxygen_tanks,
+      "map_size": self.map_size,
+      "player_count": self.player_count,
+      "difficulty": get_difficulty_index(self.difficulty),
+      "seed": self.seed,
+      "map_cells": map_cells.hex(),
+      "turn": self.turn,
+      "player_of_turn": self.player_of_turn,
+      "players": [
+        {
+          "player_id": player.player_id,
+          "position": list(player.position),
+          "playing": player.playing,
+          "disqualified": player.disqualified,
+          "has_already_left_the_submarine": player.has_already_left_the_submarine,
+          "treasures": [treasure.depth for treasure in player.treasures],
+          "stored_treasures": [treasure.depth for treasure in player.stored_treasures]
+        }
+        for player in self.players
+      ]
+    }
+
+  def restore_snapshot(self, snapshot: dict):
+    '''
+      Configura o objeto do jogo a partir de um snapshot criado\n
+      por `create_snapshot`. A partida volta no início do turno\n
+      salvo, com o jogador precisando sortear o dado.
+    '''
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+      sys.exit(f"Versão de snapshot não suportada: {snapshot.get('version')}.")
+      return
+
+    self.configure_game(
+      snapshot["oxygen_tanks"],
+      snapshot["map_size"],
+      snapshot["player_count"],
+      get_difficulty_by_index(snapshot["difficulty"])
+    )
+    self.populate_map(snapshot["seed"], bytes.fromhex(snapshot["map_cells"]))
+
+    for player, player_snapshot in zip(self.players, snapshot["players"]):
+      player.position = tuple(player_snapshot["position"])
+      player.playing = player_snapshot["playing"]
+      player.disqualified = player_snapshot["disqualified"]
+      player.has_already_left_the_submarine = player_snapshot["has_already_left_the_submarine"]
+      player.treasures = [Treasure(depth, self.map_size) for depth in player_snapshot["treasures"]]
+      player.stored_treasures = [Treasure(depth, self.map_size) for depth in player_snapshot["stored_treasures"]]
+
+    self.turn = snapshot["turn"]
+    self.player_of_turn = snapshot["player_of_turn"]
+    self.first_player_sorted = True
+    self.need_dice_sort = True
+
+    self.__notify(GameEvent.STATE_CHANGED)
+
+  # Ações da partida. Toda mudança de estado feita pela interface passa por
+  # uma dessas funções, para que o evento GameEvent.STATE_CHANGED seja
+  # avisado uma única vez por ação.
+
+  def sort_first_player(self):
+    """
+      Sorteia o jogador que vai começar a partida
+    """
+    self.first_player_sorted = True
+    self.player_of_turn = random.randint(1, self.player_count)
+    self.__notify(GameEvent.STATE_CHANGED)
+
+  def start_first_turn(self):
+    """
+      Depois do sorteio do primeiro jogador, coloca ele\n
+      para sortear o dado
+    """
+    self.need_dice_sort = True
+    self.__notify(GameEvent.STATE_CHANGED)
+
+  def roll_dice(self) -> int:
+    """
+      Sorteia o número de passos do jogador do turno
+    """
+    self.sorted_dice_number = self.dice()
+    self.dice_rolled = True
+    self.__notify(GameEvent.STATE_CHANGED)
+    return self.sorted_dice_number
+
+  def finish_dice_roll(self):
+    """
+      Termina o sorteio do dado e coloca o jogador para\n
+      ativar a interação, ou passa a vez caso ele tenha\n
+      tirado zero.
+    """
+    self.need_dice_sort = False
+    self.dice_rolled = False
+
+    # Se ele estiver no submarino e tirar zero, ele não pode fazer nada.
+    # Só esperar pela próxima vez dele.
+    if self.sorted_dice_number == 0:
+      self.go_to_next_player_turn()
+    else:
+      # Se o jogador tirar 0, ele não pode ser mover, mas pode
+      # interar com a casa que ele está. Por exemplo, se, na casa
+      # que ele está, ainda tem um tesouro, ele pode escolher
+      # pegar o tesouro dessa vez. Fora isso, ele pode jogar
+      # normalmente.
+      self.need_player_activation = True
+
+    self.__notify(GameEvent.STATE_CHANGED)
+
+  def activate_current_player(self):
+    """
+      Tira o jogador do turno do modo de ativação, coloca ele no\n
+      modo de ação e calcula os passos possíveis considerando o\n
+      dado sorteado. Saindo do submarino, só é possível ir para baixo.
+    """
+    player = self.get_current_player_of_turn()
+
+    self.need_player_activation = False
+    self.need_player_action = True
+
+    if player.is_on_the_submarine():
+      middle_x = self.map_size // 2
+      self.current_possible_steps = self.calculate_possible_steps(
+        (middle_x, -1),
+        self.sorted_dice_number,
+        search_for=[Direction.DOWN] # Só pesquisa os possíveis caminho para baixo
+      )
+    else:
+      self.current_possible_steps = self.calculate_possible_steps(
+        player.position,
+        self.sorted_dice_number,
+      )
+
+    self.__notify(GameEvent.STATE_CHANGED)
+
+  def pass_turn(self):
+    """
+      O jogador do turno escolhe não andar e passa a vez
+    """
+    self.need_player_action = False
+    self.clear_current_possible_steps()
+    self.go_to_next_player_turn()
+    self.__notify(GameEvent.STATE_CHANGED)
+
+  def move_current_player(self, destination: tuple[int, int]) -> bool:
+    """
+      Move o jogador do turno para um dos passos possíveis.\n
+      Caso haja uma bomba no caminho, o jogador é desclassificado.\n
+      Caso haja um tesouro no destino, o jogador precisa decidir\n
+      se vai pegar ele. Retorna `True` se o jogador explodiu\n
+      (e avisa `GameEvent.PLAYER_EXPLODED`).
+    """
+    player = self.get_current_player_of_turn()
+    bomb_pos = self.get_first_bomb_in_the_way(destination)
+
+    # Pega a entidade antes de mudar o jogador pra lá
+    player.position = destination
+    player.has_already_left_the_submarine = True
+    entity_at_destination = self.entity_at(destination)
+    self.need_player_action = False
+    self.clear_current_possible_steps()
+
+    if bomb_pos != None:
+      # Deixa o jogador desqualificado da partida
+      self.remove_entity_at(bomb_pos) # Tira a bomba de lá
+      player.position = (-1, -1)
+      player.playing = False
+      player.disqualified = True
+      self.go_to_next_player_turn()
+      self.__notify(GameEvent.PLAYER_EXPLODED)
+      self.__notify(GameEvent.STATE_CHANGED)
+      return True
+
+    if entity_at_destination == None:
+      # Se não há nada no local, não há nada a fazer.
+      # Só passa para o próximo jogador
+      self.go_to_next_player_turn()
+    elif entity_at_destination.type == EntityType.TREASURE:
+      # Abre o menu para caso o jogador queira pegar o tesouro ou não
+      self.need_player_decision = True
+      self.treasure_being_taken = entity_at_destination
+
+    self.__notify(GameEvent.STATE_CHANGED)
+    return False
+
+  def take_treasure(self) -> bool:
+    """
+      O jogador do turno pega o tesouro em que ele parou.\n
+      Retorna `False` se o tesouro passar do peso máximo\n
+      (e avisa `GameEvent.TREASURE_TOO_HEAVY`).
+    """
+    player = self.get_current_player_of_turn()
+    treasure = self.treasure_being_taken
+
+    if player.get_treasures_weight() + treasure.weight > MAX_TREASURES_WEIGHT:
+      self.__notify(GameEvent.TREASURE_TOO_HEAVY)
+      return False
+
+    player_x, player_y = player.position
+
+    player.treasures.append(treasure)
+    # Até esse momento, a nova posição do jogador já condiz com a posição do tesouro
+    # na matriz do mapa.
+    self.remove_entity_at((player_x, player_y))
+    self.need_player_decision = False
+    self.clear_treasure_being_taken()
+
+    self.go_to_next_player_turn()
+    self.__notify(GameEvent.STATE_CHANGED)
+    return True
+
+  def leave_treasure(self):
+    """
+      O jogador do turno deixa o tesouro em que ele parou
+    """
+    self.need_player_decision = False
+    self.clear_treasure_being_taken()
+    self.go_to_next_player_turn()
+    self.__notify(GameEvent.STATE_CHANGED)
+
+  def open_submarine_options(self):
+    """
+      Mostra as opções do submarino para o jogador do turno
+    """
+    self.need_submarine_option = True
+    self.__notify(GameEvent.STATE_CHANGED)
+
+  def close_submarine_options(self):
+    """
+      Fecha as opções do submarino sem fazer nada
+    """
+    self.need_submarine_option = False
+    self.__notify(GameEvent.STATE_CHANGED)
+
+  def store_treasures(self):
+    """
+      O jogador do turno guarda os tesouros que ele carrega no submarino
+    """
+    self.need_submarine_option = False
+    player = self.get_current_player_of_turn()
+    if player.get_treasure_count() > 0:
+      for treasure in player.treasures:
+        player.stored_treasures.append(treasure)
+
+      player.treasures.clear()
+
+    self.__notify(GameEvent.STATE_CHANGED)
+
+  def get_on_board(self):
+    """
+      O jogador do turno volta para o submarino e para de jogar
+    """
+    self.need_submarine_option = False
+    player = self.get_current_player_of_turn()
+    player.position = (-1, -1)
+    player.playing = False
+    self.go_to_next_player_turn()
+    self.__notify(GameEvent.STATE_CHANGED)
 
   def get_current_player_of_turn(self) -> Player | None:
     """
@@ -1,50 +1,401 @@
 VERSION = "0.1"
 
+import argparse
+import json
+import os
+import random
+import time
+from libs.frame_limiter import FrameLimiter, FRAME_LIMIT_MODES, DEFAULT_FRAME_LIMIT_MODE, DEFAULT_FPS
+
+# Argumentos de linha de comando:
+# --record ARQUIVO: grava os eventos de entrada da sessão
+# --replay ARQUIVO: reproduz uma gravação sem limite de fps e mostra as métricas de frame
+# --metrics ARQUIVO: salva as métricas da reprodução em JSON
+# --map-bank ARQUIVO: usa os mapas de um banco de mapas pré-gerado
+# --map-seed N / --map-index K: escolhe o mapa K da semente N do banco
+# --history ARQUIVO: banco SQLite do histórico de partidas
+# --autosave ARQUIVO: arquivo do salvamento automático da partida
+# --share-state NOME: publica o estado da partida em um bloco de memória compartilhada
+# --resolution LARGURAxALTURA: desenha as cenas em uma tela lógica de tamanho fixo, redimensionada para a janela
+# --time-scale X: acelera (X > 1) ou desacelera (X < 1) o relógio do jogo
+# --turbo: os diálogos de sorteio ficam menos tempo na tela e podem ser fechados com um clique
+# --dialog-duration SEGUNDOS: tempo que os diálogos de sorteio mostram o resultado (0 = fecham na hora)
+# --logic-thread: roda as ações da partida em uma thread separada, e a interface desenha a partir de snapshots
+# --frame-limit MODO: modo do limitador de frames (uncapped, vsync, fixed ou adaptive)
+# --fps N: taxa de frames alvo do limitador (ex.: 120 ou 144 para acompanhar a tela)
+# --frame-stats ARQUIVO: mostra as estatísticas do ritmo dos frames no final e salva elas em JSON
+# --windowed / --resizable: abre o jogo em uma janela (que pode ser redimensionada, com --resizable)
+# --window-size LARGURAxALTURA: tamanho inicial da janela
+parser = argparse.ArgumentParser(description="Deep Sea")
+parser.add_argument("--record", metavar="ARQUIVO", help="grava os eventos de entrada da sessão no arquivo")
+parser.add_argument("--replay", metavar="ARQUIVO", help="reproduz uma gravação sem limite de fps e coleta o tempo de cada frame")
+parser.add_argument("--metrics", metavar="ARQUIVO", help="salva as métricas da reprodução em JSON")
+parser.add_argument("--map-bank", metavar="ARQUIVO", help="pega os mapas de um banco de mapas pré-gerado")
+parser.add_argument("--map-seed", type=int, default=0, help="semente da seção do banco de mapas")
+parser.add_argument("--map-index", type=int, default=0, help="índice do mapa dentro da seção do banco de mapas")
+parser.add_argument("--history", metavar="ARQUIVO", default="match_history.db", help="banco SQLite onde o histórico de partidas é salvo")
+parser.add_argument("--autosave", metavar="ARQUIVO", default="autosave.json", help="arquivo onde a partida é salva automaticamente a cada turno")
+parser.add_argument("--share-state", metavar="NOME", help="publica o estado da partida na memória compartilhada com esse nome, para ser lido por outros processos")
+parser.add_argument("--time-scale", type=float, default=1.0, help="escala do relógio do jogo (animações, timer e esperas dos diálogos)")
+parser.add_argument("--turbo", action="store_true", help="modo turbo: os diálogos de sorteio ficam menos tempo na tela e um clique fecha eles")
+parser.add_argument("--dialog-duration", type=float, metavar="SEGUNDOS", help="tempo que os diálogos de sorteio mostram o resultado antes de fechar (padrão: 3, ou 1 no modo turbo)")
+parser.add_argument("--resolution", metavar="LARGURAxALTURA", help="resolução fixa em que as cenas são desenhadas (ex.: 1920x1080), redimensionada para a tela só na hora de mostrar o frame")
+parser.add_argument("--logic-thread", action="store_true", help="roda as ações da partida em uma thread de lógica e desenha a partir de snapshots imutáveis do estado")
+parser.add_argument("--frame-limit", choices=FRAME_LIMIT_MODES, default=DEFAULT_FRAME_LIMIT_MODE, help="modo do limitador de frames: sem limite, vsync, taxa fixa ou adaptativo (baixa a taxa parado ou na bateria)")
+parser.add_argument("--fps", type=int, default=DEFAULT_FPS, help="taxa de frames alvo (no vsync, a taxa de atualização da tela, usada só nas estatísticas)")
+parser.add_argument("--frame-stats", metavar="ARQUIVO", help="salva as estatísticas do ritmo dos frames (jitter e prazos perdidos) em JSON")
+parser.add_argument("--windowed", action="store_true", help="abre o jogo em uma janela, ao invés da tela cheia")
+parser.add_argument("--resizable", action="store_true", help="abre o jogo em uma janela que pode ser redimensionada (o layout das cenas é refeito para o tamanho novo)")
+parser.add_argument("--window-size", metavar="LARGURAxALTURA", default="1280x720", help="tamanho inicial da janela nos modos --windowed e --resizable")
+args = parser.parse_args()
+
+if args.replay:
+  # A reprodução roda sem janela e sem áudio, então ela
+  # pode ser executada em máquinas de benchmark/CI
+  os.environ["SDL_VIDEODRIVER"] = "dummy"
+  os.environ["SDL_AUDIODRIVER"] = "dummy"
+
 import pygame
-from logic import Game
+from logic import Game, SNAPSHOT_VERSION
 from scene import SceneManager
 from scenes.configuration import ConfigurationScene
+from libs.replay import InputRecorder, InputPlayer, FrameTimeMetrics
+from libs.map_bank import MapBank
+from libs.match_history import MatchHistory
+from libs.autosave import Autosave, load_autosave
+from libs.state_publisher import StatePublisher
+from libs.canvas import Canvas, parse_resolution
+from libs.clock import MAIN_CLOCK
+from libs.scheduler import DEFAULT_FRAME_BUDGET
+from libs.logic_thread import LogicThread, ThreadedGame
+from libs.utils import get_time, set_time_source, set_mouse_pos_source
 
 # Setup do pygame
 pygame.init()
-screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+
+input_player = InputPlayer(args.replay) if args.replay else None
+input_recorder = None
+canvas = None
+window_flags = 0
+
+# Menor tamanho de janela em que o layout das cenas ainda cabe
+MIN_WINDOW_SIZE = (800, 600)
+
+def clamp_window_size(size: tuple[int, int]) -> tuple[int, int]:
+  return (max(size[0], MIN_WINDOW_SIZE[0]), max(size[1], MIN_WINDOW_SIZE[1]))
+
+if input_player:
+  # Usa o mesmo tamanho de tela e a mesma semente da gravação
+  # para que a partida seja reproduzida de forma exata
+  screen = pygame.display.set_mode(input_player.window_size)
+  random.seed(input_player.seed)
+else:
+  windowed = args.windowed or args.resizable
+  window_flags = 0 if windowed else pygame.FULLSCREEN
+  if args.resizable:
+    window_flags |= pygame.RESIZABLE
+
+  # Na tela cheia, o tamanho (0, 0) usa o tamanho da tela
+  initial_window_size = clamp_window_size(parse_resolution(args.window_size)) if windowed else (0, 0)
+
+  if args.frame_limit == "vsync":
+    # O vsync só está disponível com um renderizador, então a janela usa o SCALED.
+    # Com ele, a janela redimensionada é esticada pelo renderizador, sem refazer o layout
+    window_flags |= pygame.SCALED
+    try:
+      # O SCALED não aceita o tamanho (0, 0), então usa o tamanho da tela
+      screen = pygame.display.set_mode(initial_window_size if windowed else pygame.display.get_desktop_sizes()[0], window_flags, vsync=1)
+    except pygame.error as error:
+      raise SystemExit(f"Não foi possível ativar o vsync ({error}). Use --frame-limit fixed.")
+  else:
+    screen = pygame.display.set_mode(initial_window_size, window_flags)
+
+  if args.resolution:
+    resolution = parse_resolution(args.resolution)
+    if resolution != screen.get_size():
+      # As cenas passam a desenhar na tela lógica, e a gravação guarda
+      # os eventos já convertidos para ela (a reprodução usa o tamanho dela)
+      canvas = Canvas(screen, resolution)
+      screen = canvas.surface
+      set_mouse_pos_source(canvas.get_mouse_pos)
+
+  if args.record:
+    seed = random.randrange(2 ** 32)
+    random.seed(seed)
+    input_recorder = InputRecorder(args.record, seed, screen.get_size(), get_time())
+
 pygame.display.set_caption("Deep Sea")
-clock = pygame.time.Clock()
+
+# Tamanho da janela para o qual o layout das cenas (ou o encaixe da tela lógica) foi feito
+window_size = pygame.display.get_surface().get_size()
+frame_limiter = FrameLimiter(args.frame_limit, args.fps)
+
+MAIN_CLOCK.time_scale = args.time_scale
+
+# Tempo máximo, em segundos, que o loop fica esperando por eventos quando nada
+# está animando (garante que mudanças não previstas apareçam uma hora)
+IDLE_WAIT_LIMIT = 1.0
 
 # Deixa o objeto do jogo acessível como variável antes de ser configurado
 game = Game()
+logic_thread = None
+
+if args.logic_thread:
+  # A interface passa a usar só os snapshots publicados pela thread de
+  # lógica, e as ações da partida são enviadas para ela
+  logic_thread = LogicThread(game)
+  game = ThreadedGame(logic_thread)
+
 game.running = True
 
-def event_handler() -> list[pygame.event.Event]:
+# Outros processos podem ler o estado da partida com `StateReader(nome)`
+state_publisher = StatePublisher(game, args.share_state) if args.share_state else None
+
+frame_index = 0
+
+def resize_window(size: tuple[int, int]):
+  """
+    Atualiza a tela depois que a janela muda de tamanho. Com a tela\n
+    lógica de `--resolution`, só o encaixe dela na janela muda. Sem ela,\n
+    o layout das cenas é refeito uma vez para o tamanho novo.
+  """
+  global screen
+  global window_size
+
+  size = clamp_window_size(size)
+  if size == window_size:
+    return
+
+  window_size = size
+  window = pygame.display.set_mode(size, window_flags)
+
+  if canvas:
+    canvas.resize(window)
+  else:
+    screen = window
+    scene_manager.resize(screen)
+
+def handle_window_event(event: pygame.event.Event):
+  """
+    Pausa o relógio do jogo enquanto a janela está minimizada e\n
+    refaz a tela quando ela é redimensionada.
+  """
+  if event.type == pygame.WINDOWMINIMIZED:
+    MAIN_CLOCK.pause()
+  elif event.type == pygame.WINDOWRESTORED:
+    MAIN_CLOCK.resume()
+  elif event.type == pygame.VIDEORESIZE and not window_flags & pygame.SCALED:
+    resize_window(event.size)
+
+def wait_for_event(timeout: float) -> list[pygame.event.Event]:
+  """
+    Bloqueia até chegar um evento ou até o tempo, em segundos, passar.\n
+    Retorna o evento que acordou o loop (ou uma lista vazia).
+  """
+  event = pygame.event.wait(max(1, round(timeout * 1000)))
+  return [] if event.type == pygame.NOEVENT else [event]
+
+def event_handler(waited_events: list[pygame.event.Event] | None = None) -> list[pygame.event.Event]:
   """
     Gerencia os eventos padrões e retorna eles para\n
     serem usados por outros componentes.
   """
   global game
   global screen
-  
+
+  if waited_events is None:
+    waited_events = []
+
   # Eventos do sistema
-  events = pygame.event.get()
+  events = waited_events + pygame.event.get()
+
+  if canvas:
+    events = canvas.translate_events(events)
+
+  if input_recorder:
+    # Com a tela lógica, as cenas não mudam com o tamanho da janela, então
+    # a reprodução (que usa o tamanho da tela lógica) não deve ver esses eventos
+    recorded_events = [event for event in events if event.type != pygame.VIDEORESIZE] if canvas else events
+    # A versão do estado é a do snapshot já adotado neste frame
+    input_recorder.record(frame_index, get_time(), recorded_events, game.state_version)
+
   for event in events:
     # O evento pygame.QUIT é ativo quando o usuário clica no botão de fechar janela
     if event.type == pygame.QUIT:
       game.running = False
- 
+
+    handle_window_event(event)
+
   return events
 
+configuration_state = {}
+
+if args.turbo:
+  configuration_state["turbo"] = True
+
+if args.dialog_duration is not None:
+  if args.dialog_duration < 0:
+    raise SystemExit(f"O tempo dos diálogos não pode ser negativo: {args.dialog_duration}.")
+  configuration_state["dialog_duration"] = args.dialog_duration
+map_bank = None
+match_history = None
+
+if args.map_bank:
+  map_bank = MapBank(args.map_bank)
+  configuration_state.update({
+    "map_bank": map_bank,
+    "map_seed": args.map_seed,
+    "map_index": args.map_index
+  })
+
+autosave = None
+
+# As reproduções não são partidas de verdade, então elas não entram
+# no histórico e nem substituem a partida salva
+if not input_player:
+  match_history = MatchHistory(args.history)
+  configuration_state["match_history"] = match_history
+
+  autosave = Autosave(args.autosave)
+  configuration_state["autosave"] = autosave
+
+  # Uma gravação precisa começar de uma partida nova para poder ser
+  # reproduzida, então a partida salva só é oferecida fora dela
+  snapshot = load_autosave(args.autosave) if not input_recorder else None
+  if snapshot and snapshot.get("version") == SNAPSHOT_VERSION:
+    configuration_state["autosave_snapshot"] = snapshot
+
 scene_manager = SceneManager(game, screen)
-scene_manager.add_scene(ConfigurationScene())
+scene_manager.add_scene(ConfigurationScene(configuration_state))
+
+def replay():
+  """
+    Reproduz os frames gravados sem limite de fps, usando o tempo\n
+    e a posição do mouse da gravação, e mostra as métricas de\n
+    tempo por frame no final.
+  """
+  frame_time = 0.0
+  mouse_pos = (0, 0)
+
+  set_time_source(lambda: frame_time)
+  set_mouse_pos_source(lambda: mouse_pos)
+  # O relógio do jogo continua do mesmo tempo, agora seguindo o da gravação
+  MAIN_CLOCK.sync()
+
+  metrics = FrameTimeMetrics()
+
+  for _, frame_time, events, state_version in input_player.frames():
+    if not game.running:
+      break
+
+    for event in events:
+      # A posição real do mouse é sempre a do último evento que a informou
+      if hasattr(event, "pos"):
+        mouse_pos = event.pos
+
+      if event.type == pygame.QUIT:
+        game.running = False
+
+      handle_window_event(event)
+
+    start = time.perf_counter()
+    if logic_thread:
+      # A interface vê, em cada frame, o mesmo estado da partida que viu na
+      # gravação. As gravações antigas não têm a versão, então as ações
+      # enviadas aparecem sempre no frame seguinte
+      if state_version is None:
+        game.wait_for_actions()
+      game.sync(state_version)
+    scene_manager.update()
+    dirty_rects = scene_manager.render(events)
+    pygame.display.update(dirty_rects)
+    scene_manager.run_tasks(DEFAULT_FRAME_BUDGET)
+    metrics.add(time.perf_counter() - start)
 
-while game.running:
-    events = event_handler()
-    # Faz atualizações de lógica aqui
+  set_time_source()
+  set_mouse_pos_source()
+  MAIN_CLOCK.sync()
+
+  summary = metrics.summary()
+  for key, value in summary.items():
+    print(f"{key}: {value:.3f}" if type(value) == float else f"{key}: {value}")
+
+  if args.metrics:
+    with open(args.metrics, "w", encoding="utf-8") as file:
+      json.dump(summary, file, indent=2)
+
+if input_player:
+  replay()
+
+# Indica se o último frame não teve eventos e nem mudou nada na tela
+idle = False
+
+while game.running and not input_player:
+    # Quando nada está animando, o loop dorme até chegar um evento ou até
+    # a cena mudar sozinha (ex.: o segundo do timer), sem desenhar nada
+    waited_events = []
+    if idle:
+      time_until_change = scene_manager.get_time_until_change()
+      if time_until_change is None or time_until_change > 0:
+        waited_events = wait_for_event(min(time_until_change or IDLE_WAIT_LIMIT, IDLE_WAIT_LIMIT))
+        # A espera não é um frame atrasado, então os prazos recomeçam dela
+        frame_limiter.restart()
+
+    # Desenha o frame inteiro a partir do último snapshot publicado, que é
+    # adotado antes dos eventos para que a gravação guarde a versão dele
+    if logic_thread:
+      game.sync()
+
+    events = event_handler(waited_events)
+
+    # Avança a lógica em passos fixos, de acordo com o tempo que passou
+    scene_manager.update()
 
     # Lógica de renderização
-    scene_manager.render(events)
+    dirty_rects = scene_manager.render(events)
+
+    # Mostra só as áreas da tela que mudaram
+    if canvas:
+      canvas.present(dirty_rects)
+    else:
+      pygame.display.update(dirty_rects)
+
+    # Usa o que sobrou do frame para as tarefas adiadas (ex.: montar pedaços do mapa)
+    scene_manager.run_tasks(DEFAULT_FRAME_BUDGET)
+
+    # Os eventos só são tratados depois do desenho, então o frame seguinte
+    # sempre é desenhado para mostrar o que eles mudaram
+    idle = not events and not dirty_rects
+
+    frame_limiter.notify_input(events)
+
+    frame_limiter.tick()
+    frame_index += 1
+
+if args.frame_stats and not input_player:
+  frame_stats = frame_limiter.stats.summary()
+  for key, value in frame_stats.items():
+    print(f"{key}: {value:.3f}" if type(value) == float else f"{key}: {value}")
+
+  with open(args.frame_stats, "w", encoding="utf-8") as file:
+    json.dump(frame_stats, file, indent=2)
+
+if input_recorder:
+  input_recorder.close()
+
+if map_bank:
+  map_bank.close()
+
+if match_history:
+  match_history.close()
+
+if autosave:
+  autosave.close()
 
-    # Usa o flip() no display para atualizar a tela
-    pygame.display.flip()
+if state_publisher:
+  state_publisher.close()
 
-    clock.tick(60)  # Limita o fps para 60
+if logic_thread:
+  logic_thread.close()
 
-pygame.quit()
\ No newline at end of file
+pygame.quit()
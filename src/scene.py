@@ -4,6 +4,17 @@ from logic import Game
 import sys
 from libs.components import ComponentManager
 from libs.utils import load_music
+from libs.clock import Clock, MAIN_CLOCK
+from libs.scheduler import TaskScheduler
+
+# Duração, em segundos, de cada passo da lógica (animações, movimento, etc.).
+# A lógica avança nesse passo fixo, independente do fps, e o desenho
+# interpola entre os dois últimos passos.
+LOGIC_TIMESTEP = 1 / 60
+
+# Máximo de passos por frame. Se um frame demorar mais do que isso (ou o
+# loop tiver ficado parado esperando eventos), o tempo que sobra é descartado
+MAX_LOGIC_STEPS_PER_FRAME = 5
 
 # Tanto os erros de renderização da cena, quanto do
 # SceneManager vão acabar o programa utilizando:
@@ -29,6 +40,9 @@ class Scene:
     # Indica se a cena já foi configurada
     self.is_setup = False
 
+    # Indica se o layout da cena precisa ser refeito para um novo tamanho de tela
+    self.needs_relayout = False
+
     self.name = name
     self.shared_state = shared_state
 
@@ -39,6 +53,18 @@ class Scene:
       self.has_soundtrack = False
     self.component_manager = ComponentManager()
 
+    # Relógio da cena. Ele fica pausado enquanto a cena não está sendo
+    # mostrada, então as animações e esperas dela não andam e nem custam nada
+    self.clock = Clock(MAIN_CLOCK)
+    self.clock.pause()
+
+    # Tempo que ainda não virou um passo de lógica
+    self.accumulated_time = 0.0
+    self.last_update_time: float | None = None
+
+    # Tarefas adiadas da cena, que só rodam enquanto ela está sendo mostrada
+    self.scheduler = TaskScheduler()
+
   def play_soundtrack(self):
     if self.has_soundtrack:
       pygame.mixer.music.play(-1) # Dá play em loop
@@ -70,10 +96,30 @@ class Scene:
     """
     pass
 
-  def draw(self):
+  def resize(self, screen: pygame.surface.Surface):
+    """
+      Troca a tela da cena por uma de outro tamanho (ex.: quando a\n
+      janela é redimensionada). Caso a cena já tenha sido configurada,\n
+      o layout dela é refeito antes do próximo desenho.
+    """
+    self.screen = screen
+    self.needs_relayout = self.is_setup
+
+  def relayout(self):
+    """
+      Refaz o layout da cena para o tamanho atual da tela. Por padrão\n
+      os componentes são removidos e a cena é configurada de novo, então\n
+      as cenas em que o `setup` faz mais do que o layout devem sobrescrever\n
+      essa função.
+    """
+    self.component_manager.clear()
+    self.setup()
+
+  def draw(self) -> list[pygame.Rect]:
     """
       Função utilizada para renderizar todos os elementos da cena.\n
-      Essa função é chamada a cada frame.
+      Essa função é chamada a cada frame e retorna as áreas da tela\n
+      que mudaram.
     """
     if not self.is_injected:
       sys.exit("Você precisa injetar a cena antes de renderizar.")
@@ -83,6 +129,44 @@ class Scene:
       sys.exit("Você precisa configurar a cena antes de renderizar.")
     return
 
+  def step(self, dt: float):
+    """
+      Avança a lógica da cena em um passo fixo de `dt` segundos.
+    """
+    self.component_manager.step(dt)
+
+  def update(self):
+    """
+      Avança a lógica da cena em passos fixos, de acordo com o tempo\n
+      que passou no relógio dela desde a última chamada.
+    """
+    now = self.clock.get_time()
+    if self.last_update_time is not None:
+      self.accumulated_time += now - self.last_update_time
+    self.last_update_time = now
+
+    steps = 0
+    while self.accumulated_time >= LOGIC_TIMESTEP:
+      if steps == MAX_LOGIC_STEPS_PER_FRAME:
+        self.accumulated_time %= LOGIC_TIMESTEP
+        break
+
+      self.step(LOGIC_TIMESTEP)
+      self.accumulated_time -= LOGIC_TIMESTEP
+      steps += 1
+
+    self.component_manager.interpolation = self.accumulated_time / LOGIC_TIMESTEP
+
+  def get_time_until_change(self) -> float | None:
+    """
+      Retorna o tempo, em segundos, até a cena mudar sozinha, sem\n
+      eventos de entrada. `None` indica que ela só muda com eventos.
+    """
+    if self.scheduler.has_tasks():
+      return 0
+
+    return self.component_manager.get_time_until_change()
+
 class SceneManager:
 
   def __init__(self, game: Game, screen: pygame.surface.Surface):
@@ -94,6 +178,15 @@ class SceneManager:
   def has_current_scene(self):
     return self.current_scene is not None
 
+  def resize(self, screen: pygame.surface.Surface):
+    """
+      Troca a tela de todas as cenas depois que a janela muda de\n
+      tamanho. O layout de cada cena só é refeito quando ela é desenhada.
+    """
+    self.screen = screen
+    for scene in self.scenes.values():
+      scene.resize(screen)
+
   def add_scene(self, scene: Scene, switch: bool = True):
     if scene.name in self.scenes:
       sys.exit(f"Você já possui uma cena com esse nome: {scene.name}.")
@@ -108,7 +201,11 @@ class SceneManager:
         self.current_scene = scene
       else:
         self.screen.fill('black')
+        self.current_scene.clock.pause()
         self.current_scene = scene
+        self.current_scene.component_manager.invalidate()
+
+      self.current_scene.clock.resume()
 
   def change_to_scene(self, scene_name: str):
     if scene_name not in self.scenes:
@@ -123,11 +220,15 @@ class SceneManager:
         self.current_scene = self.scenes[scene_name]
     else:
       self.current_scene.stop_soundtrack()
+      self.current_scene.clock.pause()
       self.screen.fill('black')
       self.current_scene = self.scenes[scene_name]
+      self.current_scene.component_manager.invalidate()
       if self.current_scene.is_setup:
         self.current_scene.play_soundtrack()
 
+    self.current_scene.clock.resume()
+
 
   def delete_scene(self, scene_name: str):
     if self.scenes[scene_name] == self.current_scene:
@@ -136,19 +237,63 @@ class SceneManager:
 
     try:
       self.scenes[scene_name].stop_soundtrack()
+      self.scenes[scene_name].scheduler.clear()
       del self.scenes[scene_name]
     except KeyError as _:
       sys.exit(f"Você está tentando deletar uma cena que não existe: {scene_name}.")
 
-  def render(self, events: list[pygame.event.Event]):
-    if self.current_scene:
-      if not self.current_scene.is_setup:
-        self.current_scene.setup()
-        self.current_scene.is_setup = True
-        self.current_scene.play_soundtrack()
+  def update(self):
+    """
+      Avança a lógica da cena atual em passos fixos, de acordo com o\n
+      tempo que passou no relógio dela. As cenas que não estão sendo\n
+      mostradas não são atualizadas. Essa função é chamada a cada\n
+      frame, antes de `render`.
+    """
+    if self.current_scene and self.current_scene.is_setup:
+      self.current_scene.update()
+
+  def run_tasks(self, budget: float):
+    """
+      Roda as tarefas adiadas da cena atual por até `budget` segundos.\n
+      Essa função é chamada a cada frame, depois do desenho.
+    """
+    if self.current_scene and self.current_scene.is_setup:
+      self.current_scene.scheduler.run(budget)
+
+  def render(self, events: list[pygame.event.Event]) -> list[pygame.Rect]:
+    """
+      Desenha a cena atual e retorna as áreas da tela que mudaram,\n
+      para serem mostradas com `pygame.display.update`.
+    """
+    if not self.current_scene:
+      return []
+
+    if not self.current_scene.is_setup:
+      self.current_scene.setup()
+      self.current_scene.is_setup = True
+      self.current_scene.play_soundtrack()
+
+    if self.current_scene.needs_relayout:
+      # As tarefas adiadas eram dos componentes do layout antigo
+      self.current_scene.scheduler.clear()
+      self.current_scene.relayout()
+      self.current_scene.needs_relayout = False
+      self.current_scene.component_manager.invalidate()
+
+    dirty_rects = self.current_scene.draw()
+    self.current_scene.component_manager.listen(events)
+    return dirty_rects
+
+  def get_time_until_change(self) -> float | None:
+    """
+      Retorna o tempo, em segundos, até a cena atual mudar sozinha.\n
+      Enquanto ele não passa e não chega nenhum evento, não é preciso\n
+      desenhar nada.
+    """
+    if not self.current_scene or not self.current_scene.is_setup:
+      return 0
 
-      self.current_scene.draw()
-      self.current_scene.component_manager.listen(events)
+    return self.current_scene.get_time_until_change()
 
   def play_soundtrack(self):
     if self.has_current_scene():
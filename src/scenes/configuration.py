@@ -1,27 +1,34 @@
 from scene import Scene
+from typing import Dict
 from scenes.play import PlayScene
 from libs.components import SpriteSource, Text, SpriteButton, Counter, Dropdown
-from libs.game_components import SoundtrackToggle
-from libs.utils import load_image
+from libs.game_components import SoundtrackToggle, ResumeDecision
+from libs.utils import load_scaled_image
+from logic import MAX_MAP_SIZE
 import pygame
 
 class ConfigurationScene(Scene):
 
-  def __init__(self):
-    super().__init__("configuration", soundtrack_filename=["soundtracks", "8_bit_bossa_nova.ogg"])
+  def __init__(self, shared_state: Dict[str, str] | None = None):
+    super().__init__("configuration", shared_state if shared_state else {}, ["soundtracks", "8_bit_bossa_nova.ogg"])
 
   def setup(self):
+    # Valores extras passados na criação da cena (ex.: o banco de mapas)
+    # são mantidos junto com as configurações padrões
     self.shared_state = {
       "initial_oxygen_tanks": 160,
       "map_size": 15,
       "player_count": 2,
-      "difficulty": 0
+      "difficulty": 0,
+      **self.shared_state
     }
 
-    self.background = load_image("background.png")
-    self.background = pygame.transform.scale(self.background, pygame.display.get_window_size())
+    # O tamanho é o da tela em que a cena desenha (a janela ou a tela lógica de `--resolution`)
+    window_width, window_height = self.screen.get_size()
+
+    # Guardado por tamanho, então refazer o layout para um tamanho já usado não redimensiona de novo
+    self.background = load_scaled_image((window_width, window_height), "background.png")
 
-    window_width, window_height = pygame.display.get_window_size()
     center_x = window_width / 2
 
     game_title = Text(
@@ -85,7 +92,7 @@ class ConfigurationScene(Scene):
     map_size_counter = Counter(
       (center_x + 105, map_size_y),
 
-      15, 30, 15, self.shared_state["map_size"],
+      15, MAX_MAP_SIZE, 5, self.shared_state["map_size"],
 
       24,
       "black",
@@ -218,6 +225,24 @@ class ConfigurationScene(Scene):
       self.manager
     )
 
+    # Oferece para continuar a partida salva automaticamente, caso ela exista
+    if "autosave_snapshot" in self.shared_state:
+
+      def resume_game():
+        snapshot = self.shared_state.pop("autosave_snapshot")
+        self.manager.add_scene(PlayScene({**self.shared_state, "snapshot": snapshot}))
+
+      def discard_saved_game():
+        self.shared_state.pop("autosave_snapshot")
+        if "autosave" in self.shared_state:
+          self.shared_state["autosave"].clear()
+
+      resume_decision = ResumeDecision(
+        (center_x, window_height / 2),
+        on_yes=resume_game,
+        on_no=discard_saved_game
+      )
+
     self.component_manager.add_components(
       game_title,
       initial_oxygen_tanks_handle,
@@ -233,12 +258,14 @@ class ConfigurationScene(Scene):
       soundtrack_toggle
     )
 
+    # Adicionado por último para ficar em cima de todos os outros componentes
+    if "autosave_snapshot" in self.shared_state:
+      self.component_manager.add_component(resume_decision)
+
   # A renderização foi separada de dentro da classe de ComponentManager
   # para ter um controle mais granulado a cerca da hierarquia de rende
   # rização.
-  def draw(self):
+  def draw(self) -> list[pygame.Rect]:
     super().draw()
-    drawable_background = self.background.copy()
-    self.component_manager.draw_all(drawable_background)
-    # Coloca toda a cena no fundo
-    self.screen.blit(drawable_background, (0, 0))
+    # Só as áreas que mudaram são restauradas a partir do fundo e desenhadas de novo
+    return self.component_manager.draw_dirty(self.screen, self.background)
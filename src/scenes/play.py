@@ -1,10 +1,11 @@
 from scene import Scene
 from typing import Dict
-from logic import get_difficulty_by_index
-from libs.utils import load_image
+from logic import Player, GameEvent, get_difficulty_by_index, get_difficulty_index
+from libs.utils import load_scaled_image
 from libs.components import SpriteSource, Text, Image, Timer, Alignment, SpriteButton
-from libs.game_components import Map, PlayerBoard, SoundtrackToggle, FirstPlayerSorter, Submarine, DiceRoller, PlayerDecision, SubmarineOptions, WinnerDisplay
+from libs.game_components import Map, Minimap, PlayerBoard, SoundtrackToggle, FirstPlayerSorter, Submarine, DiceRoller, PlayerDecision, SubmarineOptions, WinnerDisplay, DEFAULT_DIALOG_DURATION, TURBO_DIALOG_DURATION
 import pygame
+import time
 
 class PlayScene(Scene):
 
@@ -12,17 +13,58 @@ class PlayScene(Scene):
     super().__init__("play", shared_state, ["soundtracks", "cleyton_rx_underwater.ogg"])
 
   def setup(self):
+    if "snapshot" in self.shared_state:
+      self.setup_game_from_snapshot(self.shared_state["snapshot"])
+    else:
+      self.setup_game()
+
+    if "autosave" in self.shared_state:
+      self.game.subscribe(GameEvent.TURN_CHANGED, self.autosave_game)
+
+    self.setup_components()
+
+  def setup_game_from_snapshot(self, snapshot: dict):
+    """
+      Configura o jogo a partir de uma partida salva.
+    """
+    self.game.restore_snapshot(snapshot)
+    self.map_index = snapshot.get("map_index")
+
+  def setup_game(self):
+    """
+      Configura o jogo para uma partida nova.
+    """
     self.game.configure_game(
       self.shared_state["initial_oxygen_tanks"],
       self.shared_state["map_size"],
       self.shared_state["player_count"],
       get_difficulty_by_index(self.shared_state["difficulty"])
     )
-    self.game.populate_map()
 
-    window_width, window_height = pygame.display.get_window_size()
-    self.background = load_image("background.png")
-    self.background = pygame.transform.scale(self.background, (window_width, window_height))
+    # Se houver um banco de mapas, pega o mapa já gerado dele. Caso o banco
+    # não tenha um mapa para essa configuração, o mapa é gerado normalmente.
+    map_seed = None
+    map_cells = None
+    self.map_index = None
+    if "map_bank" in self.shared_state:
+      map_cells = self.shared_state["map_bank"].get_map(
+        self.game.map_size,
+        self.game.difficulty,
+        self.shared_state["map_seed"],
+        self.shared_state["map_index"]
+      )
+
+      if map_cells is not None:
+        map_seed = self.shared_state["map_seed"]
+        self.map_index = self.shared_state["map_index"]
+
+    self.game.populate_map(map_seed, map_cells)
+
+  def setup_components(self):
+    # O tamanho é o da tela em que a cena desenha (a janela ou a tela lógica de `--resolution`)
+    window_width, window_height = self.screen.get_size()
+    # Guardado por tamanho, então refazer o layout para um tamanho já usado não redimensiona de novo
+    self.background = load_scaled_image((window_width, window_height), "background.png")
 
     submarine_sprite = SpriteSource(
       ["entities", "submarine.png"],
@@ -45,34 +87,29 @@ class PlayScene(Scene):
     map_gap_size = 2
 
     smallest_dimension = playable_game_height if playable_game_width > playable_game_height else playable_game_width
-    # Equação criada para calcular o tamanho de escala necessária a partir da tela:
-    # sb = [ss - g(tc - 1)]/(S*tc)
-    # Onde:
-    # - S("size") = largura do pixel;
-    # - sb("scale_by") = tamanho da escala;
-    # - ss("smallest dimension") = menor dimensão;
-    # - tc("tile_count") = quantidade de quadrados;
-    # - g("gap") = espaço entre quadrados
-    scale_by_fit = (smallest_dimension - map_gap_size * (self.game.map_size - 1) ) / (map_sprite_size * self.game.map_size)
 
+    # As casas são montadas no tamanho original dos sprites, e a câmera do mapa
+    # encaixa o mapa inteiro na menor dimensão com o zoom 1. Então o tamanho das
+    # casas na tela não limita mais o tamanho do mapa: com o zoom, elas chegam
+    # ao tamanho original (ou maior) em qualquer tamanho de mapa.
     self.game_map = Map(
       ((window_width / 2) - (sidebar_game_width / 2), (window_height / 2) + (self.submarine_animation_height / 2)),
       SpriteSource(
         ["map_tile.png"],
         (map_sprite_size, map_sprite_size),
-        (scale_by_fit, scale_by_fit),
       ),
       SpriteSource(
         ["selected_map_tile.png"],
         (map_sprite_size, map_sprite_size),
-        (scale_by_fit, scale_by_fit),
       ),
       SpriteSource(
         ["entities", "divers.png"],
         (24, 39),
       ),
       self.game,
-      map_gap_size
+      map_gap_size,
+      scheduler=self.scheduler,
+      view_length=int(smallest_dimension)
     )
 
     game_map_width, _ = self.game_map.get_map_size()
@@ -182,13 +219,18 @@ class PlayScene(Scene):
       alignment=Alignment.LEFT
     )
 
-    timer_value = Timer(
+    self.timer_value = Timer(
       (horizontal_gap + timer_handle.get_x_position() + timer_handle.text_object.get_width(), timer_handle.get_y_position()),
       timer_handle.text_size,
       timer_handle.text_color,
-      alignment=Alignment.LEFT
+      alignment=Alignment.LEFT,
+      clock=self.clock
     )
 
+    # Continua a contagem de onde a partida salva parou
+    if "snapshot" in self.shared_state:
+      self.timer_value.set_elapsed_time(self.shared_state["snapshot"]["elapsed_time"])
+
     # Oxigênio
 
     oxygen_tanks_icon = Image(
@@ -259,14 +301,26 @@ class PlayScene(Scene):
       alignment=Alignment.LEFT
     )
 
+    # No modo turbo, os diálogos de sorteio ficam menos tempo na tela e um clique fecha eles
+    turbo = self.shared_state.get("turbo", False)
+    dialog_duration = self.shared_state.get("dialog_duration")
+    if dialog_duration is None:
+      dialog_duration = TURBO_DIALOG_DURATION if turbo else DEFAULT_DIALOG_DURATION
+
     self.first_player_sorter = FirstPlayerSorter(
       (window_width // 2, window_height // 2),
-      self.game
+      self.game,
+      clock=self.clock,
+      close_after=dialog_duration,
+      skip_on_click=turbo
     )
 
     self.dice_roller = DiceRoller(
       (status_title.get_x_position(), turn_counter_icon.get_y_position() - 20),
-      self.game
+      self.game,
+      clock=self.clock,
+      close_after=dialog_duration,
+      skip_on_click=turbo
     )
 
     self.player_decision = PlayerDecision(
@@ -281,7 +335,8 @@ class PlayScene(Scene):
 
     self.winner_display = WinnerDisplay(
       (window_width // 2, window_height // 2),
-      self.game
+      self.game,
+      on_show=self.finish_match
     )
 
     # Registro de componentes
@@ -295,7 +350,7 @@ class PlayScene(Scene):
       status_title,
       timer_icon,
       timer_handle,
-      timer_value,
+      self.timer_value,
       oxygen_tanks_icon,
       oxygen_tanks_handle,
       self.oxygen_tanks_count,
@@ -333,13 +388,94 @@ class PlayScene(Scene):
 
       self.component_manager.add_component(player_board)
 
-  def draw(self):
+    # Minimapa
+
+    # Fica embaixo do espaço de 4 quadros de jogadores, para não mudar de
+    # lugar com a quantidade de jogadores
+    minimap_top = player_board_y + 4 * (player_board_source.get_real_sprite_height() + space_between_info / 4) + space_between_info / 2
+    minimap_bottom = sidebar_centralized_y + (sidebar.sprite_source.get_real_sprite_height() / 2) - space_between_info
+    minimap_size = int(min(sidebar_game_width * 0.6, minimap_bottom - minimap_top))
+
+    # Em telas pequenas não sobra espaço para ele
+    if minimap_size >= self.game.map_size:
+      minimap = Minimap(
+        (sidebar_centralized_x, minimap_top + minimap_size / 2),
+        minimap_size,
+        self.game_map,
+        self.game
+      )
+
+      self.component_manager.add_component(minimap)
+
+  def relayout(self):
+    """
+      Refaz os componentes para o tamanho atual da tela, mantendo o\n
+      estado que não fica no jogo: o tempo do timer, os diálogos que\n
+      estão esperando para fechar e a câmera do mapa.
+    """
+    elapsed_time = self.timer_value.get_elapsed_time()
+    previous_components = (self.game_map, self.first_player_sorter, self.dice_roller, self.winner_display)
+
+    self.component_manager.clear()
+    self.setup_components()
+
+    self.timer_value.set_elapsed_time(elapsed_time)
+    components = (self.game_map, self.first_player_sorter, self.dice_roller, self.winner_display)
+    for component, previous_component in zip(components, previous_components):
+      component.take_state_from(previous_component)
+
+  def autosave_game(self):
+    """
+      Salva a partida no início de cada turno. O snapshot é criado\n
+      aqui, mas a escrita no disco é feita em outra thread.
+    """
+    snapshot = self.game.create_snapshot()
+    snapshot["elapsed_time"] = self.timer_value.get_elapsed_time()
+    snapshot["map_index"] = self.map_index
+    self.shared_state["autosave"].save(snapshot)
+
+  def finish_match(self, winner: Player):
+    """
+      Chamado quando o vencedor é mostrado. A partida acabou, então\n
+      ela não precisa mais ser continuada e vai para o histórico.
+    """
+    if "autosave" in self.shared_state:
+      self.shared_state["autosave"].clear()
+
+    self.save_match(winner)
+
+  def save_match(self, winner: Player):
+    """
+      Envia o resumo da partida para o histórico de partidas, caso ele\n
+      esteja ativo. A gravação em si é feita em outra thread.
+    """
+    if "match_history" not in self.shared_state:
+      return
+
+    self.shared_state["match_history"].submit({
+      "finished_at": time.time(),
+      "map_size": self.game.map_size,
+      "difficulty": get_difficulty_index(self.game.difficulty),
+      "seed": self.game.seed,
+      "map_index": self.map_index,
+      "turns": self.game.turn,
+      "elapsed_time": self.timer_value.get_elapsed_time(),
+      "winner_id": winner.player_id,
+      "players": [
+        {
+          "player_id": player.player_id,
+          "stored_weight": player.get_stored_treasures_weight(),
+          "carried_weight": player.get_treasures_weight(),
+          "disqualified": player.disqualified
+        }
+        for player in self.game.players
+      ]
+    })
+
+  def draw(self) -> list[pygame.Rect]:
     super().draw()
-    drawable_background = self.background.copy()
     # Atualiza o texto com a quantidade restante de oxygênio
     self.oxygen_tanks_count.text = f"{self.game.oxygen_tanks}"
     self.turn_counter_value.text = f"{self.game.turn}º"
-    # Desenha os componentes na superfície que vai ser "blitada" na tela no final
-    self.component_manager.draw_all(drawable_background)
-    # Coloca toda a cena no fundo
-    self.screen.blit(drawable_background, (0, 0))
+    # Só as áreas que mudaram são restauradas a partir do fundo e desenhadas de novo
+    return self.component_manager.draw_dirty(self.screen, self.background)
@@ -0,0 +1,89 @@
+import argparse
+import os
+import sys
+import time
+
+# Permite importar os módulos do jogo (que ficam na pasta "src")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# O benchmark roda sem janela e sem áudio
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import pygame
+import logic
+from logic import Game, get_difficulty_by_index
+from libs.components import SpriteSource
+from libs.game_components import Map
+from libs.utils import blit_sequence
+
+# Uso (a partir da raiz do repositório):
+# python src/tools/benchmark_map_blits.py --map-size 15 30 100 --repeat 20
+parser = argparse.ArgumentParser(description="Compara a montagem do mapa com um blit por sprite e com um único blits por pedaço")
+parser.add_argument("--map-size", type=int, nargs="+", default=[15, 30, 100], help="tamanhos de mapa")
+parser.add_argument("--difficulty", type=int, default=1, help="índice da dificuldade (0 = fácil, 1 = médio, 2 = difícil)")
+parser.add_argument("--map-length", type=int, default=1000, help="tamanho do mapa na tela, em pixels")
+parser.add_argument("--repeat", type=int, default=20, help="quantidade de vezes que o mapa inteiro é montado")
+parser.add_argument("--seed", type=int, default=0, help="semente usada para gerar os mapas")
+args = parser.parse_args()
+
+pygame.init()
+pygame.display.set_mode((args.map_length, args.map_length))
+
+map_sprite_size = 30
+map_gap_size = 2
+
+def create_map(map_size: int) -> Map:
+  """
+    Cria o mapa do jogo do mesmo jeito que a cena da partida
+  """
+  # Os sprites dos mergulhadores são distribuídos uma única vez por processo,
+  # então eles voltam para o primeiro a cada mapa
+  logic.next_diver_sprite = 1
+
+  game = Game()
+  game.configure_game(50, map_size, 4, get_difficulty_by_index(args.difficulty))
+  game.populate_map(args.seed)
+
+  return Map(
+    (args.map_length / 2, args.map_length / 2),
+    SpriteSource(["map_tile.png"], (map_sprite_size, map_sprite_size)),
+    SpriteSource(["selected_map_tile.png"], (map_sprite_size, map_sprite_size)),
+    SpriteSource(["entities", "divers.png"], (24, 39)),
+    game,
+    map_gap_size,
+    view_length=args.map_length
+  )
+
+def measure(chunks: list, compose) -> float:
+  """
+    Retorna o tempo médio, em ms, para montar todos os pedaços
+  """
+  start = time.perf_counter()
+  for _ in range(args.repeat):
+    for size, sequence in chunks:
+      compose(pygame.Surface(size, pygame.SRCALPHA), sequence)
+
+  return (time.perf_counter() - start) * 1000 / args.repeat
+
+def compose_per_blit(surface: pygame.Surface, sequence: list):
+  for sprite, position in sequence:
+    surface.blit(sprite, position)
+
+print(f"{'mapa':>8} {'sprites':>8} {'1 blit/sprite (ms)':>20} {'blits (ms)':>12} {'ganho':>7}")
+
+for map_size in args.map_size:
+  game_map = create_map(map_size)
+  chunks = [
+    (chunk_rect.size, game_map.get_chunk_blits(chunk_key))
+    for chunk_key, chunk_rect in game_map.get_chunk_rects()
+  ]
+
+  sprite_count = sum(len(sequence) for _, sequence in chunks)
+
+  per_blit_time = measure(chunks, compose_per_blit)
+  batched_time = measure(chunks, blit_sequence)
+
+  print(f"{f'{map_size}x{map_size}':>8} {sprite_count:>8} {per_blit_time:>20.2f} {batched_time:>12.2f} {per_blit_time / batched_time:>6.2f}x")
+
+pygame.quit()
@@ -0,0 +1,30 @@
+import argparse
+import os
+import sys
+
+# Permite importar os módulos do jogo (que ficam na pasta "src")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import get_difficulty_by_index
+from libs.map_bank import build_map_bank
+
+# Uso (a partir da raiz do repositório):
+# python src/tools/build_map_bank.py maps.bank --map-size 15 30 --difficulty 0 1 2 --seed 0 --count 1000
+parser = argparse.ArgumentParser(description="Gera um banco de mapas pré-gerados para o Deep Sea")
+parser.add_argument("path", metavar="ARQUIVO", help="arquivo do banco de mapas que vai ser gerado")
+parser.add_argument("--map-size", type=int, nargs="+", default=[15, 30], help="tamanhos de mapa")
+parser.add_argument("--difficulty", type=int, nargs="+", default=[0, 1, 2], help="índices das dificuldades (0 = fácil, 1 = médio, 2 = difícil)")
+parser.add_argument("--seed", type=int, nargs="+", default=[0], help="sementes usadas para gerar cada seção")
+parser.add_argument("--count", type=int, default=1000, help="quantidade de mapas por seção")
+args = parser.parse_args()
+
+sections = [
+  (map_size, get_difficulty_by_index(difficulty_index), seed, args.count)
+  for map_size in args.map_size
+  for difficulty_index in args.difficulty
+  for seed in args.seed
+]
+
+build_map_bank(args.path, sections)
+
+print(f"{len(sections)} seções com {args.count} mapas cada foram salvas em {args.path}.")